@@ -0,0 +1,130 @@
+"""
+Benchmark the inference memory of a model for each attention implementation (`attn_impl`) and batch size.
+
+It takes the same arguments and yaml configs as validate.py. Each setting runs in a fresh process on a random batch,
+so that its peak RSS is its own, and reports the latency and the peak RSS. A setting whose process dies, e.g. killed
+for lack of memory, is reported as failed. The largest batch size of each implementation that runs, within
+`--bench_memory_budget` if set, is the batch-size headroom.
+
+Usage:
+    $ python benchmark_attention.py --model vit_b_16_384 --image_resize 384 --device_target CPU \
+        --bench_attn_impls default chunked --bench_batch_sizes 1 2 4 8 16
+"""
+
+import json
+import logging
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+
+import mindspore as ms
+
+from mindcv.models import create_model
+from mindcv.utils import set_logger, set_seed
+
+from config import create_parser, parse_args  # isort: skip
+
+logger = logging.getLogger("mindcv.benchmark_attention")
+
+
+# fmt: off
+def create_benchmark_parser():
+    parser_config, parser = create_parser()
+    group = parser.add_argument_group("Benchmark parameters")
+    group.add_argument("--bench_attn_impls", type=str, nargs="+", default=["default", "chunked"],
+                       help="Attention implementations to compare (default=['default', 'chunked'])")
+    group.add_argument("--bench_batch_sizes", type=int, nargs="+", default=None,
+                       help="Batch sizes to sweep. If None, batch_size is used (default=None)")
+    group.add_argument("--bench_runs", type=int, default=3,
+                       help="Number of forward passes to measure for each setting (default=3)")
+    group.add_argument("--bench_memory_budget", type=float, default=None,
+                       help="Memory budget in GiB of the batch-size headroom. If None, a setting fits if it runs "
+                            "(default=None)")
+    group.add_argument("--bench_output", type=str, default=None,
+                       help="Json file where the results are saved (default=None)")
+    return parser_config, parser
+# fmt: on
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_setting(args, attn_impl, batch_size, queue):
+    """Runs in a child process, puts the latency and the peak RSS of the forward passes on `queue`."""
+    ms.set_context(mode=args.mode, device_target=args.device_target)
+    set_seed(args.seed)
+    network = create_model(
+        model_name=args.model,
+        num_classes=args.num_classes or 1000,
+        in_channels=args.in_channels,
+        pretrained=args.pretrained,
+        checkpoint_path=args.ckpt_path,
+        attn_impl=attn_impl,
+    )
+    network.set_train(False)
+    ms.amp.auto_mixed_precision(network, amp_level=args.val_amp_level)
+    x = ms.Tensor(np.random.rand(batch_size, args.in_channels, args.image_resize, args.image_resize), ms.float32)
+
+    network(x).asnumpy()  # warmup and compilation
+    start = time.perf_counter()
+    for _ in range(args.bench_runs):
+        network(x).asnumpy()
+    queue.put(dict(latency_ms=(time.perf_counter() - start) * 1000 / args.bench_runs, peak_rss_mb=_peak_rss_mb()))
+
+
+def benchmark_setting(args, attn_impl, batch_size):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run_setting, args=(args, attn_impl, batch_size, queue))
+    process.start()
+    process.join()
+
+    result = dict(attn_impl=attn_impl, batch_size=batch_size)
+    if process.exitcode == 0:
+        result.update(queue.get(), status="ok")
+        logger.info(
+            f"attn_impl: {attn_impl:<8} batch size: {batch_size:<5} latency: {result['latency_ms']:10.1f} ms  "
+            f"throughput: {batch_size * 1000 / result['latency_ms']:7.2f} img/s  "
+            f"peak RSS: {result['peak_rss_mb']:9.1f} MiB"
+        )
+    else:
+        result.update(status="failed", exitcode=process.exitcode)
+        logger.info(f"attn_impl: {attn_impl:<8} batch size: {batch_size:<5} failed with exit code {process.exitcode}")
+    return result
+
+
+def main():
+    args = parse_args(parsers=create_benchmark_parser())
+    set_logger(name="mindcv", color=False)
+
+    logger.info(f"Inference of {args.model} at {args.image_resize}x{args.image_resize} over {args.bench_runs} runs:")
+    results = []
+    for attn_impl in args.bench_attn_impls:
+        for batch_size in sorted(args.bench_batch_sizes or [args.batch_size]):
+            result = benchmark_setting(args, attn_impl, batch_size)
+            results.append(result)
+            if result["status"] != "ok":  # a larger batch would not fit either
+                break
+
+    budget_mb = None if args.bench_memory_budget is None else args.bench_memory_budget * 1024
+    for attn_impl in args.bench_attn_impls:
+        fits = [
+            r["batch_size"]
+            for r in results
+            if r["attn_impl"] == attn_impl
+            and r["status"] == "ok"
+            and (budget_mb is None or r["peak_rss_mb"] <= budget_mb)
+        ]
+        logger.info(f"Largest batch size with attn_impl={attn_impl}: {max(fits) if fits else None}")
+    if args.bench_output:
+        with open(args.bench_output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results are saved to {args.bench_output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Benchmark the data pipeline (create_dataset + create_transforms + create_loader) without a model.
+
+It takes the same arguments and yaml configs as train.py, reports the latency of every transform op and
+sweeps the number of workers and the batch size of the loader, reporting the throughput, the batch latency,
+the CPU utilization and the peak RSS of each setting.
+
+Usage:
+    $ python benchmark_data.py -c configs/resnet/resnet_50_ascend.yaml --data_dir /path/to/imagenet \
+        --bench_workers 4 8 16 --bench_batch_sizes 64 128
+"""
+
+import json
+import logging
+import os
+import resource
+import time
+
+import numpy as np
+
+from mindcv.data import create_dataset, create_loader, create_transforms
+from mindcv.utils import set_logger, set_seed
+
+from config import create_parser, parse_args  # isort: skip
+
+logger = logging.getLogger("mindcv.benchmark_data")
+
+_PERCENTILES = (50, 90, 99)
+
+
+# fmt: off
+def create_benchmark_parser():
+    parser_config, parser = create_parser()
+    group = parser.add_argument_group("Benchmark parameters")
+    group.add_argument("--bench_batches", type=int, default=100,
+                       help="Number of batches to measure for each setting (default=100)")
+    group.add_argument("--bench_warmup", type=int, default=10,
+                       help="Number of batches to skip before measuring (default=10)")
+    group.add_argument("--bench_workers", type=int, nargs="+", default=None,
+                       help="Numbers of parallel workers to sweep. If None, num_parallel_workers is used "
+                            "(default=None)")
+    group.add_argument("--bench_batch_sizes", type=int, nargs="+", default=None,
+                       help="Batch sizes to sweep. If None, batch_size is used (default=None)")
+    group.add_argument("--bench_op_samples", type=int, default=64,
+                       help="Number of samples to measure the latency of each transform op on. "
+                            "0 means skipping the op latency (default=64)")
+    group.add_argument("--bench_eval", action="store_true",
+                       help="Benchmark the evaluation pipeline on val_split instead of the training pipeline")
+    group.add_argument("--bench_output", type=str, default=None,
+                       help="Json file where the results are saved (default=None)")
+    return parser_config, parser
+# fmt: on
+
+
+def build_dataset(args, num_parallel_workers):
+    return create_dataset(
+        name=args.dataset,
+        root=args.data_dir,
+        split=args.val_split if args.bench_eval else args.train_split,
+        shuffle=args.shuffle and not args.bench_eval,
+        num_samples=args.num_samples,
+        num_parallel_workers=num_parallel_workers,
+        download=args.dataset_download,
+        num_aug_repeats=0 if args.bench_eval else args.aug_repeats,
+        manifest_dir=args.manifest_dir,
+        class_weighting=None if args.bench_eval else args.class_weighting,
+        shard_cache_size=None if args.shard_cache_size is None else int(args.shard_cache_size * 1024**3),
+    )
+
+
+def build_transforms(args):
+    if args.bench_eval:
+        return create_transforms(
+            dataset_name=args.dataset,
+            is_training=False,
+            image_resize=args.image_resize,
+            crop_pct=args.crop_pct,
+            interpolation=args.interpolation,
+            reduced_decode=args.reduced_decode,
+            normalize_on_device=args.normalize_on_device,
+            mean=args.mean,
+            std=args.std,
+        )
+    return create_transforms(
+        dataset_name=args.dataset,
+        is_training=True,
+        image_resize=args.image_resize,
+        scale=args.scale,
+        ratio=args.ratio,
+        hflip=args.hflip,
+        vflip=args.vflip,
+        color_jitter=args.color_jitter,
+        interpolation=args.interpolation,
+        reduced_decode=args.reduced_decode,
+        normalize_on_device=args.normalize_on_device,
+        auto_augment=args.auto_augment,
+        mean=args.mean,
+        std=args.std,
+        re_prob=args.re_prob,
+        re_scale=args.re_scale,
+        re_ratio=args.re_ratio,
+        re_value=args.re_value,
+        re_max_attempts=args.re_max_attempts,
+        separate=args.aug_splits > 0,
+    )
+
+
+def _percentiles(values_ms):
+    return {f"p{q}": float(np.percentile(values_ms, q)) for q in _PERCENTILES}
+
+
+def _cpu_time():
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return sum(u.ru_utime + u.ru_stime for u in (self_usage, children_usage))
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux; the children term is the largest finished child, e.g. a worker process
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    ) / 1024
+
+
+def benchmark_ops(args):
+    """Latency of each transform op, applied one by one in the main process to the first samples."""
+    transform = build_transforms(args)
+    if isinstance(transform, tuple):  # augment splits, measure the ops of a single split
+        transform = [op for tfl in transform for op in tfl]
+    dataset = build_dataset(args, num_parallel_workers=1)
+
+    latencies = [[] for _ in transform]
+    for i, row in enumerate(dataset.create_dict_iterator(output_numpy=True, num_epochs=1)):
+        if i >= args.bench_op_samples:
+            break
+        image = row["image"]
+        for j, op in enumerate(transform):
+            start = time.perf_counter()
+            image = op(image)
+            latencies[j].append((time.perf_counter() - start) * 1000)
+
+    results = []
+    for op, latency in zip(transform, latencies):
+        result = dict(op=type(op).__name__, **_percentiles(latency))
+        results.append(result)
+        logger.info(f"{result['op']:<28} " + "  ".join(f"p{q}: {result[f'p{q}']:8.3f} ms" for q in _PERCENTILES))
+    return results
+
+
+def benchmark_loader(args, num_parallel_workers, batch_size):
+    """Throughput, batch latency, CPU utilization and peak RSS of the loader iterated without a model."""
+    dataset = build_dataset(args, num_parallel_workers)
+    num_classes = dataset.num_classes() if args.num_classes is None else args.num_classes
+    loader = create_loader(
+        dataset=dataset,
+        batch_size=batch_size,
+        drop_remainder=True,
+        is_training=not args.bench_eval,
+        mixup=0.0 if args.bench_eval or args.mixup_on_device or args.normalize_on_device else args.mixup,
+        cutmix=0.0 if args.bench_eval or args.mixup_on_device or args.normalize_on_device else args.cutmix,
+        cutmix_prob=args.cutmix_prob,
+        num_classes=num_classes,
+        transform=build_transforms(args),
+        num_parallel_workers=num_parallel_workers,
+        python_multiprocessing=args.python_multiprocessing,
+        separate=args.aug_splits > 0 and not args.bench_eval,
+        max_rowsize=args.max_rowsize,
+    )
+    # repeat the dataset, so that small datasets still provide enough batches
+    loader = loader.repeat()
+    iterator = loader.create_tuple_iterator(output_numpy=True, num_epochs=1)
+
+    for _ in range(args.bench_warmup):
+        next(iterator)
+    num_images = 0
+    latencies = []
+    cpu_start = _cpu_time()
+    start = last = time.perf_counter()
+    for _ in range(args.bench_batches):
+        image, _ = next(iterator)
+        now = time.perf_counter()
+        latencies.append((now - last) * 1000)
+        last = now
+        num_images += image.shape[0]
+    wall = time.perf_counter() - start
+    cpu = _cpu_time() - cpu_start
+    iterator.stop()
+
+    result = dict(
+        num_parallel_workers=num_parallel_workers,
+        batch_size=batch_size,
+        images_per_second=num_images / wall,
+        batch_latency_ms=_percentiles(latencies),
+        cpu_utilization=cpu / wall / (os.cpu_count() or 1),
+        peak_rss_mb=_peak_rss_mb(),
+    )
+    logger.info(
+        f"workers: {num_parallel_workers:<3} batch size: {batch_size:<5} "
+        f"throughput: {result['images_per_second']:9.1f} img/s  "
+        + "  ".join(f"p{q}: {result['batch_latency_ms'][f'p{q}']:8.2f} ms" for q in _PERCENTILES)
+        + f"  CPU: {result['cpu_utilization']:6.1%}  peak RSS: {result['peak_rss_mb']:8.1f} MiB"
+    )
+    return result
+
+
+def main():
+    args = parse_args(parsers=create_benchmark_parser())
+    set_seed(args.seed)
+    set_logger(name="mindcv", color=False)
+
+    results = dict(ops=[], loader=[])
+    if args.bench_op_samples > 0:
+        logger.info(f"Latency of the transform ops over {args.bench_op_samples} samples:")
+        results["ops"] = benchmark_ops(args)
+
+    logger.info(f"Loader over {args.bench_batches} batches after {args.bench_warmup} warmup batches:")
+    cpu_count = os.cpu_count() or 1
+    workers = []
+    for num_parallel_workers in args.bench_workers or [args.num_parallel_workers]:
+        if num_parallel_workers > cpu_count:
+            logger.warning(f"num_parallel_workers={num_parallel_workers} exceeds the number of CPUs, use {cpu_count}.")
+            num_parallel_workers = cpu_count
+        if num_parallel_workers not in workers:
+            workers.append(num_parallel_workers)
+    for num_parallel_workers in workers:
+        for batch_size in args.bench_batch_sizes or [args.batch_size]:
+            results["loader"].append(benchmark_loader(args, num_parallel_workers, batch_size))
+
+    best = max(results["loader"], key=lambda r: r["images_per_second"])
+    logger.info(
+        f"Best: {best['images_per_second']:.1f} img/s with num_parallel_workers={best['num_parallel_workers']} "
+        f"and batch_size={best['batch_size']}"
+    )
+    if args.bench_output:
+        with open(args.bench_output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results are saved to {args.bench_output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -49,17 +49,54 @@ def create_parser():
     # Dataset parameters
     group = parser.add_argument_group('Dataset parameters')
     group.add_argument('--dataset', type=str, default='imagenet',
-                       help='Type of dataset (default="imagenet")')
+                       help='Type of dataset. "packed" for a dataset packed by scripts/pack_dataset.py, '
+                            '"tar" for a dataset streamed from WebDataset-style tar shards (default="imagenet")')
     group.add_argument('--data_dir', type=str, default='./',
                        help='Path to dataset (default="./")')
     group.add_argument('--train_split', type=str, default='train',
                        help='Dataset train split name (default="train")')
     group.add_argument('--val_split', type=str, default='val',
                        help='Dataset validation split name (default="val")')
+    group.add_argument('--val_cache_dir', type=str, default=None,
+                       help='If set, the validation images of an image folder dataset, i.e. "imagenet" or "", '
+                            'are decoded, resized and center cropped once and cached in this directory for later '
+                            'evaluations (default=None)')
+    group.add_argument('--manifest_dir', type=str, default=None,
+                       help='If set, the file list of an image folder dataset is persisted in this directory and '
+                            'reused until the folder changes, instead of scanning the folder at every start '
+                            '(default=None)')
     group.add_argument('--dataset_download', type=str2bool, nargs='?', const=True, default=False,
                        help='If downloading the dataset, only support Mnist, Cifar10 and Cifar100 (default=False)')
+    group.add_argument('--shard_cache_size', type=float, default=None,
+                       help='For the tar dataset, the size in GB of the local cache the shards are read through, '
+                            'shared by the ranks of a host. Shards given by an url are always cached, without '
+                            'bound if None (default=None)')
     group.add_argument('--num_parallel_workers', type=int, default=8,
                        help='Number of parallel workers (default=8)')
+    group.add_argument('--loader_workers', type=dict, default=None,
+                       help='Number of workers of each stage of the train loader, a dict with the keys "label", '
+                            '"image", "batch" and "mixup", usually set in the yaml config from the output of '
+                            '--autotune. If None, every stage uses num_parallel_workers (default=None)')
+    group.add_argument('--python_multiprocessing', type=str2bool, nargs='?', const=True, default=False,
+                       help='Whether to run the Python transforms of the train loader, e.g. auto augmentation, in '
+                            'worker processes instead of threads, the images being passed through shared memory '
+                            '(default=False)')
+    group.add_argument('--max_rowsize', type=int, default=None,
+                       help='With python_multiprocessing, the size in MB of the shared memory slot of a row '
+                            'preallocated per worker, or [input, output] sizes. None allocates the shared memory '
+                            'dynamically (default=None)')
+    group.add_argument('--prefetch_size', type=int, default=None,
+                       help='Queue capacity of the data pipeline ops. If None, the MindSpore default is used '
+                            '(default=None)')
+    group.add_argument('--autotune', type=str2bool, nargs='?', const=True, default=False,
+                       help='Whether to enable the Dataset AutoTune, which redistributes the workers and the '
+                            'prefetch sizes of the data pipeline stages while training, and to log the tuned '
+                            'configuration at the end of training (default=False)')
+    group.add_argument('--autotune_interval', type=int, default=0,
+                       help='Interval for the Dataset AutoTune. Unit: step. 0 means tuning at the end of '
+                            'every epoch (default=0)')
+    group.add_argument('--autotune_file', type=str, default='./autotune',
+                       help='Path prefix of the tuned pipeline saved by the Dataset AutoTune (default="./autotune")')
     group.add_argument('--shuffle', type=str2bool, nargs='?', const=True, default=True,
                        help='Whether or not to perform shuffle on the dataset (default=True)')
     group.add_argument('--num_samples', type=int, default=None,
@@ -74,6 +111,13 @@ def create_parser():
     group = parser.add_argument_group('Augmentation parameters')
     group.add_argument('--image_resize', type=int, default=224,
                        help='Crop the size of the image (default=224)')
+    group.add_argument('--resize_schedule', type=list, default=None,
+                       help='Progressive resizing, a list of [start epoch, image size] pairs, the size of the '
+                            'training images from the start epoch (counted from 0) on. The epochs before the first '
+                            'pair use image_resize, e.g. [[0, 160], [60, 224]] (default=None)')
+    group.add_argument('--resize_scale_batch', type=str2bool, nargs='?', const=True, default=False,
+                       help='Whether to scale the batch size of each phase of resize_schedule with the inverse '
+                            'of the number of pixels, so that the memory of a batch is constant (default=False)')
     group.add_argument('--scale', type=tuple, default=(0.08, 1.0),
                        help='Random resize scale (default=(0.08, 1.0))')
     group.add_argument('--ratio', type=tuple, default=(0.75, 1.333),
@@ -86,6 +130,10 @@ def create_parser():
                        help='Color jitter factor (default=0.4)')
     group.add_argument('--interpolation', type=str, default='bilinear',
                        help='Image interpolation mode for resize operator(default="bilinear")')
+    group.add_argument('--reduced_decode', type=str2bool, nargs='?', const=True, default=False,
+                       help='Whether to decode JPEG images at the largest reduction (1/2, 1/4 or 1/8) that keeps '
+                            'the crop at least image_resize, which saves decoding time on large images '
+                            '(default=False)')
     group.add_argument('--auto_augment', type=str, default=None,
                        help='AutoAugment policy. "randaug" for RandAugment, "autoaug" for original AutoAugment, '
                             '"autoaugr" for AutoAugment with increasing posterize. and "3a" for AutoAugment with only 3'
@@ -124,10 +172,23 @@ def create_parser():
                        help='Hyperparameter of beta distribution of cutmix (default=0.0)')
     group.add_argument('--cutmix_prob', type=float, default=1.0,
                        help='Probability of applying cutmix and/or mixup (default=1.0)')
+    group.add_argument('--mixup_on_device', type=str2bool, nargs='?', const=True, default=False,
+                       help='Whether to apply mixup and/or cutmix on device inside the train step instead of '
+                            'on the host after batching. Only supports mixing per batch (default=False)')
+    group.add_argument('--normalize_on_device', type=str2bool, nargs='?', const=True, default=False,
+                       help='Whether to keep the batches uint8 HWC in the data pipeline and apply Normalize and '
+                            'HWC2CHW on device as the first op of the network, which cuts the size of the batches '
+                            'by 4x. MixUp/CutMix are then applied on device. Only supports ImageNet transforms '
+                            'without random erasing (default=False)')
     group.add_argument('--aug_repeats', type=int, default=0,
                        help='Number of dataset repetition for repeated augmentation. '
                             'If 0 or 1, repeated augmentation is disabled. '
                             'Otherwise, repeated augmentation is enabled and the common choice is 3 (default=0)')
+    group.add_argument('--class_weighting', type=str, default=None, choices=['sqrt', 'inverse'],
+                       help='If set, the training samples are drawn with replacement and class weights, for '
+                            'long-tailed datasets. "sqrt": a class is drawn with a probability proportional to the '
+                            'square root of its size. "inverse": every class is drawn with the same probability '
+                            '(default=None)')
 
     # Model parameters
     group = parser.add_argument_group('Model parameters')
@@ -143,6 +204,13 @@ def create_parser():
                        help='Drop path rate (default=None)')
     group.add_argument('--pretrained', type=str2bool, nargs='?', const=True, default=False,
                        help='Load pretrained model (default=False)')
+    group.add_argument('--deploy', type=str2bool, nargs='?', const=True, default=False,
+                       help='Convert the re-parameterizable blocks, e.g. of RepVGG, to their deploy form for '
+                            'inference. The checkpoint may be a training one or a deploy one (default=False)')
+    group.add_argument('--attn_impl', type=str, default=None, choices=['default', 'chunked'],
+                       help='Implementation of the attention of the models supporting it, e.g. ViT and PVT. '
+                            '"chunked" processes the queries and keys in chunks, so that the memory grows linearly '
+                            'with the number of tokens. If None, the default of the model (default=None)')
     group.add_argument('--ckpt_path', type=str, default='',
                        help='Initialize model from this checkpoint. '
                             'If resume training, specify the checkpoint path (default="")')
@@ -154,6 +222,10 @@ def create_parser():
                        help='Path of checkpoint (default="./ckpt")')
     group.add_argument('--ckpt_save_interval', type=int, default=1,
                        help='Checkpoint saving interval. Unit: epoch (default=1)')
+    group.add_argument('--ckpt_save_step_interval', type=int, default=0,
+                       help='Checkpoint saving interval within an epoch, so that training can be resumed at the '
+                            'exact batch. Only the latest of these checkpoints is kept, apart from ckpt_save_policy. '
+                            'Unit: step. 0 means disabled. Not supported in dataset sink mode (default=0)')
     group.add_argument('--ckpt_save_policy', type=str, default='latest_k',
                        help='Checkpoint saving strategy. The optional values is '
                             'None, "top_k" or "latest_k" (default="latest_k")')
@@ -282,8 +354,15 @@ def _check_cfgs_in_parser(cfgs: dict, parser: argparse.ArgumentParser):
             raise KeyError(f"{k} does not exist in ArgumentParser!")
 
 
-def parse_args(args=None):
-    parser_config, parser = create_parser()
+def parse_args(args=None, parsers=None):
+    """Parses the arguments, whose defaults are overridden by the yaml config file given by `--config`.
+
+    Args:
+        args (list): The arguments to parse. If None, sys.argv is parsed. Defaults to None.
+        parsers (tuple): The (config parser, main parser) pair to use, e.g. `create_parser()` extended with
+            script-specific arguments. If None, `create_parser()` is used. Defaults to None.
+    """
+    parser_config, parser = parsers if parsers is not None else create_parser()
     # Do we have a config file to parse?
     args_config, remaining = parser_config.parse_known_args(args)
     if args_config.config:
@@ -26,7 +26,7 @@ def _gen_page(lang):
             if parts[-1].startswith("__") or parts[-2] == "layers":
                 continue
             # fileter out utility modules
-            if parts[-1] in ["model_factory", "registry", "utils", "helpers"]:
+            if parts[-1] in ["model_factory", "model_index", "registry", "utils", "helpers"]:
                 continue
             # filter out the net module which is replaced by the net function with the same name
             # TODO: we need to change mechanism of model importing
@@ -1,16 +1,31 @@
-"""mindcv init"""
-from . import data, loss, models, optim, scheduler, utils
-from .data import *
-from .loss import *
-from .models import *
-from .optim import *
-from .scheduler import *
-from .utils import *
+"""mindcv init
+
+The subpackages are imported on first use, e.g. `import mindcv` imports none of them and `mindcv.create_model`
+imports `mindcv.models`, which in turn imports the module of a model on first use.
+"""
+import importlib
+
 from .version import __version__
 
-__all__ = []
-__all__.extend(data.__all__)
-__all__.extend(loss.__all__)
-__all__.extend(models.__all__)
-__all__.extend(optim.__all__)
-__all__.extend(scheduler.__all__)
+# the subpackages whose names are exported by `mindcv`
+_EXPORTING_SUBPACKAGES = ("data", "loss", "models", "optim", "scheduler")
+_SUBPACKAGES = _EXPORTING_SUBPACKAGES + ("utils",)
+
+
+def _import(subpackage):
+    return importlib.import_module(f"{__name__}.{subpackage}")
+
+
+def __getattr__(name):
+    if name in _SUBPACKAGES:
+        return _import(name)
+    if name == "__all__":
+        return [n for subpackage in _EXPORTING_SUBPACKAGES for n in _import(subpackage).__all__]
+    for subpackage in _EXPORTING_SUBPACKAGES:
+        module = _import(subpackage)
+        if name in module.__all__:
+            return getattr(module, name)
+    # the names of `utils` are not in `__all__`, but available as `mindcv.name`
+    if not name.startswith("_") and hasattr(_import("utils"), name):
+        return getattr(_import("utils"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,16 +1,42 @@
 """
 Data processing
 """
-from . import dataset_download, dataset_factory, loader, transforms_factory
+from . import (
+    autotune,
+    dataset_download,
+    dataset_factory,
+    eval_cache,
+    image_folder,
+    loader,
+    packed_dataset,
+    reduced_decode,
+    shard_cache,
+    tar_dataset,
+    transforms_factory,
+)
 from .auto_augment import *
+from .autotune import *
 from .constants import *
 from .dataset_download import *
 from .dataset_factory import *
+from .eval_cache import *
+from .image_folder import *
 from .loader import *
+from .packed_dataset import *
+from .reduced_decode import *
+from .shard_cache import *
+from .tar_dataset import *
 from .transforms_factory import *
 
 __all__ = []
+__all__.extend(autotune.__all__)
 __all__.extend(dataset_download.__all__)
 __all__.extend(dataset_factory.__all__)
+__all__.extend(eval_cache.__all__)
+__all__.extend(image_folder.__all__)
 __all__.extend(loader.__all__)
+__all__.extend(packed_dataset.__all__)
+__all__.extend(reduced_decode.__all__)
+__all__.extend(shard_cache.__all__)
+__all__.extend(tar_dataset.__all__)
 __all__.extend(transforms_factory.__all__)
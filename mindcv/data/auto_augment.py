@@ -12,6 +12,7 @@ Papers:
 
 import random
 import re
+import threading
 from functools import partial
 
 import numpy as np
@@ -32,6 +33,8 @@ _DEFAULT_INTERPOLATION = Inter.BICUBIC
 
 _GUASSS_KERNEL_SIZE = 3
 
+_CONTRAST_LUT_MAX_SIZE = 128 * 128 * 3
+
 
 def _interpolation(kwargs):
     interpolation = kwargs.pop("resample", _DEFAULT_INTERPOLATION)
@@ -45,6 +48,11 @@ def _check_args_tf(kwargs):
     kwargs["resample"] = _interpolation(kwargs)
 
 
+def _is_hwc_uint8(img):
+    """The element-wise ops have an exact NumPy implementation for RGB images as HWC uint8 arrays."""
+    return isinstance(img, np.ndarray) and img.dtype == np.uint8 and img.ndim == 3 and img.shape[-1] == 3
+
+
 def shear_x(img, shear, **kwargs):
     _check_args_tf(kwargs)
     return vision.RandomAffine(degrees=0, shear=(-shear, -shear), **kwargs)(img)
@@ -75,6 +83,8 @@ def auto_contrast(img, **__):
 
 
 def invert(img, **__):
+    if _is_hwc_uint8(img):
+        return 255 - img
     return vision.Invert()(img)
 
 
@@ -83,15 +93,42 @@ def equalize(img, **__):
 
 
 def solarize(img, thresh, **__):
+    if _is_hwc_uint8(img):
+        # invert the pixels >= thresh, i.e. xor them with 0xFF
+        return img ^ ((img >= thresh).view(np.uint8) * np.uint8(0xFF))
     return vision.RandomSolarize(threshold=(thresh, thresh))(img)
 
 
 def posterize(img, bits_to_keep, **__):
     bits = max(8 - bits_to_keep, 1)
+    if _is_hwc_uint8(img):
+        return img & np.uint8((0xFF << (8 - bits)) & 0xFF)
     return vision.RandomPosterize(bits=(bits, bits))(img)
 
 
+def _contrast_lut(img, factor):
+    """Exact NumPy version of the OpenCV contrast kernel for an HWC uint8 RGB array. The kernel blends the rounded
+    mean of the 15-bit fixed-point gray image with every pixel as fma(mean, 1 - factor, pixel * factor) in float32,
+    so the result is a lookup table of the pixel value."""
+    gray = np.multiply(img[..., 0], 9798, dtype=np.uint32)
+    gray += np.multiply(img[..., 1], 19235, dtype=np.uint32)
+    gray += np.multiply(img[..., 2], 3735, dtype=np.uint32)
+    gray += 1 << 14
+    gray >>= 15
+    # cv::mean scales the sum by 1 / n instead of dividing it, which decides the rounding of exact halves
+    mean = np.rint(float(gray.sum()) * (1.0 / gray.size))
+    alpha = np.float32(factor)
+    beta = np.float32(1.0 - float(alpha))
+    # float64 holds mean * beta + pixel * alpha exactly, so it rounds only once like the fused multiply-add
+    lut = (np.arange(256, dtype=np.float32) * alpha).astype(np.float64) + mean * float(beta)
+    lut = np.clip(np.rint(lut.astype(np.float32)), 0, 255).astype(np.uint8)
+    return np.take(lut, img)
+
+
 def contrast(img, factor, **__):
+    # the gray mean and np.take cost more than the MindSpore kernel itself from about 128x128 pixels on
+    if _is_hwc_uint8(img) and 0 < img.size <= _CONTRAST_LUT_MAX_SIZE:
+        return _contrast_lut(img, factor)
     return vision.RandomColorAdjust(contrast=(factor, factor))(img)
 
 
@@ -255,6 +292,14 @@ LEVEL_TO_ARG = {
     "GaussianBlurRand": _minmax_level_to_arg,
 }
 
+# level functions that draw random numbers, e.g. negating the level randomly
+_RANDOM_LEVEL_TO_ARG = (
+    _rotate_level_to_arg,
+    _enhance_increasing_level_to_arg,
+    _shear_level_to_arg,
+    _translate_level_to_arg,
+)
+
 NAME_TO_OP = {
     "AutoContrast": auto_contrast,
     "Equalize": equalize,
@@ -302,18 +347,28 @@ class AugmentOp:
         self.magnitude_std = self.hparams.get("magnitude_std", 0)
         self.magnitude_max = self.hparams.get("magnitude_max", None)
 
+        # the level args only need to be derived once if neither the magnitude nor the level function is random
+        self.level_args = None
+        if self.magnitude_std == 0 and self.level_fn not in _RANDOM_LEVEL_TO_ARG:
+            self.level_args = self._level_args(self.magnitude)
+
+    def _level_args(self, magnitude):
+        upper_bound = self.magnitude_max or _LEVEL_DENOM
+        magnitude = max(0.0, min(magnitude, upper_bound))
+        return self.level_fn(magnitude, self.hparams) if self.level_fn is not None else tuple()
+
     def __call__(self, img):
         if self.prob < 1.0 and random.random() > self.prob:
             return img
-        magnitude = self.magnitude
-        if self.magnitude_std > 0:
-            if self.magnitude_std == float("inf"):
-                magnitude = random.uniform(0, magnitude)
-            elif self.magnitude_std > 0:
-                magnitude = random.gauss(magnitude, self.magnitude_std)
-        upper_bound = self.magnitude_max or _LEVEL_DENOM
-        magnitude = max(0.0, min(magnitude, upper_bound))
-        level_args = self.level_fn(magnitude, self.hparams) if self.level_fn is not None else tuple()
+        level_args = self.level_args
+        if level_args is None:
+            magnitude = self.magnitude
+            if self.magnitude_std > 0:
+                if self.magnitude_std == float("inf"):
+                    magnitude = random.uniform(0, magnitude)
+                elif self.magnitude_std > 0:
+                    magnitude = random.gauss(magnitude, self.magnitude_std)
+            level_args = self._level_args(magnitude)
         return self.aug_fn(img, *level_args, **self.kwargs)
 
 
@@ -684,30 +739,63 @@ class AugMixAugment:
     https://arxiv.org/abs/1912.02781
     """
 
-    def __init__(self, ops, alpha=1.0, width=3, depth=-1):
+    def __init__(self, ops, alpha=1.0, width=3, depth=-1, uint8=False):
         self.ops = ops
         self.alpha = alpha
         self.width = width
         self.depth = depth
+        self.uint8 = uint8
+        self._local = threading.local()  # scratch buffers, the map may run in several threads
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _scratch(self, shape):
+        """Per-thread float32 buffer for the weighted chain outputs, reused across calls."""
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None or scratch.shape != shape:
+            scratch = self._local.scratch = np.empty(shape, dtype=np.float32)
+        return scratch
 
     def __call__(self, img):
         mixing_weights = np.float32(np.random.dirichlet([self.alpha] * self.width))
         m = np.float32(np.random.beta(self.alpha, self.alpha))
-        mixed = np.zeros(img.shape, dtype=np.float32)
-        for mw in mixing_weights:
+        # the chains are accumulated into the output array itself, which is returned as a float32 image
+        mixed = np.empty(img.shape, dtype=np.float32)
+        scratch = self._scratch(img.shape)
+        for i, mw in enumerate(mixing_weights):
             depth = self.depth if self.depth > 0 else np.random.randint(1, 4)
             ops = np.random.choice(self.ops, depth, replace=True)
             img_aug = img  # no ops are in-place, deep copy not necessary
             for op in ops:
                 img_aug = op(img_aug)
-            mixed += mw * img_aug.astype(np.float32)
-        np.clip(mixed, 0, 255.0, out=mixed)
-        mixed = mixed.astype(np.uint8)
-        img = img * (1 - m) + mixed * m
-        return img
-
-
-def augment_and_mix_transform(configs, hparams=None):
+            if i == 0:
+                np.multiply(img_aug, mw, out=mixed)
+            else:
+                np.multiply(img_aug, mw, out=scratch)
+                mixed += scratch
+        # the weights are non-negative, so only the upper bound needs clipping; truncate like the cast of the mixed
+        # chains to uint8, then blend with the original image as img * (1 - m) + mixed * m
+        np.minimum(mixed, np.float32(255.0), out=mixed)
+        np.floor(mixed, out=mixed)
+        mixed -= img
+        mixed *= m
+        mixed += img
+        if self.uint8:
+            # a blend of two images in [0, 255], only the rounding is needed, the clipping guards the float error
+            np.rint(mixed, out=mixed)
+            np.clip(mixed, 0, 255, out=mixed)
+            return mixed.astype(np.uint8)
+        return mixed
+
+
+def augment_and_mix_transform(configs, hparams=None, uint8=False):
     """Create AugMix PyTorch transform
 
     Args:
@@ -721,6 +809,7 @@ def augment_and_mix_transform(configs, hparams=None):
             Ex 'augmix-m5-w4-d2' results in AugMix with severity 5, chain width 4, chain depth 2
 
         hparams: Other hparams (kwargs) for the Augmentation transforms
+        uint8: output uint8 images, rounded, instead of float32 ones, e.g. for images normalized on device
 
     Returns:
          A Mindspore compatible Transform
@@ -751,4 +840,4 @@ def augment_and_mix_transform(configs, hparams=None):
         hparams = dict()
     hparams["magnitude_std"] = float("inf")  # default to uniform sampling (if not set via mstd arg)
     ops = augmix_ops(magnitude=magnitude, hparams=hparams)
-    return AugMixAugment(ops, alpha=alpha, width=width, depth=depth)
+    return AugMixAugment(ops, alpha=alpha, width=width, depth=depth, uint8=uint8)
@@ -0,0 +1,93 @@
+"""
+Data pipeline autotuning
+
+Wraps the MindSpore Dataset AutoTune, which measures the throughput of every stage of the running pipeline
+and redistributes the workers and the prefetch (connector queue) sizes among them, and translates the tuned
+pipeline it saves into the per-stage arguments of `create_loader`, so that the tuning can be pinned in the
+YAML config of later runs.
+"""
+
+import json
+import logging
+from typing import Optional
+
+import yaml
+
+from mindspore.dataset import config as ds_config
+
+__all__ = [
+    "enable_autotune",
+    "read_autotune_config",
+]
+
+_logger = logging.getLogger(__name__)
+
+
+def enable_autotune(filepath_prefix: str = "./autotune", interval: int = 0):
+    """Enables the Dataset AutoTune for the pipelines created afterwards.
+
+    Args:
+        filepath_prefix: the tuned pipeline of rank `i` is saved to `{filepath_prefix}_{i}.json`.
+            Default: "./autotune".
+        interval: tune every `interval` steps (batches). If 0, tune at the end of every epoch. Default: 0.
+    """
+    ds_config.set_enable_autotune(True, filepath_prefix)
+    ds_config.set_autotune_interval(interval)
+    _logger.info(f"Dataset AutoTune is enabled, the tuned pipeline will be saved to {filepath_prefix}_<rank>.json.")
+
+
+def _walk(node):
+    yield node
+    for child in node.get("children", []):
+        yield from _walk(child)
+
+
+def _stage_of(node):
+    if node["op_type"] == "Batch":
+        return "batch"
+    if node["op_type"] != "Map":
+        return None
+    input_columns = node.get("input_columns", [])
+    if len(input_columns) > 1:
+        return "mixup"
+    if input_columns in (["label"], ["fine_label"]):
+        return "label"
+    return "image"
+
+
+def read_autotune_config(filepath: str, log: bool = True) -> dict:
+    """Reads the pipeline saved by the Dataset AutoTune into the arguments of the training config.
+
+    Args:
+        filepath: the json file saved by the AutoTune, e.g. `./autotune_0.json`.
+        log: whether to log the configuration as YAML. Default: True.
+
+    Returns:
+        A dict with `num_parallel_workers` of the dataset source, `loader_workers` mapping the stages of
+        `create_loader` ("label", "image", "batch" and "mixup") to their number of workers, and `prefetch_size`.
+        The image stage gets the largest number of workers of its maps if the image transforms are split into
+        several maps.
+    """
+    with open(filepath, "r", encoding="utf-8") as f:
+        tree = json.load(f)["tree"]
+
+    num_parallel_workers: Optional[int] = None
+    loader_workers = {}
+    prefetch_size = 0
+    for node in _walk(tree):
+        prefetch_size = max(prefetch_size, node.get("connector_queue_size", 0))
+        if not node.get("children"):
+            num_parallel_workers = node.get("num_parallel_workers")
+            continue
+        stage = _stage_of(node)
+        if stage is not None:
+            loader_workers[stage] = max(loader_workers.get(stage, 0), node["num_parallel_workers"])
+
+    config = dict(
+        num_parallel_workers=num_parallel_workers,
+        loader_workers=loader_workers,
+        prefetch_size=prefetch_size or None,
+    )
+    if log:
+        _logger.info(f"Tuned data pipeline configuration from {filepath}:\n{yaml.safe_dump(config)}")
+    return config
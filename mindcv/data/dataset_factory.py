@@ -6,11 +6,24 @@ import logging
 import os
 from typing import Optional
 
+import numpy as np
+
 import mindspore.dataset as ds
-from mindspore.dataset import Cifar10Dataset, Cifar100Dataset, DistributedSampler, ImageFolderDataset, MnistDataset
+from mindspore.dataset import (
+    Cifar10Dataset,
+    Cifar100Dataset,
+    DistributedSampler,
+    GeneratorDataset,
+    ImageFolderDataset,
+    MnistDataset,
+)
 
 from .dataset_download import Cifar10Download, Cifar100Download, MnistDownload, get_dataset_download_root
-from .distributed_sampler import RepeatAugSampler
+from .distributed_sampler import RepeatAugSampler, WeightedDistributedSampler
+from .image_folder import ImageFolderManifest, get_image_folder_manifest, scan_image_folder
+from .packed_dataset import PackedDataset
+from .shard_cache import ShardCache, file_lock, is_url
+from .tar_dataset import TarShardDataset
 
 __all__ = [
     "create_dataset",
@@ -36,12 +49,17 @@ def create_dataset(
     num_parallel_workers: Optional[int] = None,
     download: bool = False,
     num_aug_repeats: int = 0,
+    manifest_dir: Optional[str] = None,
+    class_weighting: Optional[str] = None,
+    shard_cache_size: Optional[int] = None,
     **kwargs,
 ):
     r"""Creates dataset by name.
 
     Args:
-        name: dataset name like MNIST, CIFAR10, ImageNeT, ''. '' means a customized dataset. Default: ''.
+        name: dataset name like MNIST, CIFAR10, ImageNeT, packed, ''. '' means a customized dataset.
+            'packed' means a dataset packed into large shard files by `pack_image_folder`.
+            'tar' means a dataset streamed from WebDataset-style tar shards by `TarShardDataset`. Default: ''.
         root: dataset root dir. Default: None.
         split: data split: '' or split name string (train/val/test), if it is '', no split is used.
             Otherwise, it is a subfolder of root dir, e.g., train, val, test. Default: 'train'.
@@ -56,6 +74,17 @@ def create_dataset(
         num_aug_repeats: Number of dataset repetition for repeated augmentation.
             If 0 or 1, repeated augmentation is disabled.
             Otherwise, repeated augmentation is enabled and the common choice is 3. (Default: 0)
+        manifest_dir: For custom datasets and imagenet, the directory where the file list of the image folder is
+            persisted, so that it is not scanned again until the folder changes (see `get_image_folder_manifest`).
+            If None, the folder is scanned by `ImageFolderDataset` every time. (Default: None)
+        class_weighting: For custom datasets, imagenet and packed datasets, draw the samples of every epoch with
+            replacement and class weights by `WeightedDistributedSampler` instead of shuffling them: 'sqrt' draws a
+            class with a probability proportional to the square root of its size, 'inverse' draws every class with
+            the same probability. It supports sharding and repeated augmentation. If None, the samples are
+            shuffled. (Default: None)
+        shard_cache_size: For the tar dataset, read the shards through a `ShardCache` on the local disk holding at
+            most this number of bytes, shared by the processes of the host. The remote shards, given by an url
+            pattern as root, are always read through the cache, unbounded if None. (Default: None)
 
     Note:
         For custom datasets and imagenet, the dataset dir should follow the structure like:
@@ -79,6 +108,17 @@ def create_dataset(
                ├── 000002.jpg
                └── ....
 
+        For the packed dataset, each split dir under root is a directory written by `pack_image_folder`.
+
+        For the tar dataset, each split dir under root holds the `*.tar` shards of the split, or root is an url
+        pattern of the shards like `https://host/train-{000000..000146}.tar`. The shards are split among the
+        `num_shards` ranks and shuffled through a buffer by `TarShardDataset`, which does not support
+        `num_samples`, `num_aug_repeats` and `class_weighting`. The numbers of samples are read from the
+        `index.json` next to the shards, written by `write_tar_shard_index`, which remote shards require.
+
+        For Mnist, Cifar10 and Cifar100, the dataset is downloaded once per host, under a file lock, and shared
+        by all the ranks of the host.
+
     Returns:
         Dataset object
     """
@@ -116,9 +156,33 @@ def create_dataset(
             **kwargs,
         )
 
+    if name == "tar" and (num_samples is not None or num_aug_repeats > 0 or class_weighting is not None):
+        raise ValueError("num_samples, num_aug_repeats and class_weighting are not supported by the tar dataset.")
+
+    # sampler for class-weighted sampling, with repeated augmentation if num_aug_repeats > 0
+    if class_weighting is not None:
+        assert num_samples is None, "num_samples and class_weighting can NOT be set together."
+        labels = get_dataset_labels(name, root, split, manifest_dir=manifest_dir, **kwargs)
+        _logger.info(f"Class-weighted sampling is enabled, weighting: {class_weighting}.")
+        sampler = WeightedDistributedSampler(
+            labels,
+            num_shards=num_shards,
+            rank_id=shard_id,
+            weighting=class_weighting,
+            num_repeats=max(num_aug_repeats, 1),
+        )
+        mindspore_kwargs = dict(
+            shuffle=None,
+            sampler=sampler,
+            num_shards=None,
+            shard_id=None,
+            num_parallel_workers=num_parallel_workers,
+            **kwargs,
+        )
+
     # sampler for repeated augmentation
-    if num_aug_repeats > 0:
-        dataset_size = get_dataset_size(name, root, split)
+    elif num_aug_repeats > 0:
+        dataset_size = get_dataset_size(name, root, split, manifest_dir=manifest_dir, **kwargs)
         _logger.info(
             f"Repeated augmentation is enabled, num_aug_repeats: {num_aug_repeats}, "
             f"original dataset size: {dataset_size}."
@@ -140,10 +204,11 @@ def create_dataset(
         dataset_download = _MINDSPORE_BASIC_DATASET[name][1]
         dataset_new_path = None
         if download:
-            if shard_id is not None:
-                root = os.path.join(root, f"dataset_{str(shard_id)}")
             dataset_download = dataset_download(root)
-            dataset_download.download()
+            os.makedirs(root, exist_ok=True)
+            # the first rank of the host downloads, the other ones wait and find the files downloaded
+            with file_lock(os.path.join(root, ".download.lock")):
+                dataset_download.download()
             dataset_new_path = dataset_download.path
 
         dataset = dataset_class(
@@ -159,6 +224,28 @@ def create_dataset(
         elif name == "cifar100":
             dataset.num_classes = lambda: 100
 
+    elif name == "packed":
+        if os.path.isdir(os.path.join(root, split)):
+            root = os.path.join(root, split)
+        # reading a slice of a memory-mapped shard is cheap, threads are enough
+        mindspore_kwargs.setdefault("python_multiprocessing", False)
+        source = PackedDataset(root)
+        dataset = GeneratorDataset(source, column_names=source.column_names, **mindspore_kwargs)
+        dataset.num_classes = lambda: source.num_classes
+
+    elif name == "tar":
+        if os.path.isdir(os.path.join(root, split)):
+            root = os.path.join(root, split)
+        cache = None
+        if shard_cache_size is not None or is_url(root):
+            cache = ShardCache(max_bytes=shard_cache_size)
+        # the shards are split among the ranks and shuffled by the source, which is read sequentially
+        source = TarShardDataset(root, shuffle=shuffle, num_shards=num_shards, shard_id=shard_id, cache=cache)
+        dataset = GeneratorDataset(
+            source, column_names=source.column_names, num_parallel_workers=1, python_multiprocessing=False, **kwargs
+        )
+        dataset.num_classes = lambda: source.num_classes
+
     else:
         if name == "imagenet" and download:
             raise ValueError(
@@ -169,7 +256,19 @@ def create_dataset(
 
         if os.path.isdir(root):
             root = os.path.join(root, split)
-        dataset = ImageFolderDataset(dataset_dir=root, **mindspore_kwargs)
+        if manifest_dir is not None:
+            source = ImageFolderManifest(
+                root,
+                manifest_dir,
+                extensions=mindspore_kwargs.pop("extensions", None),
+                class_indexing=mindspore_kwargs.pop("class_indexing", None),
+            )
+            # reading a file is I/O bound, threads are enough
+            mindspore_kwargs.setdefault("python_multiprocessing", False)
+            dataset = GeneratorDataset(source, column_names=source.column_names, **mindspore_kwargs)
+            dataset.num_classes = lambda: source.num_classes
+        else:
+            dataset = ImageFolderDataset(dataset_dir=root, **mindspore_kwargs)
         """ Another implementation which a bit slower than ImageFolderDataset
             imagenet_dataset = ImageNetDataset(dataset_dir=root)
             sampler = RepeatAugSampler(len(imagenet_dataset), num_shards=num_shards, rank_id=shard_id,
@@ -179,13 +278,43 @@ def create_dataset(
     return dataset
 
 
-def get_dataset_size(name, root, split):
+def get_dataset_size(name, root, split, manifest_dir=None, **kwargs):
     if name in _MINDSPORE_BASIC_DATASET:
         dataset_class = _MINDSPORE_BASIC_DATASET[name][0]
         dataset = dataset_class(dataset_dir=root, usage=split)
+    elif name == "packed":
+        if os.path.isdir(os.path.join(root, split)):
+            root = os.path.join(root, split)
+        return len(PackedDataset(root))
+    elif name == "tar":
+        if os.path.isdir(os.path.join(root, split)):
+            root = os.path.join(root, split)
+        return len(TarShardDataset(root, cache=ShardCache() if is_url(root) else None))
     else:
         if os.path.isdir(root):
             root = os.path.join(root, split)
+        if manifest_dir is not None:
+            manifest = get_image_folder_manifest(
+                root, manifest_dir, extensions=kwargs.get("extensions"), class_indexing=kwargs.get("class_indexing")
+            )
+            return manifest["num_samples"]
         dataset = ImageFolderDataset(dataset_dir=root)
 
     return dataset.get_dataset_size()
+
+
+def get_dataset_labels(name, root, split, manifest_dir=None, **kwargs):
+    """Labels of all samples of a custom, imagenet or packed dataset, in the order of the dataset."""
+    if name in _MINDSPORE_BASIC_DATASET:
+        raise ValueError(f"Reading the labels of the {name} dataset is not supported.")
+    if name == "packed":
+        if os.path.isdir(os.path.join(root, split)):
+            root = os.path.join(root, split)
+        return PackedDataset(root).labels
+    if os.path.isdir(root):
+        root = os.path.join(root, split)
+    extensions, class_indexing = kwargs.get("extensions"), kwargs.get("class_indexing")
+    if manifest_dir is not None:
+        return ImageFolderManifest(root, manifest_dir, extensions=extensions, class_indexing=class_indexing).labels
+    samples, _ = scan_image_folder(root, extensions=extensions, class_indexing=class_indexing)
+    return np.array([label for _, label in samples], dtype=np.int32)
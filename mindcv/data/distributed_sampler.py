@@ -6,6 +6,8 @@ import numpy as np
 
 _logger = logging.getLogger(__name__)
 
+_CLASS_WEIGHTINGS = ("sqrt", "inverse")
+
 
 class RepeatAugSampler:
     """Sampler that restricts data loading to a subset of the dataset for distributed,
@@ -14,6 +16,8 @@ class RepeatAugSampler:
     different process.
 
     This sampler was adapted from https://github.com/facebookresearch/deit/blob/0c4b8f60/samplers.py
+    The indices of a rank are computed lazily from the permutation of the dataset, in chunks of
+    `chunk_size`, instead of materializing the repeated indices of all ranks.
 
     Args:
         dataset_size: dataset size.
@@ -22,8 +26,16 @@ class RepeatAugSampler:
         shuffle(bool): True for using shuffle, False for not using.
         num_repeats(int): num of repeated instances in repeated augmentation, Default:3.
         selected_round(int): round the total num of samples by this factor, Defailt:256.
+        seed(int): the shuffle order of epoch `e` is seeded by `seed + e`, Default:0.
+
+    The position of the sampler is the epoch seed and a cursor, the number of samples of this rank to skip at
+    the start of the next epoch. It is saved by `state_dict()` and restored by `load_state_dict()`, so that an
+    interrupted epoch is resumed at the exact sample. Note that a dataset iterates a copy of its sampler, so
+    the position of a running pipeline is restored with `Dataset.set_init_step` instead, see `train.py`.
     """
 
+    chunk_size = 65536
+
     def __init__(
         self,
         dataset_size,
@@ -32,9 +44,10 @@ class RepeatAugSampler:
         shuffle=True,
         num_repeats=3,
         selected_round=256,
+        seed=0,
     ):
         if num_shards is None:
-            _logger.warning("num_shards is set to 1 in RepeatAugSampler since it is not passed in")
+            _logger.warning(f"num_shards is set to 1 in {type(self).__name__} since it is not passed in")
             num_shards = 1
         if rank_id is None:
             rank_id = 0
@@ -46,7 +59,9 @@ class RepeatAugSampler:
         self.rank_id = rank_id
         self.shuffle = shuffle
         self.num_repeats = int(num_repeats)
+        self.seed = seed
         self.epoch = 0
+        self.cursor = 0
         self.num_samples = int(math.ceil(self.dataset_size * num_repeats / self.num_shards))
         self.total_size = self.num_samples * self.num_shards
         # Determine the number of samples to select per epoch for each rank.
@@ -59,29 +74,34 @@ class RepeatAugSampler:
 
     def __iter__(self):
         # deterministically shuffle based on epoch
-        # print('__iter__  generating new shuffled indices: ', self.epoch)
         if self.shuffle:
-            indices = np.random.RandomState(seed=self.epoch).permutation(self.dataset_size)
-            indices = indices.tolist()
+            permutation = self._permutation(np.random.RandomState(seed=self.seed + self.epoch))
             self.epoch += 1
-            # print(indices[:30])
         else:
-            indices = list(range(self.dataset_size))
-        # produce repeats e.g. [0, 0, 0, 1, 1, 1, 2, 2, 2....]
-        indices = [ele for ele in indices for i in range(self.num_repeats)]
-
-        # add extra samples to make it evenly divisible
-        padding_size = self.total_size - len(indices)
-        if padding_size > 0:
-            indices += indices[:padding_size]
-        assert len(indices) == self.total_size
-
-        # subsample per rank
-        indices = indices[self.rank_id : self.total_size : self.num_shards]
-        assert len(indices) == self.num_samples
-
-        # return up to num selected samples
-        return iter(indices[: self.num_selected_samples])
+            permutation = None
+        # skip the samples consumed before a resume
+        cursor, self.cursor = self.cursor, 0
+        return self._generate(permutation, cursor)
+
+    def _permutation(self, rng):
+        """The order of the dataset in an epoch."""
+        return rng.permutation(self.dataset_size)
+
+    def _generate(self, permutation, cursor):
+        """Yields the indices of this rank only, chunk by chunk.
+
+        The repeated list [p0, p0, p0, p1, p1, p1, ...] padded with its head to `total_size` is never built:
+        the i-th sample of this rank is at position `rank_id + i * num_shards` of that list, which holds
+        `permutation[position % (dataset_size * num_repeats) // num_repeats]`.
+        """
+        repeated_size = self.dataset_size * self.num_repeats
+        for start in range(cursor, self.num_selected_samples, self.chunk_size):
+            stop = min(start + self.chunk_size, self.num_selected_samples)
+            positions = np.arange(start, stop, dtype=np.int64) * self.num_shards + self.rank_id
+            indices = positions % repeated_size // self.num_repeats
+            if permutation is not None:
+                indices = permutation[indices]
+            yield from indices.tolist()
 
     def __len__(self):
         return self.num_selected_samples
@@ -89,6 +109,102 @@ class RepeatAugSampler:
     def set_epoch(self, epoch):
         self.epoch = epoch
 
+    def state_dict(self):
+        """Returns the position of the sampler: the seed, the epoch and the cursor within the epoch."""
+        return {"seed": self.seed, "epoch": self.epoch, "cursor": self.cursor}
+
+    def load_state_dict(self, state_dict):
+        """Restores the position saved by `state_dict()`, the next epoch starts at its cursor."""
+        if not 0 <= state_dict["cursor"] <= self.num_selected_samples:
+            raise ValueError(
+                f"The cursor should be in [0, {self.num_selected_samples}], but got {state_dict['cursor']}."
+            )
+        self.seed = state_dict["seed"]
+        self.epoch = state_dict["epoch"]
+        self.cursor = state_dict["cursor"]
+
+
+def _alias_table(probs):
+    """Builds the alias table of a discrete distribution (Vose's method), which draws in O(1): pick a column `k`
+    uniformly, keep it with probability `prob[k]` and take `alias[k]` otherwise."""
+    n = len(probs)
+    scaled = np.asarray(probs, dtype=np.float64) * n / np.sum(probs)
+    prob = np.ones(n, dtype=np.float64)
+    alias = np.arange(n, dtype=np.int64)
+    small = np.flatnonzero(scaled < 1.0).tolist()
+    large = np.flatnonzero(scaled >= 1.0).tolist()
+    while small and large:
+        s, g = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], g
+        scaled[g] -= 1.0 - scaled[s]
+        (small if scaled[g] < 1.0 else large).append(g)
+    return prob, alias
+
+
+class WeightedDistributedSampler(RepeatAugSampler):
+    """Sampler drawing the samples of an epoch with replacement, with class weights, for long-tailed datasets.
+    Rare classes are oversampled without duplicating their files.
+
+    The class of each draw comes from an alias table over the classes, built once, and the sample is drawn
+    uniformly within its class, both vectorized over the whole epoch. The draws of an epoch are the same on
+    every rank (seeded by `seed + epoch`) and are split among the ranks, and, with `num_repeats` > 1, each
+    draw is repeated on `num_repeats` different ranks as in `RepeatAugSampler`.
+
+    Args:
+        labels: the label of every sample of the dataset, in the order of the dataset.
+        num_shards: num devices.
+        rank_id: device id.
+        weighting(str): "sqrt" draws a class with a probability proportional to the square root of its number
+            of samples, "inverse" draws every class with the same probability, i.e. weights every sample by the
+            inverse frequency of its class. Default: "sqrt".
+        num_repeats(int): num of repeated instances in repeated augmentation, Default:1.
+        selected_round(int): round the total num of samples by this factor, Default:0.
+        seed(int): the draws of epoch `e` are seeded by `seed + e`, Default:0.
+    """
+
+    def __init__(
+        self,
+        labels,
+        num_shards=None,
+        rank_id=None,
+        weighting="sqrt",
+        num_repeats=1,
+        selected_round=0,
+        seed=0,
+    ):
+        if weighting not in _CLASS_WEIGHTINGS:
+            raise ValueError(f"weighting should be one of {_CLASS_WEIGHTINGS}, but got {weighting}.")
+        labels = np.asarray(labels, dtype=np.int64)
+        super().__init__(
+            len(labels),
+            num_shards=num_shards,
+            rank_id=rank_id,
+            shuffle=True,
+            num_repeats=num_repeats,
+            selected_round=selected_round,
+            seed=seed,
+        )
+        self.weighting = weighting
+        # the samples sorted by class, the samples of class c are class_order[class_offsets[c]:][:class_counts[c]]
+        self.class_order = np.argsort(labels, kind="stable")
+        self.class_counts = np.bincount(labels)
+        self.class_offsets = np.cumsum(self.class_counts) - self.class_counts
+        if weighting == "sqrt":
+            class_probs = np.sqrt(self.class_counts)
+        else:
+            class_probs = (self.class_counts > 0).astype(np.float64)
+        self.class_probs = class_probs / np.sum(class_probs)
+        # the alias table only holds the classes with samples, so that an empty class is never drawn
+        self.classes = np.flatnonzero(self.class_counts)
+        self.alias_prob, self.alias = _alias_table(self.class_probs[self.classes])
+
+    def _permutation(self, rng):
+        columns = rng.randint(len(self.alias), size=self.dataset_size)
+        keep = rng.random_sample(self.dataset_size) < self.alias_prob[columns]
+        classes = self.classes[np.where(keep, columns, self.alias[columns])]
+        within = (rng.random_sample(self.dataset_size) * self.class_counts[classes]).astype(np.int64)
+        return self.class_order[self.class_offsets[classes] + within]
+
 
 if __name__ == "__main__":
     num_devices = 2
@@ -0,0 +1,185 @@
+"""
+Decoded-and-cropped image cache for evaluation
+
+Decode, Resize and CenterCrop of the evaluation transforms are deterministic, so their uint8 output is computed
+once, stored in a memory-mapped array on disk and reused by later evaluations, which then only apply
+Normalize and HWC2CHW.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Optional, Union
+
+import numpy as np
+
+from mindspore.dataset import GeneratorDataset
+
+from .constants import DEFAULT_CROP_PCT
+from .image_folder import scan_image_folder
+from .shard_cache import file_lock
+from .transforms_factory import transforms_imagenet_eval_crop
+
+__all__ = [
+    "CachedEvalDataset",
+    "create_cached_eval_dataset",
+]
+
+_logger = logging.getLogger(__name__)
+
+
+def _cache_key(samples, image_resize, crop_pct, interpolation):
+    """Fingerprint of the sample files (path, size, mtime) and of the deterministic transform arguments."""
+    sha = hashlib.sha1()
+    sha.update(json.dumps([image_resize, crop_pct, interpolation]).encode())
+    for path, label in samples:
+        stat = os.stat(path)
+        sha.update(f"{os.path.abspath(path)}|{label}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return sha.hexdigest()[:16]
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return np.frombuffer(f.read(), dtype=np.uint8)
+
+
+class _FileReader:
+    """Random-access source yielding the encoded bytes of the samples to be cached, in order."""
+
+    def __init__(self, samples):
+        self.paths = [path for path, _ in samples]
+
+    def __getitem__(self, idx):
+        return (_read_file(self.paths[idx]),)
+
+    def __len__(self):
+        return len(self.paths)
+
+
+def _build_cache(samples, cache_path, image_resize, crop_pct, interpolation, num_parallel_workers):
+    crop_tfl = transforms_imagenet_eval_crop(image_resize=image_resize, crop_pct=crop_pct, interpolation=interpolation)
+    dataset = GeneratorDataset(
+        _FileReader(samples),
+        column_names=["image"],
+        shuffle=False,
+        num_parallel_workers=num_parallel_workers,
+        python_multiprocessing=False,
+    )
+    dataset = dataset.map(operations=crop_tfl, input_columns="image", num_parallel_workers=num_parallel_workers)
+
+    if isinstance(image_resize, (tuple, list)):
+        height, width = image_resize
+    else:
+        height = width = image_resize
+    # write to a temporary file, then atomically rename, so that a build interrupted by a crash leaves no partial cache
+    tmp_path = f"{cache_path}.tmp.npy"
+    images = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8, shape=(len(samples), height, width, 3))
+    for i, (image,) in enumerate(dataset.create_tuple_iterator(output_numpy=True, num_epochs=1)):
+        images[i] = image
+    images.flush()
+    del images
+    os.replace(tmp_path, cache_path)
+
+
+class CachedEvalDataset:
+    """Random-access source over the cached evaluation images, to be wrapped by
+    `mindspore.dataset.GeneratorDataset`. It yields the center-cropped image as an HWC uint8 array and its label.
+
+    Args:
+        cache_path: the `.npy` file holding the cached images.
+        labels: the label of each cached image.
+    """
+
+    column_names = ["image", "label"]
+
+    def __init__(self, cache_path: str, labels: np.ndarray):
+        self.cache_path = cache_path
+        self.labels = labels
+        self._images = None
+
+    def __getitem__(self, idx):
+        if self._images is None:
+            self._images = np.load(self.cache_path, mmap_mode="r")
+        return np.array(self._images[idx]), self.labels[idx]
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_images"] = None
+        return state
+
+
+def create_cached_eval_dataset(
+    root: str,
+    cache_dir: str,
+    split: str = "val",
+    image_resize: Union[int, tuple] = 224,
+    crop_pct: float = DEFAULT_CROP_PCT,
+    interpolation: str = "bilinear",
+    shuffle: bool = False,
+    num_shards: Optional[int] = None,
+    shard_id: Optional[int] = None,
+    num_parallel_workers: Optional[int] = None,
+):
+    r"""Creates an evaluation dataset of an image folder whose images are decoded, resized and center cropped
+    only once and then cached on disk.
+
+    The cache is keyed by the sample files (path, size and modification time), `image_resize`, `crop_pct` and
+    `interpolation`; it is rebuilt whenever one of them changes. It is built by a single process of the host, e.g.
+    the first rank of a distributed evaluation, while the other ones wait and then read it. The output images are
+    HWC uint8 arrays, which
+    should be transformed by `create_transforms(..., is_training=False, cached=True)`, i.e. only Normalize and
+    HWC2CHW.
+
+    Args:
+        root: dataset root dir, which follows the same structure as in `create_dataset`.
+        cache_dir: the directory where the cache files are stored.
+        split: data split, a subfolder of root dir. Default: 'val'.
+        image_resize: the image size after center crop. Default: 224.
+        crop_pct: input image center crop percent. Default: 0.875.
+        interpolation: image interpolation mode for resize operator. Default: 'bilinear'.
+        shuffle: whether to shuffle the dataset. Default: False.
+        num_shards: number of shards that the dataset will be divided into. Default: None.
+        shard_id: the shard ID within `num_shards`. Default: None.
+        num_parallel_workers: number of workers to build the cache and read the data. Default: None.
+
+    Returns:
+        Dataset object
+    """
+    if os.path.isdir(os.path.join(root, split)):
+        root = os.path.join(root, split)
+    samples, class_indexing = scan_image_folder(root)
+    if isinstance(image_resize, list):
+        image_resize = tuple(image_resize)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    key = _cache_key(samples, image_resize, crop_pct, interpolation)
+    cache_path = os.path.join(cache_dir, f"eval_cache_{key}.npy")
+    if os.path.isfile(cache_path):
+        _logger.info(f"Loading cached evaluation images from {cache_path}.")
+    else:
+        # the first rank of the host builds the cache, the other ones wait and find it built
+        with file_lock(cache_path + ".lock"):
+            if os.path.isfile(cache_path):
+                _logger.info(f"Loading cached evaluation images from {cache_path}.")
+            else:
+                _logger.info(f"Building evaluation image cache of {len(samples)} samples at {cache_path} ...")
+                _build_cache(samples, cache_path, image_resize, crop_pct, interpolation, num_parallel_workers)
+
+    labels = np.array([label for _, label in samples], dtype=np.int32)
+    source = CachedEvalDataset(cache_path, labels)
+    dataset = GeneratorDataset(
+        source,
+        column_names=source.column_names,
+        shuffle=shuffle,
+        num_shards=num_shards,
+        shard_id=shard_id,
+        num_parallel_workers=num_parallel_workers,
+        python_multiprocessing=False,
+    )
+    dataset.num_classes = lambda: len(class_indexing)
+
+    return dataset
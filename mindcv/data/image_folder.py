@@ -0,0 +1,176 @@
+"""
+Scan an image folder tree
+
+The scan of a large tree can be persisted as a manifest of (path, label, size), with a fingerprint of the mtimes
+of the root and class directories. The mtime of a directory changes whenever a file is added, removed or renamed
+in it, so the manifest is reused until the tree changes, and both counting and reading the dataset skip the
+directory walk.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+__all__ = [
+    "ImageFolderManifest",
+    "get_image_folder_manifest",
+    "scan_image_folder",
+]
+
+_logger = logging.getLogger(__name__)
+
+_MANIFEST_VERSION = 1
+
+
+def scan_image_folder(
+    root: str,
+    extensions: Optional[Sequence[str]] = None,
+    class_indexing: Optional[Dict[str, int]] = None,
+) -> Tuple[List[Tuple[str, int]], Dict[str, int]]:
+    """Lists the samples of a dataset following the `ImageFolderDataset` layout (one sub-folder per class).
+
+    Args:
+        root: the directory that contains one sub-folder per class.
+        extensions: file extensions to be included, e.g. [".jpg", ".png"]. If None, all files are included.
+        class_indexing: a str-to-int mapping from folder name to label. If None, the folder names are sorted
+            alphabetically and each class is given a unique index starting from 0, the same as `ImageFolderDataset`.
+
+    Returns:
+        A list of (file path, label) tuples sorted by label and file name, and the class indexing.
+    """
+    if not os.path.isdir(root):
+        raise ValueError(f"Image folder `{root}` does not exist.")
+    if extensions is not None:
+        extensions = tuple(ext.lower() for ext in extensions)
+
+    if class_indexing is None:
+        class_names = sorted(entry.name for entry in os.scandir(root) if entry.is_dir())
+        class_indexing = {name: i for i, name in enumerate(class_names)}
+
+    samples = []
+    for class_name, label in sorted(class_indexing.items(), key=lambda x: x[1]):
+        class_dir = os.path.join(root, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        file_names = sorted(entry.name for entry in os.scandir(class_dir) if entry.is_file())
+        for file_name in file_names:
+            if extensions is None or file_name.lower().endswith(extensions):
+                samples.append((os.path.join(class_dir, file_name), label))
+
+    return samples, class_indexing
+
+
+def _fingerprint(root: str) -> str:
+    """Fingerprint of the mtimes of the root directory and of its sub-directories."""
+    sha = hashlib.sha1()
+    sha.update(f"{os.stat(root).st_mtime_ns}\n".encode())
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        if entry.is_dir():
+            sha.update(f"{entry.name}|{entry.stat().st_mtime_ns}\n".encode())
+    return sha.hexdigest()
+
+
+def get_image_folder_manifest(
+    root: str,
+    manifest_dir: str,
+    extensions: Optional[Sequence[str]] = None,
+    class_indexing: Optional[Dict[str, int]] = None,
+) -> dict:
+    """Gets the persisted manifest of an image folder, which is (re)built only if the folder changed.
+
+    Args:
+        root: the directory that contains one sub-folder per class.
+        manifest_dir: the directory where the manifest files are stored.
+        extensions: file extensions to be included. If None, all files are included. Default: None.
+        class_indexing: a str-to-int mapping from folder name to label, see `scan_image_folder`. Default: None.
+
+    Returns:
+        The metadata of the manifest: the absolute `root`, the `class_indexing`, the `num_samples`, the
+        `paths_file` listing the path relative to root of every sample, one per line, and the `index_file`,
+        an int64 `.npy` array of shape (num_samples, 2) holding the label and the file size of every sample.
+    """
+    if not os.path.isdir(root):
+        raise ValueError(f"Image folder `{root}` does not exist.")
+    root = os.path.abspath(root)
+    key = hashlib.sha1(json.dumps([root, extensions, class_indexing]).encode()).hexdigest()[:16]
+    meta_file = os.path.join(manifest_dir, f"manifest_{key}.json")
+    paths_file = os.path.join(manifest_dir, f"manifest_{key}_paths.txt")
+    index_file = os.path.join(manifest_dir, f"manifest_{key}_index.npy")
+    fingerprint = _fingerprint(root)
+
+    if os.path.isfile(meta_file):
+        with open(meta_file, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") == _MANIFEST_VERSION and meta.get("fingerprint") == fingerprint:
+            return meta
+
+    _logger.info(f"Building the manifest of {root} in {manifest_dir} ...")
+    samples, class_indexing = scan_image_folder(root, extensions=extensions, class_indexing=class_indexing)
+    os.makedirs(manifest_dir, exist_ok=True)
+    tmp_suffix = f".{os.getpid()}.tmp"
+    with open(paths_file + tmp_suffix, "w", encoding="utf-8") as f:
+        f.write("".join(os.path.relpath(path, root) + "\n" for path, _ in samples))
+    index = np.array([(label, os.path.getsize(path)) for path, label in samples], dtype=np.int64).reshape(-1, 2)
+    with open(index_file + tmp_suffix, "wb") as f:
+        np.save(f, index)
+    meta = dict(
+        version=_MANIFEST_VERSION,
+        root=root,
+        fingerprint=fingerprint,
+        class_indexing=class_indexing,
+        num_samples=len(samples),
+        paths_file=paths_file,
+        index_file=index_file,
+    )
+    with open(meta_file + tmp_suffix, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    # the metadata is replaced last, it validates the other files
+    os.replace(paths_file + tmp_suffix, paths_file)
+    os.replace(index_file + tmp_suffix, index_file)
+    os.replace(meta_file + tmp_suffix, meta_file)
+    return meta
+
+
+class ImageFolderManifest:
+    """Random-access source over the persisted manifest of an image folder (see `get_image_folder_manifest`),
+    to be wrapped by `mindspore.dataset.GeneratorDataset`. It yields the same samples in the same columns as
+    `ImageFolderDataset`, i.e. the encoded image as a 1-D uint8 array and its label, without walking the folder.
+
+    Args:
+        root: the directory that contains one sub-folder per class.
+        manifest_dir: the directory where the manifest files are stored.
+        extensions: file extensions to be included. If None, all files are included. Default: None.
+        class_indexing: a str-to-int mapping from folder name to label, see `scan_image_folder`. Default: None.
+    """
+
+    column_names = ["image", "label"]
+
+    def __init__(
+        self,
+        root: str,
+        manifest_dir: str,
+        extensions: Optional[Sequence[str]] = None,
+        class_indexing: Optional[Dict[str, int]] = None,
+    ):
+        meta = get_image_folder_manifest(root, manifest_dir, extensions=extensions, class_indexing=class_indexing)
+        self.root = meta["root"]
+        self.class_indexing = meta["class_indexing"]
+        with open(meta["paths_file"], "r", encoding="utf-8") as f:
+            self.paths = f.read().splitlines()
+        self.labels = np.load(meta["index_file"])[:, 0].astype(np.int32)
+
+    @property
+    def num_classes(self):
+        return len(self.class_indexing)
+
+    def __getitem__(self, idx):
+        with open(os.path.join(self.root, self.paths[idx]), "rb") as f:
+            image = np.frombuffer(f.read(), dtype=np.uint8)
+        return image, self.labels[idx]
+
+    def __len__(self):
+        return len(self.paths)
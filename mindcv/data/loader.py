@@ -13,7 +13,16 @@ from mindspore.dataset import transforms
 from .mixup import Mixup
 from .transforms_factory import create_transforms
 
-__all__ = ["create_loader"]
+__all__ = ["create_loader", "get_resize_phases"]
+
+_LOADER_STAGES = ("label", "image", "batch", "mixup")
+
+
+def _stage_workers(num_parallel_workers, stage):
+    """Number of workers of a stage, given one number for all stages or a dict of the number per stage."""
+    if isinstance(num_parallel_workers, dict):
+        return num_parallel_workers.get(stage)
+    return num_parallel_workers
 
 
 def create_loader(
@@ -30,6 +39,7 @@ def create_loader(
     num_parallel_workers=None,
     python_multiprocessing=False,
     separate=False,
+    max_rowsize=None,
 ):
     r"""Creates dataloader.
 
@@ -54,8 +64,10 @@ def create_loader(
             for evaluation will be applied. Default: None.
         target_transform (list or None): the list of transformations that will be applied on the label.
             If None, the label will be converted to the type of ms.int32. Default: None.
-        num_parallel_workers (int, optional): Number of workers(threads) to process the dataset in parallel
-            (default=None).
+        num_parallel_workers (int or dict, optional): Number of workers(threads) to process the dataset in parallel
+            (default=None). A dict sets the number per stage, its keys are "label" (target transform), "image"
+            (image transforms), "batch" and "mixup", and the stages not in it use the MindSpore default, e.g.
+            the `loader_workers` tuned by `mindcv.data.autotune.read_autotune_config`.
         python_multiprocessing (bool, optional): Parallelize Python operations with multiple worker processes. This
             option could be beneficial if the Python operation is computational heavy (default=False).
         separate(bool, optional): separate the image clean and the image been transformed.
@@ -63,6 +75,11 @@ def create_loader(
             * the first part called image "clean", which means the image without auto_augment (e.g., auto-aug)
             * the second and third parts called image transformed, hence, with the auto_augment transform.
             Refer to ".transforms_factory.create_transforms" for more information.
+        max_rowsize (int or list, optional): With `python_multiprocessing`, the rows are passed between the worker
+            processes through shared memory, in slots of `max_rowsize` MB preallocated per worker, or of the
+            input and the output rows if a list of 2, so that only the slot indices are sent. None allocates
+            the shared memory dynamically with the size of each row (default=None). The slots should hold the
+            largest row, e.g. an encoded image of the source and a decoded image of the output.
 
     Note:
         1. cutmix is now experimental (which means performance gain is not guarantee)
@@ -75,14 +92,20 @@ def create_loader(
         BatchDataset, dataset batched.
     """
 
+    if isinstance(num_parallel_workers, dict):
+        unknown = set(num_parallel_workers) - set(_LOADER_STAGES)
+        if unknown:
+            raise ValueError(f"Unknown loader stages {sorted(unknown)}, the stages are {list(_LOADER_STAGES)}.")
+
     if target_transform is None:
         target_transform = transforms.TypeCast(ms.int32)
     target_input_columns = "label" if "label" in dataset.get_col_names() else "fine_label"
     dataset = dataset.map(
         operations=target_transform,
         input_columns=target_input_columns,
-        num_parallel_workers=num_parallel_workers,
+        num_parallel_workers=_stage_workers(num_parallel_workers, "label"),
         python_multiprocessing=python_multiprocessing,
+        max_rowsize=max_rowsize,
     )
 
     if transform is None:
@@ -103,29 +126,42 @@ def create_loader(
 
         # map all the transform
         dataset = map_transform_splits(
-            dataset, transform, num_parallel_workers, python_multiprocessing, pass_column_order
+            dataset,
+            transform,
+            _stage_workers(num_parallel_workers, "image"),
+            python_multiprocessing,
+            pass_column_order,
+            max_rowsize=max_rowsize,
         )
-        # after batch, datasets has 4 columns
-        dataset = dataset.batch(batch_size=batch_size, drop_remainder=drop_remainder)
-        # concat the 3 columns of image
-        dataset = dataset.map(
-            operations=concat_per_batch_map,
+        # batch the 3 image columns directly into one image column of 3 * batch_size rows
+        dataset = dataset.batch(
+            batch_size=batch_size,
+            drop_remainder=drop_remainder,
+            per_batch_map=concat_per_batch_map,
             input_columns=["image_clean", "image_aug1", "image_aug2", "label"],
             output_columns=["image", "label"],
-            column_order=["image", "label"] if pass_column_order else None,
-            num_parallel_workers=num_parallel_workers,
+            num_parallel_workers=_stage_workers(num_parallel_workers, "batch"),
             python_multiprocessing=python_multiprocessing,
+            max_rowsize=max_rowsize,
+            **(dict(column_order=["image", "label"]) if pass_column_order else {}),
         )
 
     else:
-        dataset = dataset.map(
-            operations=transform,
-            input_columns="image",
-            num_parallel_workers=num_parallel_workers,
-            python_multiprocessing=python_multiprocessing,
-        )
+        # the transforms may be empty, e.g. for cached evaluation images normalized on device
+        if transform:
+            dataset = dataset.map(
+                operations=transform,
+                input_columns="image",
+                num_parallel_workers=_stage_workers(num_parallel_workers, "image"),
+                python_multiprocessing=python_multiprocessing,
+                max_rowsize=max_rowsize,
+            )
 
-        dataset = dataset.batch(batch_size=batch_size, drop_remainder=drop_remainder)
+        dataset = dataset.batch(
+            batch_size=batch_size,
+            drop_remainder=drop_remainder,
+            num_parallel_workers=_stage_workers(num_parallel_workers, "batch"),
+        )
 
     if is_training:
         if (mixup + cutmix > 0.0) and batch_size > 1:
@@ -144,81 +180,115 @@ def create_loader(
             dataset = dataset.map(
                 operations=mixup_fn,
                 input_columns=["image", target_input_columns],
-                num_parallel_workers=num_parallel_workers,
+                num_parallel_workers=_stage_workers(num_parallel_workers, "mixup"),
             )
 
     return dataset
 
 
-def map_transform_splits(dataset, transform, num_parallel_workers, python_multiprocessing, pass_column_order):
-    # map the primary_tfl such as to all the images
-    dataset = dataset.map(
-        operations=transform[0],
-        input_columns="image",
-        num_parallel_workers=num_parallel_workers,
-        python_multiprocessing=python_multiprocessing,
-    )
+def get_resize_phases(num_epochs, image_resize, batch_size, resize_schedule=None, scale_batch_size=False):
+    """Splits the training into phases of a constant image size for progressive resizing, e.g. FixRes.
 
-    # duplicate the columns 'image' twice for the auto_augmentation
-    dataset = dataset.map(
-        operations=transforms.Duplicate(),
-        input_columns=["image"],
-        output_columns=["image_clean", "image_aug2"],
-        column_order=["image_clean", "image_aug2", "label"] if pass_column_order else None,
-        num_parallel_workers=num_parallel_workers,
-        python_multiprocessing=python_multiprocessing,
-    )
-    dataset = dataset.map(
-        operations=transforms.Duplicate(),
-        input_columns=["image_clean"],
-        output_columns=["image_clean", "image_aug1"],
-        column_order=["image_clean", "image_aug1", "image_aug2", "label"] if pass_column_order else None,
-        num_parallel_workers=num_parallel_workers,
-        python_multiprocessing=python_multiprocessing,
-    )
+    A loader is created per phase (see `train.py`), with the transforms of the image size of the phase, and
+    the network is compiled again for the new input shape at the start of each phase in graph mode.
 
-    # map the secondary_tfl (auto_augmentation for the image_aug1 and img_aug2)
-    dataset = dataset.map(
-        operations=transform[1],
-        input_columns="image_aug1",
-        num_parallel_workers=num_parallel_workers,
-        python_multiprocessing=python_multiprocessing,
-    )
+    Args:
+        num_epochs (int): the number of epochs of the training.
+        image_resize (int): the image size of the epochs before the first entry of `resize_schedule`, and the
+            size `batch_size` is set for.
+        batch_size (int): the batch size at `image_resize`.
+        resize_schedule (list or None): `[start_epoch, image_resize]` pairs, the image size from the epoch
+            `start_epoch` (counted from 0) on, e.g. `[[0, 128], [30, 192], [50, 224]]`. Default: None.
+        scale_batch_size (bool): scale the batch size with the inverse of the number of pixels, so that the
+            memory of a batch is about the same in every phase. Default: False.
 
-    dataset = dataset.map(
-        operations=transform[1],
-        input_columns="image_aug2",
-        num_parallel_workers=num_parallel_workers,
-        python_multiprocessing=python_multiprocessing,
-    )
+    Returns:
+        A list of dicts with the epochs `[start_epoch, end_epoch)`, the `image_resize` and the `batch_size`
+        of each phase.
+    """
+    sizes = [image_resize] * num_epochs
+    for start_epoch, size in sorted(resize_schedule or [], key=lambda x: x[0]):
+        if not 0 <= start_epoch < num_epochs:
+            raise ValueError(
+                f"The start epoch of the resize schedule should be in [0, {num_epochs}), but got {start_epoch}."
+            )
+        if size <= 0:
+            raise ValueError(f"The image size of the resize schedule should be positive, but got {size}.")
+        sizes[start_epoch:] = [size] * (num_epochs - start_epoch)
+
+    phases = []
+    for epoch, size in enumerate(sizes):
+        if phases and phases[-1]["image_resize"] == size:
+            phases[-1]["end_epoch"] = epoch + 1
+            continue
+        if scale_batch_size:
+            phase_batch_size = max(1, int(batch_size * (image_resize / size) ** 2))
+        else:
+            phase_batch_size = batch_size
+        phases.append(dict(start_epoch=epoch, end_epoch=epoch + 1, image_resize=size, batch_size=phase_batch_size))
+    return phases
+
+
+class AugSplitsTransform:
+    """Applies the secondary transforms returned by `create_transforms(..., separate=True)` twice in a single
+    call, producing the clean image and the two augmented images from one image.
 
-    # map the final_tfl to all the images
+    Args:
+        secondary_tfl (list): the transforms applied to the augmented images only, e.g. auto augmentation.
+    """
 
-    dataset = dataset.map(
-        operations=transform[2],
-        input_columns="image_clean",
-        num_parallel_workers=num_parallel_workers,
-        python_multiprocessing=python_multiprocessing,
-    )
+    def __init__(self, secondary_tfl):
+        self.secondary_tfl = transforms.Compose(secondary_tfl) if secondary_tfl else None
 
+    def __call__(self, image):
+        if self.secondary_tfl is None:
+            return image, image.copy(), image.copy()
+        return image, self.secondary_tfl(image), self.secondary_tfl(image)
+
+
+def map_transform_splits(
+    dataset, transform, num_parallel_workers, python_multiprocessing, pass_column_order, max_rowsize=None
+):
+    primary_tfl, secondary_tfl, final_tfl = transform
+    # map the primary_tfl such as decoding and cropping to all the images
     dataset = dataset.map(
-        operations=transform[2],
-        input_columns="image_aug1",
+        operations=primary_tfl,
+        input_columns="image",
         num_parallel_workers=num_parallel_workers,
         python_multiprocessing=python_multiprocessing,
+        max_rowsize=max_rowsize,
     )
 
+    # produce the clean image and the two augmented images in one map
     dataset = dataset.map(
-        operations=transform[2],
-        input_columns="image_aug2",
+        operations=AugSplitsTransform(secondary_tfl),
+        input_columns="image",
+        output_columns=["image_clean", "image_aug1", "image_aug2"],
         num_parallel_workers=num_parallel_workers,
         python_multiprocessing=python_multiprocessing,
+        max_rowsize=max_rowsize,
+        **(dict(column_order=["image_clean", "image_aug1", "image_aug2", "label"]) if pass_column_order else {}),
     )
 
+    # map the final_tfl to all the images. It is empty if the images are normalized on device, then the secondary_tfl
+    # keeps the augmented images uint8 like the clean one, as `concat_per_batch_map` batches them into one array
+    if final_tfl:
+        for column in ["image_clean", "image_aug1", "image_aug2"]:
+            dataset = dataset.map(
+                operations=final_tfl,
+                input_columns=column,
+                num_parallel_workers=num_parallel_workers,
+                python_multiprocessing=python_multiprocessing,
+                max_rowsize=max_rowsize,
+            )
+
     return dataset
 
 
-def concat_per_batch_map(image_clean, image_aug1, image_aug2, label):
-    image = np.concatenate((image_clean, image_aug1, image_aug2))
-    label = np.concatenate((label, label, label))
+def concat_per_batch_map(image_clean, image_aug1, image_aug2, label, batch_info):
+    batch_size = len(image_clean)
+    image = np.empty((3 * batch_size,) + image_clean[0].shape, dtype=image_clean[0].dtype)
+    for i, images in enumerate((image_clean, image_aug1, image_aug2)):
+        np.stack(images, out=image[i * batch_size : (i + 1) * batch_size])
+    label = np.tile(np.stack(label), 3)
     return image, label
@@ -10,28 +10,37 @@ CutMix: https://github.com/clovaai/CutMix-PyTorch
 
 Hacked together by / Copyright 2020 Ross Wightman
 """
+import threading
+
 import numpy as np
 
-from mindspore import Tensor
-from mindspore import dtype as mstype
-from mindspore import ops as P
+import mindspore as ms
+from mindspore import Tensor, nn, ops
 
 
 def one_hot(x, num_classes, on_value=1.0, off_value=0.0):
     """one hot to label"""
     x = x.reshape(-1)
-    x = np.eye(num_classes)[x]
-    x = np.clip(x, a_min=off_value, a_max=on_value, dtype=np.float32)
-    return x
+    out = np.full((x.shape[0], num_classes), off_value, dtype=np.float32)
+    out[np.arange(x.shape[0]), x] = on_value
+    return out
 
 
 def mixup_target(target, num_classes, lam=1.0, smoothing=0.0):
-    """mixup_target"""
+    """mixup_target
+
+    `lam` is either a scalar for the whole batch or an array with one value per element.
+    """
     off_value = smoothing / num_classes
     on_value = 1.0 - smoothing + off_value
-    y1 = one_hot(target, num_classes, on_value=on_value, off_value=off_value)
-    y2 = one_hot(np.flip(target, axis=0), num_classes, on_value=on_value, off_value=off_value)
-    return y1 * lam + y2 * (1.0 - lam)
+    target = target.reshape(-1)
+    rows = np.arange(target.shape[0])
+    lam = np.asarray(lam, dtype=np.float32).reshape(-1)
+    # equals to lam * one_hot(target) + (1 - lam) * one_hot(flip(target)), without building both matrices
+    out = np.full((target.shape[0], num_classes), off_value, dtype=np.float32)
+    out[rows, target] += (on_value - off_value) * lam
+    out[rows, target[::-1]] += (on_value - off_value) * (1.0 - lam)
+    return out
 
 
 def rand_bbox(img_shape, lam, margin=0.0, count=None):
@@ -41,14 +50,14 @@ def rand_bbox(img_shape, lam, margin=0.0, count=None):
 
     Args:
         img_shape (tuple): Image shape as tuple
-        lam (float): Cutmix lambda value
+        lam (float or np.ndarray): Cutmix lambda value, or one value per bbox of shape (count,)
         margin (float): Percentage of bbox dimension to enforce as margin (reduce amount of box outside image)
         count (int): Number of bbox to generate
     """
     ratio = np.sqrt(1 - lam)
     img_h, img_w = img_shape[-2:]
-    cut_h, cut_w = int(img_h * ratio), int(img_w * ratio)
-    margin_y, margin_x = int(margin * cut_h), int(margin * cut_w)
+    cut_h, cut_w = (img_h * ratio).astype(np.int64), (img_w * ratio).astype(np.int64)
+    margin_y, margin_x = (margin * cut_h).astype(np.int64), (margin * cut_w).astype(np.int64)
     cy = np.random.randint(0 + margin_y, img_h - margin_y, size=count)
     cx = np.random.randint(0 + margin_x, img_w - margin_x, size=count)
     yl = np.clip(cy - cut_h // 2, 0, img_h)
@@ -134,6 +143,16 @@ class Mixup:
         self.mode = mode
         self.correct_lam = correct_lam  # correct lambda based on clipped area for cutmix
         self.mixup_enabled = True  # set false to disable mixing (intended tp be set by train loop)
+        self._local = threading.local()  # scratch buffers, the batch map may run in several threads
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
 
     def _params_per_elem(self, batch_size):
         """_params_per_elem"""
@@ -179,46 +198,77 @@ class Mixup:
             lam = float(lam_mix)
         return lam, use_cutmix
 
+    def _flipped_copy(self, x):
+        """Copy of the batch in reversed order, i.e. the mixing source, kept in a per-thread scratch buffer."""
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None or scratch.shape != x.shape or scratch.dtype != x.dtype:
+            scratch = self._local.scratch = np.empty_like(x)
+        np.copyto(scratch, x[::-1])
+        return scratch
+
+    def _mix_by_params(self, x, lam_batch, use_cutmix, bbox):
+        """Mixes the i-th element with the (batch_size - i - 1)-th element of the original batch in-place,
+        with the per-element lambda, cutmix switch and bbox."""
+        mixed = lam_batch != 1.0
+        if not mixed.any():
+            return
+        x_flipped = self._flipped_copy(x)
+        img_h, img_w = x.shape[-2:]
+
+        cut = mixed & use_cutmix
+        if cut.any():
+            yl, yh, xl, xh = bbox
+            rows, cols = np.arange(img_h), np.arange(img_w)
+            mask_h = (rows >= yl[:, None]) & (rows < yh[:, None]) & cut[:, None]
+            mask_w = (cols >= xl[:, None]) & (cols < xh[:, None])
+            mask = mask_h[:, None, :, None] & mask_w[:, None, None, :]
+            np.copyto(x, x_flipped, where=mask)
+
+        blend = mixed & ~use_cutmix
+        if blend.any():
+            weight = np.where(blend, lam_batch, 1.0).astype(x.dtype).reshape(-1, 1, 1, 1)
+            np.multiply(x, weight, out=x)
+            np.multiply(x_flipped, 1 - weight, out=x_flipped)
+            np.add(x, x_flipped, out=x)
+
+    def _elem_bbox(self, img_shape, lam_batch, use_cutmix):
+        """Generates the bboxes for the cutmix elements and corrects their lambda in-place."""
+        batch_size = lam_batch.shape[0]
+        bbox = tuple(np.zeros(batch_size, dtype=np.int64) for _ in range(4))
+        cut = np.flatnonzero((lam_batch != 1.0) & use_cutmix)
+        if cut.size > 0:
+            cut_bbox, lam = cutmix_bbox_and_lam(
+                img_shape,
+                lam_batch[cut],
+                ratio_minmax=self.cutmix_minmax,
+                correct_lam=self.correct_lam,
+                count=cut.size,
+            )
+            for b, cb in zip(bbox, cut_bbox):
+                b[cut] = cb
+            lam_batch[cut] = lam
+        return bbox
+
     def _mix_elem(self, x):
         """_mix_elem"""
         batch_size = len(x)
         lam_batch, use_cutmix = self._params_per_elem(batch_size)
-        x_orig = x.clone()  # need to keep an unmodified original for mixing source
-        for i in range(batch_size):
-            j = batch_size - i - 1
-            lam = lam_batch[i]
-            if lam != 1.0:
-                if use_cutmix[i]:
-                    (yl, yh, xl, xh), lam = cutmix_bbox_and_lam(
-                        x[i].shape, lam, ratio_minmax=self.cutmix_minmax, correct_lam=self.correct_lam
-                    )
-                    x[i][:, yl:yh, xl:xh] = x_orig[j][:, yl:yh, xl:xh]
-                    lam_batch[i] = lam
-                else:
-                    x[i] = x[i] * lam + x_orig[j] * (1 - lam)
-        return P.ExpandDims()(Tensor(lam_batch, dtype=mstype.float32), 1)
+        bbox = self._elem_bbox(x.shape, lam_batch, use_cutmix)
+        self._mix_by_params(x, lam_batch, use_cutmix, bbox)
+        return lam_batch
 
     def _mix_pair(self, x):
         """_mix_pair"""
         batch_size = len(x)
         lam_batch, use_cutmix = self._params_per_elem(batch_size // 2)
-        x_orig = x.clone()  # need to keep an unmodified original for mixing source
-        for i in range(batch_size // 2):
-            j = batch_size - i - 1
-            lam = lam_batch[i]
-            if lam != 1.0:
-                if use_cutmix[i]:
-                    (yl, yh, xl, xh), lam = cutmix_bbox_and_lam(
-                        x[i].shape, lam, ratio_minmax=self.cutmix_minmax, correct_lam=self.correct_lam
-                    )
-                    x[i][:, yl:yh, xl:xh] = x_orig[j][:, yl:yh, xl:xh]
-                    x[j][:, yl:yh, xl:xh] = x_orig[i][:, yl:yh, xl:xh]
-                    lam_batch[i] = lam
-                else:
-                    x[i] = x[i] * lam + x_orig[j] * (1 - lam)
-                    x[j] = x[j] * lam + x_orig[i] * (1 - lam)
+        bbox = self._elem_bbox(x.shape, lam_batch, use_cutmix)
+        # the i-th and (batch_size - i - 1)-th elements share the same params, which makes pair mode the elem mode
+        # with mirrored params
         lam_batch = np.concatenate((lam_batch, lam_batch[::-1]))
-        return P.ExpandDims()(Tensor(lam_batch, dtype=mstype.float32), 1)
+        use_cutmix = np.concatenate((use_cutmix, use_cutmix[::-1]))
+        bbox = tuple(np.concatenate((b, b[::-1])) for b in bbox)
+        self._mix_by_params(x, lam_batch, use_cutmix, bbox)
+        return lam_batch
 
     def _mix_batch(self, x):
         """_mix_batch"""
@@ -231,7 +281,8 @@ class Mixup:
             )
             x[:, :, yl:yh, xl:xh] = np.flip(x, axis=0)[:, :, yl:yh, xl:xh]
         else:
-            x_flipped = np.flip(x, axis=0) * (1.0 - lam)
+            x_flipped = self._flipped_copy(x)
+            x_flipped *= 1.0 - lam
             x *= lam
             x += x_flipped
         return lam
@@ -247,4 +298,116 @@ class Mixup:
         else:
             lam = self._mix_batch(x)
         target = mixup_target(target, self.num_classes, lam, self.label_smoothing)
-        return x.astype(np.float32), target.astype(np.float32)
+        return x.astype(np.float32, copy=False), target
+
+
+class MixupCell(nn.Cell):
+    """Mixup/Cutmix on device, applying the same params to the whole batch (the 'batch' mode of `Mixup`).
+
+    It takes the batch of images and the integer labels, and returns the mixed images and the mixed soft
+    labels, so it can be run inside the compiled train step instead of a host-side `dataset.map`.
+    The random params are drawn by stateful random kernels seeded by `seed`, whose random stream advances
+    by one draw per step, i.e. step `k` of a run always gets the same params for the same `seed`.
+
+    Args:
+        mixup_alpha (float): mixup alpha value, mixup is active if > 0.
+        cutmix_alpha (float): cutmix alpha value, cutmix is active if > 0.
+        prob (float): probability of applying mixup or cutmix per batch
+        switch_prob (float): probability of switching to cutmix instead of mixup when both are active
+        correct_lam (bool): apply lambda correction when cutmix bbox clipped by image borders
+        label_smoothing (float): apply label smoothing to the mixed target tensor
+        num_classes (int): number of classes for target
+        seed (int): random seed of the random kernels. Set a different seed on each device.
+        channels_last (bool): the images are NHWC uint8 batches, normalized on device after mixing by
+            `mindcv.models.layers.InputNormalize`. They are mixed in float32, which commutes with normalization.
+    """
+
+    def __init__(
+        self,
+        mixup_alpha=1.0,
+        cutmix_alpha=0.0,
+        prob=1.0,
+        switch_prob=0.5,
+        correct_lam=True,
+        label_smoothing=0.1,
+        num_classes=1000,
+        seed=0,
+        channels_last=False,
+    ):
+        super().__init__()
+        if mixup_alpha <= 0.0 and cutmix_alpha <= 0.0:
+            raise ValueError("One of mixup_alpha > 0. and cutmix_alpha > 0. should be true.")
+        self.use_mixup = mixup_alpha > 0.0
+        self.use_cutmix = cutmix_alpha > 0.0
+        self.mix_prob = prob
+        self.switch_prob = switch_prob
+        self.correct_lam = correct_lam
+        self.num_classes = num_classes
+        self.channels_last = channels_last
+        self.off_value = Tensor(label_smoothing / num_classes, ms.float32)
+        self.on_value = Tensor(1.0 - label_smoothing + label_smoothing / num_classes, ms.float32)
+        # Beta(a, a) is drawn as G1 / (G1 + G2) with G1, G2 ~ Gamma(a), one pair for mixup and one for cutmix
+        alpha = [mixup_alpha if self.use_mixup else 1.0, cutmix_alpha if self.use_cutmix else 1.0]
+        self.alpha = Tensor(alpha, ms.float32)
+        self.gamma_shape = Tensor([2], ms.int32)
+        self.cutmix_only = Tensor(self.use_cutmix, ms.bool_)
+        self.gamma = ops.RandomGamma(seed=seed, seed2=1)
+        self.uniform = ops.UniformReal(seed=seed, seed2=2)
+
+    def construct(self, x, label):
+        # uniform draws: apply prob, switch prob, bbox center y and x
+        u = self.uniform((4,))
+        g = self.gamma(self.gamma_shape, self.alpha)
+        beta = g[0] / (g[0] + g[1])
+        lam_mixup, lam_cutmix = beta[0], beta[1]
+
+        if self.use_mixup and self.use_cutmix:
+            use_cutmix = u[1] < self.switch_prob
+        else:
+            use_cutmix = self.cutmix_only
+        lam = ops.select(use_cutmix, lam_cutmix, lam_mixup)
+        lam = ops.select(u[0] < self.mix_prob, lam, ops.ones_like(lam))
+
+        if self.channels_last:
+            x = ops.cast(x, ms.float32)
+        x_flipped = ops.flip(x, (0,))
+        if self.use_cutmix:
+            if self.channels_last:
+                img_h, img_w = x.shape[1], x.shape[2]
+            else:
+                img_h, img_w = x.shape[-2], x.shape[-1]
+            ratio = ops.sqrt(1.0 - lam)
+            cut_h = ops.floor(img_h * ratio)
+            cut_w = ops.floor(img_w * ratio)
+            cy = ops.floor(u[2] * img_h)
+            cx = ops.floor(u[3] * img_w)
+            yl = ops.clip(cy - ops.floor(cut_h / 2), 0, img_h)
+            yh = ops.clip(cy + ops.floor(cut_h / 2), 0, img_h)
+            xl = ops.clip(cx - ops.floor(cut_w / 2), 0, img_w)
+            xh = ops.clip(cx + ops.floor(cut_w / 2), 0, img_w)
+            rows = ops.arange(img_h, dtype=ms.float32).reshape(-1, 1)
+            cols = ops.arange(img_w, dtype=ms.float32).reshape(1, -1)
+            mask = ops.logical_and(
+                ops.logical_and(rows >= yl, rows < yh),
+                ops.logical_and(cols >= xl, cols < xh),
+            )
+            if self.channels_last:
+                mask = mask.reshape(img_h, img_w, 1)
+            mask = ops.logical_and(mask, use_cutmix)
+            x_cut = ops.select(ops.broadcast_to(mask, x.shape), x_flipped, x)
+            if self.correct_lam:
+                lam_cut = 1.0 - (yh - yl) * (xh - xl) / (img_h * img_w)
+            else:
+                lam_cut = lam
+        else:
+            x_cut = x
+            lam_cut = lam
+
+        lam_x = ops.cast(lam, x.dtype)
+        x_mix = x * lam_x + x_flipped * (1.0 - lam_x)
+        x = ops.select(ops.broadcast_to(use_cutmix, x.shape), x_cut, x_mix)
+        lam = ops.select(use_cutmix, lam_cut, lam)
+
+        target = ops.one_hot(label, self.num_classes, self.on_value, self.off_value)
+        target = target * lam + ops.flip(target, (0,)) * (1.0 - lam)
+        return x, target
@@ -0,0 +1,134 @@
+"""
+Decode at a reduced resolution
+
+libjpeg decodes a JPEG image at 1/2, 1/4 or 1/8 of its resolution by scaling in the DCT domain, at a fraction
+of the cost of a full decode. The ops here pick the largest of these scales that keeps the region used by the
+following crop and resize above the target size, which cuts the CPU time and the memory of decoding large source
+images, e.g. most of ImageNet. Images of other formats are decoded at full resolution.
+"""
+
+import io
+import math
+import random
+
+import numpy as np
+from PIL import Image
+
+from mindspore.dataset.vision import Inter
+
+__all__ = [
+    "ReducedDecode",
+    "ReducedRandomCropDecodeResize",
+]
+
+_PIL_INTERPOLATIONS = {
+    Inter.NEAREST: Image.NEAREST,
+    Inter.ANTIALIAS: Image.LANCZOS,
+    Inter.BILINEAR: Image.BILINEAR,
+    Inter.LINEAR: Image.BILINEAR,
+    Inter.BICUBIC: Image.BICUBIC,
+    Inter.CUBIC: Image.BICUBIC,
+    Inter.AREA: Image.BOX,
+    Inter.PILCUBIC: Image.BICUBIC,
+}
+
+
+def _open(data):
+    """Opens encoded image bytes lazily, only the header is read."""
+    return Image.open(io.BytesIO(np.asarray(data).tobytes()))
+
+
+def _draft(img, width, height):
+    """Sets the decoder of `img` to the largest reduction keeping it at least `width` x `height`, and returns the
+    factors from the full resolution to the reduced one."""
+    full_width, full_height = img.size
+    if img.format == "JPEG":
+        img.draft("RGB", (max(int(width), 1), max(int(height), 1)))
+    return img.size[0] / full_width, img.size[1] / full_height
+
+
+def _to_array(img):
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return np.asarray(img)
+
+
+class ReducedDecode:
+    """Decodes an image at the largest JPEG reduction (1, 1/2, 1/4 or 1/8) whose shorter side is still at least
+    `min_size`, e.g. the resize size of the evaluation transforms.
+
+    Args:
+        min_size (int or tuple): the minimum shorter side, or the minimum (height, width).
+    """
+
+    def __init__(self, min_size):
+        self.min_size = min_size
+
+    def __call__(self, data):
+        img = _open(data)
+        width, height = img.size
+        if isinstance(self.min_size, (tuple, list)):
+            min_height, min_width = self.min_size
+        else:
+            # the reduction keeps both sides above the shorter side target
+            min_height = min_width = self.min_size
+        _draft(img, min(width, min_width), min(height, min_height))
+        return _to_array(img)
+
+
+class ReducedRandomCropDecodeResize:
+    """Equivalent of `vision.RandomCropDecodeResize` decoding at a reduced resolution: the crop is drawn on the
+    full-resolution size read from the header, then the image is decoded at the largest JPEG reduction keeping the
+    crop at least `size`, and the crop is resized to `size` from the reduced image.
+
+    Args:
+        size (int or tuple): the output size, or the output (height, width).
+        scale (tuple): range of the area of the crop relative to the image. Default: (0.08, 1.0).
+        ratio (tuple): range of the aspect ratio of the crop. Default: (0.75, 1.333).
+        interpolation (Inter): the interpolation of the resize. Default: Inter.BILINEAR.
+        max_attempts (int): the number of draws of a crop before falling back to a center crop. Default: 10.
+    """
+
+    def __init__(self, size, scale=(0.08, 1.0), ratio=(0.75, 1.333), interpolation=Inter.BILINEAR, max_attempts=10):
+        self.size = tuple(size) if isinstance(size, (tuple, list)) else (size, size)
+        self.scale = scale
+        self.ratio = ratio
+        self.interpolation = _PIL_INTERPOLATIONS[interpolation]
+        self.max_attempts = max_attempts
+
+    def get_params(self, width, height):
+        """Draws a crop (left, top, width, height) on an image of `width` x `height`."""
+        area = width * height
+        log_ratio = (math.log(self.ratio[0]), math.log(self.ratio[1]))
+        for _ in range(self.max_attempts):
+            target_area = area * random.uniform(*self.scale)
+            aspect_ratio = math.exp(random.uniform(*log_ratio))
+            crop_width = int(round(math.sqrt(target_area * aspect_ratio)))
+            crop_height = int(round(math.sqrt(target_area / aspect_ratio)))
+            if 0 < crop_width <= width and 0 < crop_height <= height:
+                left = random.randint(0, width - crop_width)
+                top = random.randint(0, height - crop_height)
+                return left, top, crop_width, crop_height
+        # fall back to a center crop within the ratio range
+        in_ratio = width / height
+        if in_ratio < min(self.ratio):
+            crop_width, crop_height = width, int(round(width / min(self.ratio)))
+        elif in_ratio > max(self.ratio):
+            crop_width, crop_height = int(round(height * max(self.ratio))), height
+        else:
+            crop_width, crop_height = width, height
+        return (width - crop_width) // 2, (height - crop_height) // 2, crop_width, crop_height
+
+    def __call__(self, data):
+        img = _open(data)
+        width, height = img.size
+        left, top, crop_width, crop_height = self.get_params(width, height)
+        out_height, out_width = self.size
+        # the reduction of the image that keeps the crop at least the output size
+        reduction = min(crop_width / out_width, crop_height / out_height, 8.0)
+        fx, fy = _draft(img, width / max(reduction, 1.0), height / max(reduction, 1.0))
+        box = (left * fx, top * fy, (left + crop_width) * fx, (top + crop_height) * fy)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img = img.resize((out_width, out_height), resample=self.interpolation, box=box)
+        return np.asarray(img)
@@ -0,0 +1,189 @@
+"""
+Local shard cache
+
+Remote or network-mounted dataset files, e.g. the tar shards of `TarShardDataset`, are copied once to the local
+disk under `get_dataset_download_root()` and read from there. The cache holds at most `max_bytes`, evicting the
+least recently used files first, and is shared by all the processes of a host, e.g. the ranks of a node:
+
+- a file is fetched by a single process, under an exclusive lock of its own, while the other processes asking
+  for it wait for the lock and then find it in the cache;
+- a file is written to a temporary name and renamed into the cache once complete, so that a reader never sees
+  a partial file, even after a crash;
+- the eviction runs under a lock of the whole cache and skips the files being fetched. A file evicted while it
+  is read stays readable on POSIX systems until it is closed.
+
+A downloaded file is verified by its sha256, e.g. from the index of the tar shards, which is required unless the
+caller has no hash of the file, e.g. for the index itself, see `DownLoad.download_file`.
+
+The locks are `fcntl` locks, on systems without `fcntl` the cache is not safe for concurrent processes.
+"""
+
+import contextlib
+import hashlib
+import logging
+import os
+import shutil
+from typing import Optional
+
+from mindcv.utils.download import DownLoad
+
+from .dataset_download import get_dataset_download_root
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+__all__ = [
+    "ShardCache",
+    "file_lock",
+]
+
+_logger = logging.getLogger(__name__)
+
+_LOCK_DIR = ".locks"
+_TMP_SUFFIX = ".tmp"
+_PARTIAL_SUFFIXES = (_TMP_SUFFIX, ".partial", ".partial.json")
+
+
+def is_url(path: str) -> bool:
+    return "://" in path
+
+
+@contextlib.contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """Holds an exclusive lock on the file `path`, created if needed, shared by the processes of a host.
+
+    If `blocking` is False, yields False without waiting when the lock is held by another process.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class ShardCache:
+    """Byte-bounded LRU cache of dataset files on the local disk, shared by the processes of a host.
+
+    The recency of a cached file is its modification time, set on every access, so that the cache has no index
+    to keep consistent and survives restarts.
+
+    Args:
+        root: the cache directory. Default: None, `shards` under `get_dataset_download_root()`.
+        max_bytes: the size budget of the cache in bytes. Default: None, unbounded.
+        buffer_size: copy buffer size in bytes of the files fetched from a local path. Default: 16 MiB.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        buffer_size: int = 16 * 1024 * 1024,
+    ):
+        if root is None:
+            root = os.path.join(get_dataset_download_root(), "shards")
+        self.root = root
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        os.makedirs(os.path.join(root, _LOCK_DIR), exist_ok=True)
+
+    def cache_path(self, source: str) -> str:
+        """The path of `source` in the cache, its name prefixed by a hash of the full source to avoid clashes."""
+        digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.root, f"{digest}-{os.path.basename(source.rstrip('/'))}")
+
+    def _lock_path(self, path: str) -> str:
+        return os.path.join(self.root, _LOCK_DIR, os.path.basename(path) + ".lock")
+
+    def get(self, source: str, sha256: Optional[str] = None, allow_unverified: bool = False) -> str:
+        """Returns the local path of `source`, a url or a file path, fetching it into the cache if needed. A
+        download is verified by `sha256`, which is required unless `allow_unverified`."""
+        path = self.cache_path(source)
+        if not os.path.isfile(path):
+            with file_lock(self._lock_path(path)):
+                # another process may have fetched it while we were waiting for the lock
+                if not os.path.isfile(path):
+                    self._fetch(source, path, sha256, allow_unverified)
+            self.evict(keep=path)
+        # the modification time records the last access for the LRU eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:  # evicted by another process in between
+            return self.get(source, sha256, allow_unverified)
+        return path
+
+    def open(self, source: str, buffering: int = -1, sha256: Optional[str] = None):
+        """Opens the cached copy of `source` for reading, fetching it again if it is evicted in between."""
+        for _ in range(3):
+            try:
+                return open(self.get(source, sha256), "rb", buffering=buffering)
+            except FileNotFoundError:
+                continue
+        raise RuntimeError(f"`{source}` is evicted from the cache before it is opened, the cache may be too small.")
+
+    def _fetch(self, source, path, sha256=None, allow_unverified=False):
+        if is_url(source):
+            # downloaded into `path + ".partial"`, resumed after an interruption and renamed once complete and verified
+            DownLoad().download_file(source, path, sha256=sha256, allow_unverified=allow_unverified)
+        else:
+            tmp_path = f"{path}.{os.getpid()}{_TMP_SUFFIX}"
+            try:
+                with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, self.buffer_size)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        _logger.debug(f"Cached {source} at {path}.")
+
+    def entries(self):
+        """The cached files as (path, size, last access time), the least recently used first."""
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if not entry.is_file() or entry.name.endswith(_PARTIAL_SUFFIXES):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda e: e[2])
+
+    def size(self) -> int:
+        """The number of bytes held by the cache."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep: Optional[str] = None):
+        """Removes the least recently used files until the cache fits in `max_bytes`, except `keep`."""
+        if self.max_bytes is None:
+            return
+        with file_lock(os.path.join(self.root, _LOCK_DIR, "evict.lock")):
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                with file_lock(self._lock_path(path), blocking=False) as locked:
+                    if not locked:  # being fetched again
+                        continue
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+            if total > self.max_bytes:
+                _logger.warning(
+                    f"The shard cache {self.root} holds {total} bytes, over its budget of {self.max_bytes} bytes."
+                )
@@ -0,0 +1,363 @@
+"""
+Streaming dataset over tar shards
+
+A dataset is stored as a few large tar archives (WebDataset-style shards) holding the files of every sample
+next to each other, e.g. `000001.jpg` and `000001.cls`. The shards are read sequentially with large buffered
+reads instead of opening millions of small files, and a sample is shuffled through an in-memory buffer instead
+of being read at a random position, so that the shards can be staged from an object store as they are. Remote
+shards, given by urls, are read through a `ShardCache` on the local disk.
+
+The number of samples of every shard and the number of classes are read from a small sidecar index next to the
+shards, written once by `write_tar_shard_index`, so that sizing the dataset reads no shard. Without an index,
+local shards are counted by reading their headers in place, and remote shards are not supported.
+
+Layout of a sample in a shard, members sharing the same key (the path up to the first dot of the file name):
+    train-000000.tar
+    ├── n01440764/000001.jpg    # the encoded image, any of `IMAGE_EXTENSIONS`
+    ├── n01440764/000001.cls    # the class index as a decimal string
+    ├── n01440764/000002.jpg
+    ├── n01440764/000002.cls
+    └── ....
+
+Layout of the sidecar index `index.json`, the sha256 of a shard verifies its download:
+    {"version": 1, "num_classes": 1000, "shards": {"train-000000.tar": {"num_samples": 8700, "sha256": "..."}}}
+"""
+
+import glob
+import json
+import logging
+import os
+import re
+import tarfile
+import urllib.error
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from mindcv.utils.download import DownLoad
+
+from .shard_cache import ShardCache, is_url
+
+__all__ = [
+    "TarShardDataset",
+    "write_tar_shard_index",
+]
+
+_logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ("jpg", "jpeg", "png", "bmp", "webp")
+LABEL_EXTENSION = "cls"
+_SHARD_PATTERNS = ("*.tar", "*.tar.gz", "*.tgz")
+_BRACE_RANGE = re.compile(r"\{(\d+)\.\.(\d+)\}")
+INDEX_FILE = "index.json"
+_INDEX_VERSION = 1
+
+
+def list_tar_shards(root: str):
+    """The tar shards of a directory, sorted by name."""
+    return sorted(path for pattern in _SHARD_PATTERNS for path in glob.glob(os.path.join(root, pattern)))
+
+
+def expand_shard_pattern(pattern: str):
+    """Expands the numeric ranges of a shard pattern, e.g. `train-{000000..000146}.tar`, keeping the width of the
+    lower bound."""
+    match = _BRACE_RANGE.search(pattern)
+    if match is None:
+        return [pattern]
+    start, stop = match.groups()
+    head, tail = pattern[: match.start()], pattern[match.end() :]
+    return [
+        path
+        for i in range(int(start), int(stop) + 1)
+        for path in expand_shard_pattern(f"{head}{i:0{len(start)}d}{tail}")
+    ]
+
+
+def is_tar_shard_dir(root: str) -> bool:
+    return os.path.isdir(root) and len(list_tar_shards(root)) > 0
+
+
+def _split_name(name):
+    """Splits a member name into the key of its sample and its lowercase extension."""
+    dirname, basename = os.path.split(name)
+    key, _, extension = basename.partition(".")
+    return os.path.join(dirname, key), extension.lower()
+
+
+def _shard_name(path):
+    """The name of a shard in the index, the last component of its path or url."""
+    return path.rstrip("/").rsplit("/", 1)[-1] if is_url(path) else os.path.basename(path)
+
+
+def _sidecar_index(path):
+    """The index next to the shard, the shard pattern or in the shard directory `path`."""
+    if is_url(path):
+        return path.rsplit("/", 1)[0] + "/" + INDEX_FILE
+    if os.path.isdir(path):
+        return os.path.join(path, INDEX_FILE)
+    return os.path.join(os.path.dirname(path), INDEX_FILE)
+
+
+def _read_labels(path):
+    """The (key, label) of the samples of a local shard, read in place without reading the images."""
+    label_of, has_image = {}, set()
+    # random access mode, the data of the images is skipped by seeking
+    with tarfile.open(path, mode="r:*") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            key, extension = _split_name(member.name)
+            if extension == LABEL_EXTENSION:
+                label_of[key] = int(tar.extractfile(member).read())
+            elif extension in IMAGE_EXTENSIONS:
+                has_image.add(key)
+    return [(key, label_of[key]) for key in sorted(has_image & label_of.keys())]
+
+
+def write_tar_shard_index(root: str, index_path: Optional[str] = None) -> dict:
+    """Writes the sidecar index of the tar shards of the local directory `root`, i.e. the number of samples and
+    the sha256 of every shard and the number of classes, read by `TarShardDataset` instead of the shards. The
+    shards and the index can then be uploaded to an object store together.
+
+    Args:
+        root: the directory holding the `*.tar` shards.
+        index_path: the path of the index. Default: None, `index.json` in `root`.
+
+    Returns:
+        The index.
+    """
+    shards = list_tar_shards(root)
+    if not shards:
+        raise ValueError(f"No tar shards found in `{root}`.")
+    entries, num_classes = {}, 0
+    for path in shards:
+        labels = [label for _, label in _read_labels(path)]
+        entries[_shard_name(path)] = dict(num_samples=len(labels), sha256=DownLoad.calculate_sha256(path))
+        num_classes = max(num_classes, max(labels, default=-1) + 1)
+    index = dict(version=_INDEX_VERSION, num_classes=num_classes, shards=entries)
+
+    index_path = index_path or os.path.join(root, INDEX_FILE)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, index_path)
+    _logger.info(f"Indexed {sum(e['num_samples'] for e in entries.values())} samples of {len(shards)} tar shards.")
+    return index
+
+
+class TarShardDataset:
+    """Iterable source over tar shards, to be wrapped by `mindspore.dataset.GeneratorDataset`. It yields the
+    same columns as `ImageFolderDataset`, i.e. the encoded image as a 1-D uint8 array and its label.
+
+    Each shard is read once per epoch, sequentially and in stream mode, through a read buffer of `buffer_size`
+    bytes. The shards are split among the ranks by `shards[shard_id::num_shards]`, so every rank reads its own
+    files, and each rank yields the same number of samples per epoch, the smallest over the ranks, so that
+    distributed training runs the same number of steps on every rank. The samples are shuffled by visiting the
+    shards of the rank in a random order and by drawing the samples from a buffer of `shuffle_buffer` samples,
+    seeded by `seed + epoch`.
+
+    The numbers of samples are read from the sidecar index written by `write_tar_shard_index`, required for
+    remote shards, so that no rank reads the shards of the other ranks. The shards downloaded into the cache are
+    verified by the sha256 of the index.
+
+    Args:
+        shards: a directory holding the `*.tar` shards, a glob pattern, a url pattern with numeric ranges, e.g.
+            `https://host/train-{000000..000146}.tar`, or a list of shard paths or urls.
+        shuffle: whether to shuffle the shards and the samples. Default: True.
+        num_shards: the number of ranks the shards are split among. Default: None, no split.
+        shard_id: the rank of this process within `num_shards`. Default: None.
+        shuffle_buffer: the number of samples of the shuffle buffer. Default: 1000.
+        buffer_size: read buffer size in bytes. Default: 16 MiB.
+        seed: the shuffle order of epoch `e` is seeded by `seed + e`. Default: 0.
+        cache: the local cache the shards are read through, required for urls. Default: None, the shards are
+            read in place.
+        index: the path or url of the sidecar index. Default: None, `index.json` next to the shards.
+    """
+
+    column_names = ["image", "label"]
+
+    def __init__(
+        self,
+        shards: Union[str, Sequence[str]],
+        shuffle: bool = True,
+        num_shards: Optional[int] = None,
+        shard_id: Optional[int] = None,
+        shuffle_buffer: int = 1000,
+        buffer_size: int = 16 * 1024 * 1024,
+        seed: int = 0,
+        cache: Optional[ShardCache] = None,
+        index: Optional[str] = None,
+    ):
+        if index is None:
+            index = _sidecar_index(shards if isinstance(shards, str) else shards[0])
+        if isinstance(shards, str):
+            if is_url(shards):
+                shards = expand_shard_pattern(shards)
+            elif os.path.isdir(shards):
+                shards = list_tar_shards(shards)
+            else:
+                shards = sorted(path for pattern in expand_shard_pattern(shards) for path in glob.glob(pattern))
+        self.shards = list(shards)
+        if not self.shards:
+            raise ValueError("No tar shards found.")
+        if cache is None and any(is_url(path) for path in self.shards):
+            raise ValueError("Remote tar shards are read through a local cache, please pass a `ShardCache`.")
+        self.cache = cache
+        self.num_shards = num_shards or 1
+        self.shard_id = shard_id or 0
+        if not 0 <= self.shard_id < self.num_shards:
+            raise ValueError(f"shard_id should be in [0, {self.num_shards}), but got {self.shard_id}.")
+        if len(self.shards) < self.num_shards:
+            raise ValueError(
+                f"The {len(self.shards)} tar shards can not be split among {self.num_shards} ranks, "
+                f"please write at least one shard per rank."
+            )
+        self.shuffle = shuffle
+        self.shuffle_buffer = max(int(shuffle_buffer), 1)
+        self.buffer_size = buffer_size
+        self.seed = seed
+        self.epoch = 0
+        self.index = index
+        self._shard_sizes = None
+        self._num_classes = None
+        self._shard_sha256 = {}
+        self._shard_labels = None
+
+    @property
+    def rank_shards(self):
+        """The shards read by this rank."""
+        return self.shards[self.shard_id :: self.num_shards]
+
+    def _load_index(self):
+        """The sidecar index, None if there is none."""
+        path = self.index
+        if is_url(path):
+            if self.cache is None:
+                raise ValueError("A remote index is read through a local cache, please pass a `ShardCache`.")
+            try:
+                # the index is the source of the hashes of the shards, there is none of its own
+                path = self.cache.get(path, allow_unverified=True)
+            except urllib.error.HTTPError as e:
+                if e.code != 404:
+                    raise
+                return None
+        elif not os.path.isfile(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        missing = [path for path in self.shards if _shard_name(path) not in index["shards"]]
+        if missing:
+            raise ValueError(
+                f"The index {self.index} has no entry for {len(missing)} of the shards, e.g. `{missing[0]}`, "
+                "please write it again by `write_tar_shard_index`."
+            )
+        return index
+
+    def _read_sizes(self):
+        index = self._load_index()
+        if index is not None:
+            self._shard_sizes = [index["shards"][_shard_name(path)]["num_samples"] for path in self.shards]
+            self._num_classes = index["num_classes"]
+            self._shard_sha256 = {path: index["shards"][_shard_name(path)].get("sha256") for path in self.shards}
+            unverified = [path for path in self.shards if is_url(path) and self._shard_sha256[path] is None]
+            if unverified:
+                raise ValueError(
+                    f"The index {self.index} has no sha256 of {len(unverified)} of the remote shards, e.g. "
+                    f"`{unverified[0]}`, which verifies their download. Please write it again by "
+                    "`write_tar_shard_index`."
+                )
+            return
+        if any(is_url(path) for path in self.shards):
+            raise ValueError(
+                f"The tar shards have no index at {self.index}, which remote shards require so that they are not "
+                "downloaded to be counted. Please write it by `write_tar_shard_index` next to the shards."
+            )
+        _logger.info(f"Counting the samples of {len(self.shards)} tar shards, which `write_tar_shard_index` avoids.")
+        self._shard_sizes = [len(labels) for labels in self.shard_labels]
+        self._num_classes = int(max(labels.max(initial=-1) for labels in self.shard_labels)) + 1
+
+    @property
+    def shard_sizes(self):
+        """The number of samples of every shard, from the index or counted once from the local shards."""
+        if self._shard_sizes is None:
+            self._read_sizes()
+        return self._shard_sizes
+
+    @property
+    def shard_labels(self):
+        """The labels of the samples of every local shard, read once from the headers and the label members."""
+        if self._shard_labels is None:
+            if any(is_url(path) for path in self.shards):
+                raise ValueError("The labels of remote tar shards are not read, they would be downloaded.")
+            self._shard_labels = [
+                np.array([label for _, label in _read_labels(path)], np.int32) for path in self.shards
+            ]
+        return self._shard_labels
+
+    @property
+    def num_classes(self):
+        if self._num_classes is None:
+            self._read_sizes()
+        return self._num_classes
+
+    def _open(self, path, buffering=-1):
+        if self.cache is not None:
+            if self._shard_sizes is None:  # the sha256 of the shards are read along with their sizes
+                self._read_sizes()
+            return self.cache.open(path, buffering=buffering, sha256=self._shard_sha256.get(path))
+        return open(path, "rb", buffering=buffering)
+
+    def _read_shard(self, path):
+        """Yields the (image, label) of the samples of a shard, reading it sequentially."""
+        key, image, label = None, None, None
+        with self._open(path, self.buffer_size) as f, tarfile.open(fileobj=f, mode="r|*") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                member_key, extension = _split_name(member.name)
+                if member_key != key:
+                    if image is not None and label is not None:
+                        yield image, label
+                    key, image, label = member_key, None, None
+                if extension == LABEL_EXTENSION:
+                    label = np.int32(int(tar.extractfile(member).read()))
+                elif extension in IMAGE_EXTENSIONS:
+                    image = np.frombuffer(tar.extractfile(member).read(), dtype=np.uint8)
+        if image is not None and label is not None:
+            yield image, label
+
+    def _samples(self, rng):
+        shards = self.rank_shards
+        if rng is not None:
+            shards = [shards[i] for i in rng.permutation(len(shards))]
+        for path in shards:
+            yield from self._read_shard(path)
+
+    def __iter__(self):
+        rng = np.random.RandomState(seed=self.seed + self.epoch) if self.shuffle else None
+        self.epoch += 1
+        samples = self._samples(rng)
+        if rng is not None:
+            samples = self._shuffle(samples, rng)
+        for _, sample in zip(range(len(self)), samples):
+            yield sample
+
+    def _shuffle(self, samples, rng):
+        """Draws the samples at random from a buffer refilled by the stream."""
+        buffer = []
+        for sample in samples:
+            if len(buffer) < self.shuffle_buffer:
+                buffer.append(sample)
+                continue
+            i = rng.randint(len(buffer))
+            yield buffer[i]
+            buffer[i] = sample
+        for i in rng.permutation(len(buffer)):
+            yield buffer[i]
+
+    def __len__(self):
+        counts = self.shard_sizes
+        return min(sum(counts[rank :: self.num_shards]) for rank in range(self.num_shards))
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
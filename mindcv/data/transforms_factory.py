@@ -14,11 +14,15 @@ from .auto_augment import (
     trivial_augment_wide_transform,
 )
 from .constants import DEFAULT_CROP_PCT, IMAGENET_DEFAULT_MEAN, IMAGENET_DEFAULT_STD
+from .reduced_decode import ReducedDecode, ReducedRandomCropDecodeResize
 
 __all__ = [
     "create_transforms",
 ]
 
+# datasets of encoded images, transformed by the ImageNet pipeline
+_IMAGENET_STYLE_DATASETS = ("imagenet", "", "packed", "tar")
+
 
 def transforms_imagenet_train(
     image_resize=224,
@@ -37,16 +41,28 @@ def transforms_imagenet_train(
     re_value=0,
     re_max_attempts=10,
     separate=False,
+    reduced_decode=False,
+    normalize_on_device=False,
 ):
-    """Transform operation list when training on ImageNet."""
+    """Transform operation list when training on ImageNet.
+
+    If `reduced_decode` is True, JPEG images are decoded at the largest reduction (1/2, 1/4, 1/8) keeping the
+    random crop at least `image_resize`, see `ReducedRandomCropDecodeResize`.
+    If `normalize_on_device` is True, the images are output as HWC uint8, without Normalize and HWC2CHW, which
+    are done on device by `mindcv.models.layers.InputNormalize`.
+    """
+    if normalize_on_device and re_prob > 0.0:
+        raise ValueError("Random erasing is applied to normalized CHW images, it does not support normalize_on_device.")
+
     # Define map operations for training dataset
     if hasattr(Inter, interpolation.upper()):
         interpolation = getattr(Inter, interpolation.upper())
     else:
         interpolation = Inter.BILINEAR
 
+    crop_decode_resize = ReducedRandomCropDecodeResize if reduced_decode else vision.RandomCropDecodeResize
     primary_tfl = [
-        vision.RandomCropDecodeResize(
+        crop_decode_resize(
             size=image_resize,
             scale=scale,
             ratio=ratio,
@@ -78,7 +94,8 @@ def transforms_imagenet_train(
             secondary_tfl += [trivial_augment_wide_transform(auto_augment, augement_params)]
         elif auto_augment.startswith("augmix"):
             augement_params["translate_pct"] = 0.3
-            secondary_tfl += [augment_and_mix_transform(auto_augment, augement_params)]
+            # the mixed images are float32, they are rounded to uint8 like the other images normalized on device
+            secondary_tfl += [augment_and_mix_transform(auto_augment, augement_params, uint8=normalize_on_device)]
         else:
             assert False, "Unknown auto augment policy (%s)" % auto_augment
     elif color_jitter is not None:
@@ -91,10 +108,11 @@ def transforms_imagenet_train(
         secondary_tfl += [vision.RandomColorAdjust(*color_jitter)]
 
     final_tfl = []
-    final_tfl += [
-        vision.Normalize(mean=mean, std=std),
-        vision.HWC2CHW(),
-    ]
+    if not normalize_on_device:
+        final_tfl += [
+            vision.Normalize(mean=mean, std=std),
+            vision.HWC2CHW(),
+        ]
     if re_prob > 0.0:
         final_tfl.append(
             vision.RandomErasing(
@@ -111,14 +129,17 @@ def transforms_imagenet_train(
     return primary_tfl + secondary_tfl + final_tfl
 
 
-def transforms_imagenet_eval(
+def transforms_imagenet_eval_crop(
     image_resize=224,
     crop_pct=DEFAULT_CROP_PCT,
-    mean=IMAGENET_DEFAULT_MEAN,
-    std=IMAGENET_DEFAULT_STD,
     interpolation="bilinear",
+    reduced_decode=False,
 ):
-    """Transform operation list when evaluating on ImageNet."""
+    """Deterministic Decode, Resize and CenterCrop part of the evaluation transforms on ImageNet.
+
+    If `reduced_decode` is True, JPEG images are decoded at the largest reduction (1/2, 1/4, 1/8) keeping them
+    at least the resize size, see `ReducedDecode`.
+    """
     if isinstance(image_resize, (tuple, list)):
         assert len(image_resize) == 2
         if image_resize[-1] == image_resize[-2]:
@@ -128,22 +149,49 @@ def transforms_imagenet_eval(
     else:
         scale_size = int(math.floor(image_resize / crop_pct))
 
-    # Define map operations for training dataset
     if hasattr(Inter, interpolation.upper()):
         interpolation = getattr(Inter, interpolation.upper())
     else:
         interpolation = Inter.BILINEAR
     trans_list = [
-        vision.Decode(),
+        ReducedDecode(scale_size) if reduced_decode else vision.Decode(),
         vision.Resize(scale_size, interpolation=interpolation),
         vision.CenterCrop(image_resize),
-        vision.Normalize(mean=mean, std=std),
-        vision.HWC2CHW(),
     ]
 
     return trans_list
 
 
+def transforms_imagenet_eval(
+    image_resize=224,
+    crop_pct=DEFAULT_CROP_PCT,
+    mean=IMAGENET_DEFAULT_MEAN,
+    std=IMAGENET_DEFAULT_STD,
+    interpolation="bilinear",
+    cached=False,
+    reduced_decode=False,
+    normalize_on_device=False,
+):
+    """Transform operation list when evaluating on ImageNet.
+
+    If `cached` is True, the images are expected to be already decoded, resized and center cropped,
+    e.g. read from `create_cached_eval_dataset`, so that only Normalize and HWC2CHW are applied.
+    If `normalize_on_device` is True, Normalize and HWC2CHW are left to `mindcv.models.layers.InputNormalize`.
+    """
+    trans_list = []
+    if not cached:
+        trans_list += transforms_imagenet_eval_crop(
+            image_resize=image_resize, crop_pct=crop_pct, interpolation=interpolation, reduced_decode=reduced_decode
+        )
+    if not normalize_on_device:
+        trans_list += [
+            vision.Normalize(mean=mean, std=std),
+            vision.HWC2CHW(),
+        ]
+
+    return trans_list
+
+
 def transforms_cifar(resize=224, is_training=True):
     """Transform operation list when training or evaluating on cifar."""
     trans = []
@@ -190,7 +238,8 @@ def create_transforms(
     r"""Creates a list of transform operation on image data.
 
     Args:
-        dataset_name (str): if '', customized dataset. Currently, apply the same transform pipeline as ImageNet.
+        dataset_name (str): if '', customized dataset. Currently, apply the same transform pipeline as ImageNet,
+            as well as for the packed and tar datasets.
             if standard dataset name is given including imagenet, cifar10, mnist, preset transforms will be returned.
             Default: ''.
         image_resize (int): the image size after resize for adapting to network. Default: 224.
@@ -208,8 +257,10 @@ def create_transforms(
     """
 
     dataset_name = dataset_name.lower()
+    if kwargs.get("normalize_on_device") and dataset_name not in _IMAGENET_STYLE_DATASETS:
+        raise ValueError(f"normalize_on_device is only supported by the ImageNet transforms, but got {dataset_name}.")
 
-    if dataset_name in ("imagenet", ""):
+    if dataset_name in _IMAGENET_STYLE_DATASETS:
         trans_args = dict(image_resize=image_resize, **kwargs)
         if is_training:
             return transforms_imagenet_train(auto_augment=auto_augment, separate=separate, **trans_args)
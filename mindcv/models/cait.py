@@ -13,6 +13,7 @@ from mindspore import Parameter, Tensor
 from mindspore.common.initializer import TruncatedNormal
 
 from .helpers import load_pretrained
+from .layers.attention import ScaledDotProductAttention
 from .layers.compatibility import Dropout
 from .layers.drop_path import DropPath
 from .layers.mlp import Mlp
@@ -63,33 +64,23 @@ class ClassAttention(nn.Cell):
         assert dim % num_heads == 0, "dim should be divisible by num_heads."
         self.num_heads = num_heads
         head_dim = dim // num_heads
-        self.scale = qk_scale or head_dim ** -0.5
 
         self.q = nn.Dense(dim, dim, has_bias=qkv_bias)
         self.k = nn.Dense(dim, dim, has_bias=qkv_bias)
         self.v = nn.Dense(dim, dim, has_bias=qkv_bias)
-        self.attn_drop = Dropout(p=attn_drop_rate)
+        self.attention = ScaledDotProductAttention(qk_scale or head_dim ** -0.5, attn_drop=attn_drop_rate)
         self.proj = nn.Dense(dim, dim)
         self.proj_drop = Dropout(p=proj_drop_rate)
-        self.softmax = nn.Softmax(axis=-1)
-
-        self.attn_matmul_v = ops.BatchMatMul()
-        self.q_matmul_k = ops.BatchMatMul(transpose_b=True)
 
     def construct(self, x: Tensor) -> Tensor:
         B, N, C = x.shape
         q = ops.expand_dims(self.q(x[:, 0]), 1)
         q = ops.reshape(q, (B, 1, self.num_heads, C // self.num_heads))
         q = ops.transpose(q, (0, 2, 1, 3))
-        q = ops.mul(q, self.scale)
         k = ops.transpose(ops.reshape(self.k(x), (B, N, self.num_heads, C // self.num_heads)), (0, 2, 1, 3))
         v = ops.transpose(ops.reshape(self.v(x), (B, N, self.num_heads, C // self.num_heads)), (0, 2, 1, 3))
 
-        attn = self.q_matmul_k(q, k)
-        attn = self.softmax(attn)
-        attn = self.attn_drop(attn)
-
-        x_cls = ops.reshape(ops.transpose(self.attn_matmul_v(attn, v), (0, 2, 1, 3)), (B, 1, C))
+        x_cls = ops.reshape(ops.transpose(self.attention(q, k, v), (0, 2, 1, 3)), (B, 1, C))
         x_cls = self.proj(x_cls)
         x_cls = self.proj_drop(x_cls)
 
@@ -14,6 +14,7 @@ from mindspore import dtype as mstype
 from mindspore.common.initializer import TruncatedNormal
 
 from .helpers import load_pretrained
+from .layers.attention import ScaledDotProductAttention
 from .layers.compatibility import Dropout, Interpolate
 from .layers.drop_path import DropPath
 from .layers.helpers import to_2tuple
@@ -53,10 +54,9 @@ class Attention(nn.Cell):
         super().__init__()
         self.num_heads = num_heads
         head_dim = dim // num_heads
-        self.scale = head_dim ** -0.5
 
         self.qkv = nn.Dense(dim, dim * 3, has_bias=qkv_bias)
-        self.attn_drop = Dropout(p=attn_drop)
+        self.attention = ScaledDotProductAttention(head_dim ** -0.5, attn_drop=attn_drop)
         self.proj = nn.Dense(dim, dim)
         self.proj_drop = Dropout(p=proj_drop)
 
@@ -67,14 +67,7 @@ class Attention(nn.Cell):
         qkv = ops.transpose(qkv, (2, 0, 3, 1, 4))
         q, k, v = qkv[0], qkv[1], qkv[2]  # make torchscript happy (cannot use tensor as tuple)
 
-        batchmatual = ops.BatchMatMul(transpose_b=True)
-        attn = batchmatual(q, k) * self.scale
-        softmax = nn.Softmax()
-        attn = softmax(attn)
-        attn = self.attn_drop(attn)
-
-        batchmatual2 = ops.BatchMatMul()
-        x = batchmatual2(attn, v)
+        x = self.attention(q, k, v)
         x = ops.transpose(x, (0, 2, 1, 3))
         x = x.reshape(B, N, C)
         x = self.proj(x)
@@ -153,12 +146,12 @@ class CrossAttention(nn.Cell):
         self.num_heads = num_heads
         head_dim = dim // num_heads
         # NOTE scale factor was wrong in my original version, can set manually to be compat with prev weights
-        self.scale = qk_scale or head_dim ** -0.5
+        scale = qk_scale or head_dim ** -0.5
 
         self.wq = nn.Dense(dim, dim, has_bias=qkv_bias)
         self.wk = nn.Dense(dim, dim, has_bias=qkv_bias)
         self.wv = nn.Dense(dim, dim, has_bias=qkv_bias)
-        self.attn_drop = Dropout(p=attn_drop)
+        self.attention = ScaledDotProductAttention(scale, attn_drop=attn_drop)
         self.proj = nn.Dense(dim, dim)
         self.proj_drop = Dropout(p=proj_drop)
 
@@ -173,13 +166,7 @@ class CrossAttention(nn.Cell):
         v = self.wv(x).reshape(B, N, self.num_heads, C // self.num_heads)
         v = ops.transpose(v, (0, 2, 1, 3))  # BNC -> BNH(C/H) -> BHN(C/H)3832
 
-        batchmatual = ops.BatchMatMul(transpose_b=True)
-        attn = batchmatual(q, k) * self.scale
-        softmax = nn.Softmax()
-        attn = softmax(attn)
-        attn = self.attn_drop(attn)
-        batchmatual2 = ops.BatchMatMul()
-        x = batchmatual2(attn, v)
+        x = self.attention(q, k, v)
         x = ops.transpose(x, (0, 2, 1, 3))
         x = x.reshape(B, 1, C)
         x = self.proj(x)
@@ -0,0 +1,223 @@
+"""
+Conversion of models for inference
+"""
+
+import logging
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+import mindspore as ms
+from mindspore import Parameter, Tensor, nn
+
+from .layers.identity import Identity
+
+__all__ = [
+    "fuse_for_inference",
+    "reparameterize",
+]
+
+_logger = logging.getLogger(__name__)
+
+_BATCH_NORMS = (nn.BatchNorm2d, nn.SyncBatchNorm)
+
+
+def _run_pynative(model, x):
+    """Runs `model` on `x` in PyNative mode, which needs no compiled graph, whatever the current mode."""
+    mode = ms.get_context("mode")
+    ms.set_context(mode=ms.PYNATIVE_MODE)
+    try:
+        return model(x).asnumpy()
+    finally:
+        ms.set_context(mode=mode)
+
+
+def _trace(model, x):
+    """Runs `model` on `x` in PyNative mode with hooks on its leaf cells, and returns the (conv, bn) pairs where the
+    output of the conv is consumed by the bn only, and the number of leaf cells run, `Identity` excluded."""
+    calls = []  # (cell, inputs, output), the tensors are kept alive so that their ids stay unique
+
+    def hook(cell, inputs, output):
+        calls.append((cell, inputs, output))
+
+    leaf_cells = [cell for _, cell in model.cells_and_names() if not cell.name_cells()]
+    handles = [cell.register_forward_hook(hook) for cell in leaf_cells]
+    try:
+        _run_pynative(model, x)
+    finally:
+        for handle in handles:
+            handle.remove()
+
+    num_calls, producer, consumers = {}, {}, {}
+    for cell, inputs, output in calls:
+        num_calls[id(cell)] = num_calls.get(id(cell), 0) + 1
+        if isinstance(cell, nn.Conv2d):
+            producer[id(output)] = cell
+        for tensor in inputs:
+            consumers.setdefault(id(tensor), []).append(cell)
+    pairs = []
+    for tensor_id, conv in producer.items():
+        cells = consumers.get(tensor_id, [])
+        if len(cells) == 1 and isinstance(cells[0], _BATCH_NORMS):
+            # a cell run more than once, e.g. shared by branches, is left unfused
+            if num_calls[id(conv)] == 1 and num_calls[id(cells[0])] == 1:
+                pairs.append((conv, cells[0]))
+    return pairs, sum(not isinstance(cell, Identity) for cell, _, _ in calls)
+
+
+def _fold(conv, bn):
+    """Folds the moving statistics and the affine transform of `bn` into the weight and the bias of `conv`."""
+    weight = conv.weight.asnumpy().astype(np.float64)
+    bias = conv.bias.asnumpy().astype(np.float64) if conv.has_bias else np.zeros(weight.shape[0])
+    scale = bn.gamma.asnumpy() / np.sqrt(bn.moving_variance.asnumpy().astype(np.float64) + bn.eps)
+    dtype = conv.weight.dtype
+    conv.weight.set_data(Tensor(weight * scale.reshape(-1, 1, 1, 1), dtype))
+    fused_bias = Tensor(bn.beta.asnumpy() + (bias - bn.moving_mean.asnumpy()) * scale, dtype)
+    if conv.has_bias:
+        conv.bias.set_data(fused_bias)
+    else:
+        conv.bias = Parameter(fused_bias, name=conv.weight.name.rsplit(".", 1)[0] + ".bias")
+        conv.has_bias = True
+
+
+def _replace(model, old, new):
+    """Replaces the child cell `old` of its parent by `new`, keeping its name."""
+    for _, parent in model.cells_and_names():
+        for name, child in parent.name_cells().items():
+            if child is old:
+                if isinstance(parent, (nn.SequentialCell, nn.CellList)):
+                    parent[list(parent.name_cells()).index(name)] = new
+                else:
+                    setattr(parent, name, new)
+                return
+
+
+def _invalidate_graphs(model):
+    """Makes the next call of `model` or of its cells in graph mode compile a new graph, the graphs already compiled
+    still run the replaced cells.
+
+    MindSpore has no public API for it. It caches the graph of a cell by `Cell.create_time`, which is read from the
+    private `_create_time` renewed here, and `test_invalidate_graphs` checks that this still holds. If a release
+    stops doing so, a warning is logged instead: the model must then be converted before its first call in graph
+    mode, or in a new process.
+    """
+    for _, cell in model.cells_and_names():
+        create_time = time.time_ns()
+        cell._create_time = create_time
+        if getattr(cell, "create_time", None) != create_time:
+            _logger.warning(
+                f"MindSpore {ms.__version__} does not cache the graphs by `Cell.create_time`, the graphs compiled "
+                "before the conversion may still run the original cells. Convert the model before its first call "
+                "in graph mode."
+            )
+            return
+
+
+def _latency_ms(model, x, num_runs):
+    model(x)  # warmup and compilation
+    start = time.perf_counter()
+    for _ in range(num_runs):
+        model(x).asnumpy()
+    return (time.perf_counter() - start) * 1000 / num_runs
+
+
+def fuse_for_inference(
+    model: nn.Cell,
+    input_shape: Sequence[int] = (1, 3, 224, 224),
+    atol: float = 1e-4,
+    rtol: float = 1e-3,
+    num_runs: int = 10,
+) -> dict:
+    """Folds every `nn.BatchNorm2d` that directly follows an `nn.Conv2d` into the conv, in place, for inference.
+
+    The pairs are found by tracing the network on a random batch in PyNative mode: a BN is folded when its input
+    is the output of a conv consumed by nothing else, whatever the structure of the network, e.g. the plain
+    attributes of a ResNet block, the `SequentialCell` of a `Conv2dNormActivation` or the branches of a RepVGG
+    block. The folded BNs are replaced by `Identity`, so their parameters leave the parameter dict. The outputs
+    on the random batch before and after the fusion are then compared, and the fusion is undone if they differ.
+
+    The network is set to inference mode, the BNs use their moving statistics. Preferably, it is fused before its
+    first call in graph mode, the graphs compiled before are recompiled at their next call.
+
+    Args:
+        model: the network, e.g. from `create_model`.
+        input_shape: the shape of the random batch. Default: (1, 3, 224, 224).
+        atol: the absolute tolerance of the comparison. Default: 1e-4.
+        rtol: the tolerance of the comparison relative to the largest output. Default: 1e-3.
+        num_runs: the number of runs measuring the latency, 0 to skip the measure. Default: 10.
+
+    Returns:
+        A report with the number of fused BNs, the number of leaf cells run by a forward pass before and after,
+        the largest output difference, and the latencies of a forward pass in ms before and after (None if
+        `num_runs` is 0), in the current execution mode.
+    """
+    model.set_train(False)
+    x = Tensor(np.random.default_rng(0).standard_normal(input_shape).astype(np.float32))
+    # the outputs are compared in PyNative mode, so that the check does not depend on the graphs compiled before
+    expected = _run_pynative(model, x)
+    latency_before = _latency_ms(model, x, num_runs) if num_runs > 0 else None
+
+    pairs, num_ops_before = _trace(model, x)
+    backup = [(conv, conv.weight.asnumpy(), conv.bias, conv.has_bias) for conv, _ in pairs]
+    identities = [Identity() for _ in pairs]
+    for (conv, bn), identity in zip(pairs, identities):
+        _fold(conv, bn)
+        _replace(model, bn, identity)
+    _invalidate_graphs(model)
+
+    actual = _run_pynative(model, x)
+    max_diff = float(np.max(np.abs(actual - expected)))
+    # relative to the scale of the output, the outputs of a network with random weights may be large
+    if max_diff > atol + rtol * float(np.max(np.abs(expected))):
+        for (conv, weight, bias, has_bias), (_, bn), identity in zip(backup, pairs, identities):
+            conv.weight.set_data(Tensor(weight))
+            del conv.bias  # a None in the parameters of the cell fails the compilation
+            conv.bias, conv.has_bias = bias, has_bias
+            _replace(model, identity, bn)
+        _invalidate_graphs(model)
+        raise RuntimeError(
+            f"The fused network differs from the original one by up to {max_diff}, the fusion is undone. "
+            f"Some output of a conv may be consumed outside of the cells, e.g. by an op in `construct`."
+        )
+
+    _, num_ops_after = _trace(model, x)
+    report = dict(
+        num_fused=len(pairs),
+        num_ops_before=num_ops_before,
+        num_ops_after=num_ops_after,
+        max_abs_diff=max_diff,
+        latency_before_ms=latency_before,
+        latency_after_ms=_latency_ms(model, x, num_runs) if num_runs > 0 else None,
+    )
+    _logger.info(f"Fused {len(pairs)} BatchNorm into their conv: {report}")
+    return report
+
+
+def reparameterize(model: nn.Cell, save_path: Optional[str] = None) -> nn.Cell:
+    """Converts every structural re-parameterizable block of `model` to its deploy form, in place.
+
+    A block is re-parameterizable if it has a `switch_to_deploy()` method, which merges its training branches into
+    a single layer and removes them, e.g. `RepVGGBlock` or `RepMLPBlock`. New blocks, e.g. MobileOne-style ones,
+    only need to implement it. The training branches leave the parameter dict, so that the saved checkpoint is
+    the compact deploy one, loadable by the model built with `deploy=True`. Preferably, the model is converted
+    before its first call in graph mode, the graphs compiled before are recompiled at their next call.
+
+    Args:
+        model: the network, e.g. from `create_model`.
+        save_path: if not None, the deploy checkpoint is saved to this path. Default: None.
+
+    Returns:
+        The converted model.
+    """
+    blocks = [cell for _, cell in model.cells_and_names() if hasattr(cell, "switch_to_deploy")]
+    for block in blocks:
+        block.switch_to_deploy()
+    # the parameters of the cells created by the conversion are named within their block only
+    for name, param in model.parameters_and_names():
+        param.name = name
+    _invalidate_graphs(model)
+    _logger.info(f"Re-parameterized {len(blocks)} blocks.")
+    if save_path is not None:
+        ms.save_checkpoint(model, save_path)
+    return model
@@ -9,6 +9,7 @@ from mindspore import Parameter, Tensor, nn, ops
 from mindspore.common.initializer import HeUniform, TruncatedNormal
 
 from .helpers import load_pretrained, make_divisible
+from .layers.attention import ScaledDotProductAttention
 from .layers.identity import Identity
 from .registry import register_model
 
@@ -269,7 +270,7 @@ class HaloAttention(nn.Cell):
         self.pos_embed = RelPosEmb(
             block_size=self.block_size_ds, win_size=self.win_size, dim_head=self.dim_head_qk)
         self.pool = nn.AvgPool2d(2, 2) if use_avg_pool else Identity()
-        self.softmax_fn = ops.Softmax(-1)
+        self.attention = ScaledDotProductAttention(self.scale)
         self.pad_kv = ops.Pad(
             paddings=((0, 0), (0, 0), (self.halo_size, self.halo_size), (self.halo_size, self.halo_size))
             )
@@ -299,17 +300,10 @@ class HaloAttention(nn.Cell):
         kv = ops.transpose(kv, (0, 3, 2, 1))  # [B * self.num_heads, num_blocks, -1, self.dim_head_qk + self.dim_head_v]
         k = kv[..., :self.dim_head_qk]
         v = kv[..., self.dim_head_qk:(self.dim_head_qk + self.dim_head_v)]
-        k = ops.transpose(k, (0, 1, 3, 2))  # [B * self.num_heads, num_blocks, self.dim_head_qk, -1]
+        pos_embed_q = self.pos_embed(q)  # B * num_heads, num_blocks, block_size ** 2, win_size ** 2
         if self.scale_pos_embed:
-            attn = (ops.matmul(q, k) + self.pos_embed(q)) * self.scale
-        else:
-            pos_embed_q = self.pos_embed(q)
-            part_1 = (ops.matmul(q, k)) * self.scale
-            attn = part_1 + pos_embed_q
-        # attn: B * num_heads, num_blocks, block_size ** 2, win_size ** 2
-        attn = self.softmax_fn(attn)
-        # attn = attn @ v
-        attn = ops.matmul(attn, v)  # attn: B * num_heads, num_blocks, block_size ** 2, dim_head_v
+            pos_embed_q = pos_embed_q * self.scale
+        attn = self.attention(q, k, v, pos_embed_q)  # attn: B * num_heads, num_blocks, block_size ** 2, dim_head_v
         out = ops.transpose(attn, (0, 3, 2, 1))  # B * num_heads, dim_head_v, block_size ** 2, num_blocks
         # fold
         out = ops.reshape(out, (-1, self.block_size_ds, self.block_size_ds, num_h_blocks, num_w_blocks))
@@ -37,7 +37,8 @@ def load_pretrained(model, default_cfg, num_classes=1000, in_channels=3, filter_
     # download files
     download_path = get_checkpoint_download_root()
     os.makedirs(download_path, exist_ok=True)
-    DownLoad().download_url(default_cfg["url"], path=download_path)
+    # the model configs have no hash of their checkpoints, the download is verified by its size only
+    DownLoad().download_url(default_cfg["url"], path=download_path, allow_unverified=True)
 
     param_dict = load_checkpoint(os.path.join(download_path, os.path.basename(default_cfg["url"])))
 
@@ -1,10 +1,12 @@
 """layers init"""
 from . import (
     activation,
+    attention,
     conv_norm_act,
     drop_path,
     format,
     identity,
+    input_normalize,
     patch_dropout,
     pooling,
     pos_embed,
@@ -12,10 +14,12 @@ from . import (
     squeeze_excite,
 )
 from .activation import *
+from .attention import *
 from .conv_norm_act import *
 from .drop_path import *
 from .format import *
 from .identity import *
+from .input_normalize import *
 from .patch_dropout import *
 from .pooling import *
 from .pos_embed import *
@@ -24,3 +28,4 @@ from .squeeze_excite import *
 
 __all__ = []
 __all__.extend(activation.__all__)
+__all__.extend(attention.__all__)
@@ -0,0 +1,119 @@
+"""Scaled dot-product attention
+
+The attention of the transformer models, `softmax(q @ k^T * scale + attn_bias) @ v`, in one place. The scores
+and the softmax are computed in float32 whatever the input dtype, e.g. float16 under mixed precision, with:
+
+- "default": the attention matrix is computed whole. The scale is folded into q, which is smaller than the matrix
+  whenever the head dim is smaller than the number of keys.
+- "chunked": the queries are processed in tiles of `query_chunk_size` and, for each tile, the keys in chunks of
+  `chunk_size` with an online softmax, as in FlashAttention (https://arxiv.org/abs/2205.14135): the outputs of the
+  chunks are merged with weights given by the running log-sum-exp of the scores, so that only a tile of the
+  attention matrix exists at a time and the memory grows linearly with the number of tokens instead of
+  quadratically, e.g. for the inference of a ViT at high resolution. The result is the same as "default" up to
+  the rounding.
+"""
+import mindspore as ms
+from mindspore import Tensor, nn, ops
+
+from .compatibility import Dropout
+
+__all__ = ["ScaledDotProductAttention"]
+
+ATTN_IMPLS = ("default", "chunked")
+
+
+class ScaledDotProductAttention(nn.Cell):
+    """Scaled dot-product attention over q, k and v of shape (B, num_heads, N, head_dim), or of any other leading
+    dims, with keys and values of the same length.
+
+    Args:
+        scale: the scale of the dot products, e.g. head_dim ** -0.5.
+        attn_drop: the drop rate of the attention weights. Default: 0.0.
+        attn_impl: the implementation, "default" or "chunked", see the module docstring. Default: "default".
+        chunk_size: the number of keys of a chunk of "chunked". Default: 256.
+        query_chunk_size: the number of queries of a tile of "chunked". Default: 256.
+
+    Inputs:
+        - q: queries of shape (..., Nq, head_dim).
+        - k: keys of shape (..., Nk, head_dim).
+        - v: values of shape (..., Nk, head_dim_v).
+        - attn_bias: None or a tensor added to the scaled dot products, e.g. a relative position bias or a mask, of
+          the rank of q, broadcastable to (..., Nq, Nk) and with a last dim of Nk. Default: None.
+
+    Returns:
+        Tensor of shape (..., Nq, head_dim_v).
+    """
+
+    def __init__(
+        self,
+        scale: float,
+        attn_drop: float = 0.0,
+        attn_impl: str = "default",
+        chunk_size: int = 256,
+        query_chunk_size: int = 256,
+    ):
+        super().__init__()
+        if attn_impl not in ATTN_IMPLS:
+            raise ValueError(f"attn_impl should be one of {ATTN_IMPLS}, but got {attn_impl}.")
+        self.scale = scale
+        self.chunked = attn_impl == "chunked"
+        self.chunk_size = chunk_size
+        self.query_chunk_size = query_chunk_size
+        self.attn_drop = Dropout(p=attn_drop)
+        self.q_matmul_k = ops.BatchMatMul(transpose_b=True)
+        self.attn_matmul_v = ops.BatchMatMul()
+
+    def construct(self, q: Tensor, k: Tensor, v: Tensor, attn_bias: Tensor = None) -> Tensor:
+        q = q * self.scale
+        if self.chunked:
+            return self._chunked_attention(q, k, v, attn_bias)
+        attn = self.q_matmul_k(q, k).astype(ms.float32)
+        if attn_bias is not None:
+            attn = attn + attn_bias.astype(ms.float32)
+        attn = ops.softmax(attn, axis=-1).astype(v.dtype)
+        attn = self.attn_drop(attn)
+        return self.attn_matmul_v(attn, v)
+
+    def _attend_chunk(self, q, k, v, attn_bias, start):
+        """The attention over the keys [start, start + chunk_size) and the log-sum-exp of their scores, in float32."""
+        end = min(start + self.chunk_size, k.shape[-2])
+        scores = self.q_matmul_k(q, k[..., start:end, :]).astype(ms.float32)
+        if attn_bias is not None:
+            scores = scores + attn_bias[..., start:end].astype(ms.float32)
+        probs = ops.softmax(scores, axis=-1)
+        # the largest weight is exp(max - lse). Subtracting the max from the scores instead would broadcast it, whose
+        # kernel takes a workspace of several times the scores on CPU
+        lse = scores.max(axis=-1, keepdims=True) - ops.log(probs.max(axis=-1, keepdims=True))
+        out = self.attn_matmul_v(self.attn_drop(probs).astype(v.dtype), v[..., start:end, :])
+        return out.astype(ms.float32), lse
+
+    def _chunked_attention(self, q, k, v, attn_bias):
+        outs = []
+        for start in range(0, q.shape[-2], self.query_chunk_size):
+            end = min(start + self.query_chunk_size, q.shape[-2])
+            # a bias broadcast along the queries is shared by the tiles
+            tile_bias = attn_bias if attn_bias is None or attn_bias.shape[-2] == 1 else attn_bias[..., start:end, :]
+            q_tile = q[..., start:end, :]
+            if outs:
+                # in graph mode, the tiles run one after another instead of all at once, see `_attend_tile`
+                q_tile = ops.depend(q_tile, outs[-1])
+            outs.append(self._attend_tile(q_tile, k, v, tile_bias))
+        # a tuple, the list of the casts of the tiles fails to concat in pynative mode under "O2" mixed precision
+        return outs[0] if len(outs) == 1 else ops.concat(tuple(outs), axis=-2)
+
+    def _attend_tile(self, q, k, v, attn_bias):
+        """The attention of a tile of queries over the chunks of the keys."""
+        out, lse = self._attend_chunk(q, k, v, attn_bias, 0)
+        for start in range(self.chunk_size, k.shape[-2], self.chunk_size):
+            # the scores of the chunks do not depend on each other, without this dependency a graph may compute
+            # all of them before merging any, and hold the whole attention matrix
+            chunk_out, chunk_lse = self._attend_chunk(ops.depend(q, out), k, v, attn_bias, start)
+            # the weights of the keys seen so far and of the chunk, relative to the largest
+            new_max = ops.maximum(lse, chunk_lse)
+            weight, chunk_weight = ops.exp(lse - new_max), ops.exp(chunk_lse - new_max)
+            total = weight + chunk_weight
+            weight = ops.broadcast_to(weight / total, out.shape)
+            chunk_weight = ops.broadcast_to(chunk_weight / total, out.shape)
+            out = out * weight + chunk_out * chunk_weight
+            lse = new_max + ops.log(total)
+        return out.astype(v.dtype)
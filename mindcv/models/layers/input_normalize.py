@@ -0,0 +1,33 @@
+"""InputNormalize Module"""
+from typing import Sequence
+
+import numpy as np
+
+import mindspore as ms
+from mindspore import Tensor, nn, ops
+
+
+class InputNormalize(nn.Cell):
+    """
+    Wraps a network to normalize its input batch of uint8 images and convert it from NHWC to NCHW on device,
+    i.e. the `Normalize` and `HWC2CHW` of the transforms as the first op of the network, for the batches of
+    `create_transforms(..., normalize_on_device=True)`, which are 4 times smaller than float32 ones.
+    The network is wrapped without a name prefix, so that the names of its parameters, i.e. its checkpoints,
+    are unchanged.
+
+    Args:
+        network: the network taking the normalized NCHW images.
+        mean: the mean of each channel, in the range of uint8.
+        std: the standard deviation of each channel, in the range of uint8.
+    """
+
+    def __init__(self, network: nn.Cell, mean: Sequence[float], std: Sequence[float]) -> None:
+        super().__init__(auto_prefix=False)
+        self.network = network
+        self.mean = Tensor(np.asarray(mean, dtype=np.float32).reshape(1, -1, 1, 1))
+        self.inv_std = Tensor(1.0 / np.asarray(std, dtype=np.float32).reshape(1, -1, 1, 1))
+
+    def construct(self, x):
+        x = ops.cast(x, ms.float32).transpose(0, 3, 1, 2)
+        x = (x - self.mean) * self.inv_std
+        return self.network(x)
@@ -1,3 +1,6 @@
+from mindspore import load_checkpoint
+
+from .deploy import reparameterize
 from .helpers import load_model_checkpoint
 from .registry import is_model, model_entrypoint
 
@@ -12,6 +15,7 @@ def create_model(
     checkpoint_path: str = "",
     ema: bool = False,
     auto_mapping: bool = False,
+    deploy: bool = False,
     **kwargs,
 ):
     r"""Creates model by name.
@@ -25,6 +29,8 @@ def create_model(
         ema (bool): Whether use ema method. Default: False.
         auto_mapping (bool): Whether to automatically map the names of checkpoint weights
             to the names of model weights when there are differences in names. Default: False.
+        deploy (bool): Whether to convert the re-parameterizable blocks, e.g. of RepVGG, to their deploy form,
+            see `reparameterize`. The checkpoint may be a training one or a deploy one. Default: False.
         **kwargs: additional args, e.g., "features_only", "out_indices".
     """
 
@@ -41,6 +47,16 @@ def create_model(
     model = create_fn(**model_args, **kwargs)
 
     if checkpoint_path:
+        if deploy and not _is_training_checkpoint(model, checkpoint_path):
+            reparameterize(model)
         load_model_checkpoint(model, checkpoint_path, ema, auto_mapping)
+    if deploy:
+        reparameterize(model)
 
     return model
+
+
+def _is_training_checkpoint(model, checkpoint_path):
+    """Whether the checkpoint holds every parameter of the model, and not only those of its deploy form."""
+    names = {name[len("ema.") :] if name.startswith("ema.") else name for name in load_checkpoint(checkpoint_path)}
+    return all(param.name in names for param in model.get_parameters())
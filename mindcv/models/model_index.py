@@ -0,0 +1,606 @@
+"""
+Static index of the models, generated by `python scripts/gen_model_index.py`, do not edit.
+"""
+
+# model name: (module, whether pretrained weights are available)
+MODELS = {
+    "BiT_resnet101": ("bit", True),
+    "BiT_resnet50": ("bit", True),
+    "BiT_resnet50x3": ("bit", True),
+    "cait_m36_384": ("cait", False),
+    "cait_m48_448": ("cait", False),
+    "cait_s24_224": ("cait", False),
+    "cait_s24_384": ("cait", False),
+    "cait_s36_384": ("cait", False),
+    "cait_xs24_384": ("cait", False),
+    "cait_xxs24_224": ("cait", False),
+    "cmt_base": ("cmt", False),
+    "cmt_small": ("cmt", True),
+    "cmt_tiny": ("cmt", False),
+    "cmt_xsmall": ("cmt", False),
+    "coat_lite_medium": ("coat", False),
+    "coat_lite_mini": ("coat", True),
+    "coat_lite_small": ("coat", False),
+    "coat_lite_tiny": ("coat", True),
+    "coat_mini": ("coat", True),
+    "coat_small": ("coat", False),
+    "coat_tiny": ("coat", True),
+    "convit_base": ("convit", True),
+    "convit_base_plus": ("convit", True),
+    "convit_small": ("convit", True),
+    "convit_small_plus": ("convit", True),
+    "convit_tiny": ("convit", True),
+    "convit_tiny_plus": ("convit", True),
+    "convnext_base": ("convnext", True),
+    "convnext_large": ("convnext", False),
+    "convnext_small": ("convnext", True),
+    "convnext_tiny": ("convnext", True),
+    "convnext_xlarge": ("convnext", False),
+    "convnextv2_atto": ("convnext", False),
+    "convnextv2_base": ("convnext", False),
+    "convnextv2_femto": ("convnext", False),
+    "convnextv2_huge": ("convnext", False),
+    "convnextv2_large": ("convnext", False),
+    "convnextv2_nano": ("convnext", False),
+    "convnextv2_pico": ("convnext", False),
+    "convnextv2_tiny": ("convnext", False),
+    "crossvit_15": ("crossvit", True),
+    "crossvit_18": ("crossvit", True),
+    "crossvit_9": ("crossvit", True),
+    "densenet121": ("densenet", True),
+    "densenet161": ("densenet", True),
+    "densenet169": ("densenet", True),
+    "densenet201": ("densenet", True),
+    "dpn107": ("dpn", True),
+    "dpn131": ("dpn", True),
+    "dpn92": ("dpn", True),
+    "dpn98": ("dpn", True),
+    "edgenext_base": ("edgenext", True),
+    "edgenext_small": ("edgenext", True),
+    "edgenext_x_small": ("edgenext", True),
+    "edgenext_xx_small": ("edgenext", True),
+    "efficientnet_b0": ("efficientnet", True),
+    "efficientnet_b1": ("efficientnet", True),
+    "efficientnet_b2": ("efficientnet", False),
+    "efficientnet_b3": ("efficientnet", False),
+    "efficientnet_b4": ("efficientnet", False),
+    "efficientnet_b5": ("efficientnet", False),
+    "efficientnet_b6": ("efficientnet", False),
+    "efficientnet_b7": ("efficientnet", False),
+    "efficientnet_v2_l": ("efficientnet", False),
+    "efficientnet_v2_m": ("efficientnet", False),
+    "efficientnet_v2_s": ("efficientnet", False),
+    "efficientnet_v2_xl": ("efficientnet", False),
+    "ghostnet_050": ("ghostnet", True),
+    "ghostnet_100": ("ghostnet", True),
+    "ghostnet_130": ("ghostnet", True),
+    "googlenet": ("googlenet", True),
+    "halonet_50t": ("halonet", True),
+    "hrnet_w32": ("hrnet", True),
+    "hrnet_w48": ("hrnet", True),
+    "inception_v3": ("inceptionv3", True),
+    "inception_v4": ("inceptionv4", True),
+    "mae_b_16_224_finetune": ("mae", True),
+    "mae_b_16_224_pretrain": ("mae", False),
+    "mae_h_14_224_finetune": ("mae", False),
+    "mae_h_16_224_pretrain": ("mae", False),
+    "mae_l_16_224_finetune": ("mae", False),
+    "mae_l_16_224_pretrain": ("mae", False),
+    "mixnet_l": ("mixnet", True),
+    "mixnet_m": ("mixnet", True),
+    "mixnet_s": ("mixnet", True),
+    "mlp_mixer_b_p16": ("mlpmixer", False),
+    "mlp_mixer_b_p32": ("mlpmixer", False),
+    "mlp_mixer_h_p14": ("mlpmixer", False),
+    "mlp_mixer_l_p16": ("mlpmixer", False),
+    "mlp_mixer_l_p32": ("mlpmixer", False),
+    "mlp_mixer_s_p16": ("mlpmixer", False),
+    "mlp_mixer_s_p32": ("mlpmixer", False),
+    "mnasnet_050": ("mnasnet", True),
+    "mnasnet_075": ("mnasnet", True),
+    "mnasnet_100": ("mnasnet", True),
+    "mnasnet_130": ("mnasnet", True),
+    "mnasnet_140": ("mnasnet", True),
+    "mobilenet_v1_025": ("mobilenetv1", True),
+    "mobilenet_v1_050": ("mobilenetv1", True),
+    "mobilenet_v1_075": ("mobilenetv1", True),
+    "mobilenet_v1_100": ("mobilenetv1", True),
+    "mobilenet_v2_035_128": ("mobilenetv2", False),
+    "mobilenet_v2_035_160": ("mobilenetv2", False),
+    "mobilenet_v2_035_192": ("mobilenetv2", False),
+    "mobilenet_v2_035_224": ("mobilenetv2", False),
+    "mobilenet_v2_035_96": ("mobilenetv2", False),
+    "mobilenet_v2_050_128": ("mobilenetv2", False),
+    "mobilenet_v2_050_160": ("mobilenetv2", False),
+    "mobilenet_v2_050_192": ("mobilenetv2", False),
+    "mobilenet_v2_050_224": ("mobilenetv2", False),
+    "mobilenet_v2_050_96": ("mobilenetv2", False),
+    "mobilenet_v2_075": ("mobilenetv2", True),
+    "mobilenet_v2_075_128": ("mobilenetv2", False),
+    "mobilenet_v2_075_160": ("mobilenetv2", False),
+    "mobilenet_v2_075_192": ("mobilenetv2", False),
+    "mobilenet_v2_075_96": ("mobilenetv2", False),
+    "mobilenet_v2_100": ("mobilenetv2", True),
+    "mobilenet_v2_100_128": ("mobilenetv2", False),
+    "mobilenet_v2_100_160": ("mobilenetv2", False),
+    "mobilenet_v2_100_192": ("mobilenetv2", False),
+    "mobilenet_v2_100_96": ("mobilenetv2", False),
+    "mobilenet_v2_130_224": ("mobilenetv2", False),
+    "mobilenet_v2_140": ("mobilenetv2", True),
+    "mobilenet_v3_large_075": ("mobilenetv3", False),
+    "mobilenet_v3_large_100": ("mobilenetv3", True),
+    "mobilenet_v3_small_075": ("mobilenetv3", False),
+    "mobilenet_v3_small_100": ("mobilenetv3", True),
+    "mobilevit_small": ("mobilevit", True),
+    "mobilevit_x_small": ("mobilevit", True),
+    "mobilevit_xx_small": ("mobilevit", True),
+    "nasnet_a_4x1056": ("nasnet", True),
+    "pit_b": ("pit", True),
+    "pit_s": ("pit", True),
+    "pit_ti": ("pit", True),
+    "pit_xs": ("pit", True),
+    "pnasnet": ("pnasnet", False),
+    "poolformer_m36": ("poolformer", False),
+    "poolformer_m48": ("poolformer", False),
+    "poolformer_s12": ("poolformer", True),
+    "poolformer_s24": ("poolformer", False),
+    "poolformer_s36": ("poolformer", False),
+    "pvt_large": ("pvt", True),
+    "pvt_medium": ("pvt", True),
+    "pvt_small": ("pvt", True),
+    "pvt_tiny": ("pvt", True),
+    "pvt_v2_b0": ("pvtv2", True),
+    "pvt_v2_b1": ("pvtv2", True),
+    "pvt_v2_b2": ("pvtv2", True),
+    "pvt_v2_b3": ("pvtv2", True),
+    "pvt_v2_b4": ("pvtv2", True),
+    "pvt_v2_b5": ("pvtv2", False),
+    "regnet_x_12gf": ("regnet", False),
+    "regnet_x_16gf": ("regnet", True),
+    "regnet_x_1_6gf": ("regnet", False),
+    "regnet_x_200mf": ("regnet", True),
+    "regnet_x_32gf": ("regnet", False),
+    "regnet_x_3_2gf": ("regnet", False),
+    "regnet_x_400mf": ("regnet", True),
+    "regnet_x_4_0gf": ("regnet", False),
+    "regnet_x_600mf": ("regnet", True),
+    "regnet_x_6_4gf": ("regnet", False),
+    "regnet_x_800mf": ("regnet", True),
+    "regnet_x_8_0gf": ("regnet", False),
+    "regnet_y_12gf": ("regnet", False),
+    "regnet_y_16gf": ("regnet", False),
+    "regnet_y_1_6gf": ("regnet", False),
+    "regnet_y_200mf": ("regnet", True),
+    "regnet_y_32gf": ("regnet", False),
+    "regnet_y_3_2gf": ("regnet", False),
+    "regnet_y_400mf": ("regnet", True),
+    "regnet_y_4_0gf": ("regnet", False),
+    "regnet_y_600mf": ("regnet", True),
+    "regnet_y_6_4gf": ("regnet", False),
+    "regnet_y_800mf": ("regnet", True),
+    "regnet_y_8_0gf": ("regnet", False),
+    "repmlp_b224": ("repmlp", False),
+    "repmlp_b256": ("repmlp", False),
+    "repmlp_d256": ("repmlp", False),
+    "repmlp_l256": ("repmlp", False),
+    "repmlp_t224": ("repmlp", True),
+    "repmlp_t256": ("repmlp", False),
+    "repvgg_a0": ("repvgg", True),
+    "repvgg_a1": ("repvgg", True),
+    "repvgg_a2": ("repvgg", True),
+    "repvgg_b0": ("repvgg", True),
+    "repvgg_b1": ("repvgg", True),
+    "repvgg_b1g2": ("repvgg", True),
+    "repvgg_b1g4": ("repvgg", True),
+    "repvgg_b2": ("repvgg", True),
+    "repvgg_b2g4": ("repvgg", True),
+    "repvgg_b3": ("repvgg", True),
+    "res2net101": ("res2net", True),
+    "res2net101_v1b": ("res2net", True),
+    "res2net152": ("res2net", False),
+    "res2net152_v1b": ("res2net", False),
+    "res2net50": ("res2net", True),
+    "res2net50_v1b": ("res2net", True),
+    "resnest101": ("resnest", True),
+    "resnest14": ("resnest", False),
+    "resnest200": ("resnest", False),
+    "resnest26": ("resnest", False),
+    "resnest269": ("resnest", False),
+    "resnest50": ("resnest", True),
+    "resnet101": ("resnet", True),
+    "resnet152": ("resnet", True),
+    "resnet18": ("resnet", True),
+    "resnet34": ("resnet", True),
+    "resnet50": ("resnet", True),
+    "resnetv2_101": ("resnetv2", True),
+    "resnetv2_50": ("resnetv2", True),
+    "resnext101_32x4d": ("resnet", True),
+    "resnext101_64x4d": ("resnet", True),
+    "resnext152_64x4d": ("resnet", True),
+    "resnext50_32x4d": ("resnet", True),
+    "rexnet_09": ("rexnet", True),
+    "rexnet_10": ("rexnet", True),
+    "rexnet_13": ("rexnet", True),
+    "rexnet_15": ("rexnet", True),
+    "rexnet_20": ("rexnet", True),
+    "senet154": ("senet", False),
+    "seresnet101": ("senet", False),
+    "seresnet152": ("senet", False),
+    "seresnet18": ("senet", True),
+    "seresnet34": ("senet", True),
+    "seresnet50": ("senet", True),
+    "seresnext101_32x4d": ("senet", False),
+    "seresnext26_32x4d": ("senet", True),
+    "seresnext50_32x4d": ("senet", True),
+    "shufflenet_v1_g3_05": ("shufflenetv1", True),
+    "shufflenet_v1_g3_10": ("shufflenetv1", True),
+    "shufflenet_v1_g3_15": ("shufflenetv1", False),
+    "shufflenet_v1_g3_20": ("shufflenetv1", False),
+    "shufflenet_v1_g8_05": ("shufflenetv1", False),
+    "shufflenet_v1_g8_10": ("shufflenetv1", False),
+    "shufflenet_v1_g8_15": ("shufflenetv1", False),
+    "shufflenet_v1_g8_20": ("shufflenetv1", False),
+    "shufflenet_v2_x0_5": ("shufflenetv2", True),
+    "shufflenet_v2_x1_0": ("shufflenetv2", True),
+    "shufflenet_v2_x1_5": ("shufflenetv2", True),
+    "shufflenet_v2_x2_0": ("shufflenetv2", True),
+    "skresnet18": ("sknet", True),
+    "skresnet34": ("sknet", True),
+    "skresnet50": ("sknet", False),
+    "skresnext50_32x4d": ("sknet", True),
+    "squeezenet1_0": ("squeezenet", True),
+    "squeezenet1_1": ("squeezenet", True),
+    "swin_tiny": ("swintransformer", True),
+    "swinv2_base_window16": ("swintransformerv2", False),
+    "swinv2_base_window8": ("swintransformerv2", False),
+    "swinv2_small_window16": ("swintransformerv2", False),
+    "swinv2_small_window8": ("swintransformerv2", False),
+    "swinv2_tiny_window16": ("swintransformerv2", False),
+    "swinv2_tiny_window8": ("swintransformerv2", True),
+    "vgg11": ("vgg", True),
+    "vgg13": ("vgg", True),
+    "vgg16": ("vgg", True),
+    "vgg19": ("vgg", True),
+    "visformer_small": ("visformer", True),
+    "visformer_small_v2": ("visformer", True),
+    "visformer_tiny": ("visformer", True),
+    "visformer_tiny_v2": ("visformer", True),
+    "vit_b_16_224": ("vit", False),
+    "vit_b_16_384": ("vit", False),
+    "vit_b_32_224": ("vit", True),
+    "vit_b_32_384": ("vit", False),
+    "vit_l_16_224": ("vit", True),
+    "vit_l_16_384": ("vit", False),
+    "vit_l_32_224": ("vit", True),
+    "volo_d1": ("volo", True),
+    "volo_d2": ("volo", True),
+    "volo_d3": ("volo", True),
+    "volo_d4": ("volo", True),
+    "volo_d5": ("volo", False),
+    "xception": ("xception", True),
+    "xcit_tiny_12_p16_224": ("xcit", True),
+}
+
+# name exported by `mindcv.models`: module
+EXPORTS = {
+    "BiT_ResNet": "bit",
+    "BiT_resnet101": "bit",
+    "BiT_resnet50": "bit",
+    "BiT_resnet50x3": "bit",
+    "CMT": "cmt",
+    "CaiT": "cait",
+    "ConViT": "convit",
+    "ConvNeXt": "convnext",
+    "DPN": "dpn",
+    "DenseNet": "densenet",
+    "EdgeNeXt": "edgenext",
+    "EfficientNet": "efficientnet",
+    "GhostNet": "ghostnet",
+    "GoogLeNet": "googlenet",
+    "HRNet": "hrnet",
+    "HaloNet": "halonet",
+    "InceptionV3": "inceptionv3",
+    "InceptionV4": "inceptionv4",
+    "MLPMixer": "mlpmixer",
+    "MixNet": "mixnet",
+    "Mnasnet": "mnasnet",
+    "MobileNetV1": "mobilenetv1",
+    "MobileNetV2": "mobilenetv2",
+    "MobileNetV3": "mobilenetv3",
+    "NASNetAMobile": "nasnet",
+    "Pnasnet": "pnasnet",
+    "PoolFormer": "poolformer",
+    "PyramidVisionTransformer": "pvt",
+    "PyramidVisionTransformerV2": "pvtv2",
+    "ReXNetV1": "rexnet",
+    "RepMLPNet": "repmlp",
+    "RepVGG": "repvgg",
+    "Res2Net": "res2net",
+    "ResNeSt": "resnest",
+    "ResNet": "resnet",
+    "SENet": "senet",
+    "SKNet": "sknet",
+    "ShuffleNetV1": "shufflenetv1",
+    "ShuffleNetV2": "shufflenetv2",
+    "SqueezeNet": "squeezenet",
+    "SwinTransformer": "swintransformer",
+    "SwinTransformerV2": "swintransformerv2",
+    "VGG": "vgg",
+    "VOLO": "volo",
+    "Visformer": "visformer",
+    "VisionTransformer": "vit",
+    "XCiT": "xcit",
+    "Xception": "xception",
+    "cait_m36_384": "cait",
+    "cait_m48_448": "cait",
+    "cait_s24_224": "cait",
+    "cait_s24_384": "cait",
+    "cait_s36_384": "cait",
+    "cait_xs24_384": "cait",
+    "cait_xxs24_224": "cait",
+    "cmt_base": "cmt",
+    "cmt_small": "cmt",
+    "cmt_tiny": "cmt",
+    "cmt_xsmall": "cmt",
+    "coat_lite_medium": "coat",
+    "coat_lite_mini": "coat",
+    "coat_lite_small": "coat",
+    "coat_lite_tiny": "coat",
+    "coat_mini": "coat",
+    "coat_small": "coat",
+    "coat_tiny": "coat",
+    "convit_base": "convit",
+    "convit_base_plus": "convit",
+    "convit_small": "convit",
+    "convit_small_plus": "convit",
+    "convit_tiny": "convit",
+    "convit_tiny_plus": "convit",
+    "convnext_base": "convnext",
+    "convnext_large": "convnext",
+    "convnext_small": "convnext",
+    "convnext_tiny": "convnext",
+    "convnext_xlarge": "convnext",
+    "convnextv2_atto": "convnext",
+    "convnextv2_base": "convnext",
+    "convnextv2_femto": "convnext",
+    "convnextv2_huge": "convnext",
+    "convnextv2_large": "convnext",
+    "convnextv2_nano": "convnext",
+    "convnextv2_pico": "convnext",
+    "convnextv2_tiny": "convnext",
+    "crossvit_15": "crossvit",
+    "crossvit_18": "crossvit",
+    "crossvit_9": "crossvit",
+    "densenet121": "densenet",
+    "densenet161": "densenet",
+    "densenet169": "densenet",
+    "densenet201": "densenet",
+    "dpn107": "dpn",
+    "dpn131": "dpn",
+    "dpn92": "dpn",
+    "dpn98": "dpn",
+    "edgenext_base": "edgenext",
+    "edgenext_small": "edgenext",
+    "edgenext_x_small": "edgenext",
+    "edgenext_xx_small": "edgenext",
+    "efficientnet_b0": "efficientnet",
+    "efficientnet_b1": "efficientnet",
+    "efficientnet_b2": "efficientnet",
+    "efficientnet_b3": "efficientnet",
+    "efficientnet_b4": "efficientnet",
+    "efficientnet_b5": "efficientnet",
+    "efficientnet_b6": "efficientnet",
+    "efficientnet_b7": "efficientnet",
+    "efficientnet_v2_l": "efficientnet",
+    "efficientnet_v2_m": "efficientnet",
+    "efficientnet_v2_s": "efficientnet",
+    "efficientnet_v2_xl": "efficientnet",
+    "ghostnet_050": "ghostnet",
+    "ghostnet_100": "ghostnet",
+    "ghostnet_130": "ghostnet",
+    "googlenet": "googlenet",
+    "halonet_50t": "halonet",
+    "hrnet_w32": "hrnet",
+    "hrnet_w48": "hrnet",
+    "inception_v3": "inceptionv3",
+    "inception_v4": "inceptionv4",
+    "mae_b_16_224_finetune": "mae",
+    "mae_b_16_224_pretrain": "mae",
+    "mae_h_14_224_finetune": "mae",
+    "mae_h_16_224_pretrain": "mae",
+    "mae_l_16_224_finetune": "mae",
+    "mae_l_16_224_pretrain": "mae",
+    "mixnet_l": "mixnet",
+    "mixnet_m": "mixnet",
+    "mixnet_s": "mixnet",
+    "mlp_mixer_b_p16": "mlpmixer",
+    "mlp_mixer_b_p32": "mlpmixer",
+    "mlp_mixer_h_p14": "mlpmixer",
+    "mlp_mixer_l_p16": "mlpmixer",
+    "mlp_mixer_l_p32": "mlpmixer",
+    "mlp_mixer_s_p16": "mlpmixer",
+    "mlp_mixer_s_p32": "mlpmixer",
+    "mnasnet_050": "mnasnet",
+    "mnasnet_075": "mnasnet",
+    "mnasnet_100": "mnasnet",
+    "mnasnet_130": "mnasnet",
+    "mnasnet_140": "mnasnet",
+    "mobilenet_v1_025": "mobilenetv1",
+    "mobilenet_v1_050": "mobilenetv1",
+    "mobilenet_v1_075": "mobilenetv1",
+    "mobilenet_v1_100": "mobilenetv1",
+    "mobilenet_v2_035_128": "mobilenetv2",
+    "mobilenet_v2_035_160": "mobilenetv2",
+    "mobilenet_v2_035_192": "mobilenetv2",
+    "mobilenet_v2_035_224": "mobilenetv2",
+    "mobilenet_v2_035_96": "mobilenetv2",
+    "mobilenet_v2_050_128": "mobilenetv2",
+    "mobilenet_v2_050_160": "mobilenetv2",
+    "mobilenet_v2_050_192": "mobilenetv2",
+    "mobilenet_v2_050_224": "mobilenetv2",
+    "mobilenet_v2_050_96": "mobilenetv2",
+    "mobilenet_v2_075": "mobilenetv2",
+    "mobilenet_v2_075_128": "mobilenetv2",
+    "mobilenet_v2_075_160": "mobilenetv2",
+    "mobilenet_v2_075_192": "mobilenetv2",
+    "mobilenet_v2_075_96": "mobilenetv2",
+    "mobilenet_v2_100": "mobilenetv2",
+    "mobilenet_v2_100_128": "mobilenetv2",
+    "mobilenet_v2_100_160": "mobilenetv2",
+    "mobilenet_v2_100_192": "mobilenetv2",
+    "mobilenet_v2_100_96": "mobilenetv2",
+    "mobilenet_v2_130_224": "mobilenetv2",
+    "mobilenet_v2_140": "mobilenetv2",
+    "mobilenet_v3_large_075": "mobilenetv3",
+    "mobilenet_v3_large_100": "mobilenetv3",
+    "mobilenet_v3_small_075": "mobilenetv3",
+    "mobilenet_v3_small_100": "mobilenetv3",
+    "mobilevit_small": "mobilevit",
+    "mobilevit_x_small": "mobilevit",
+    "mobilevit_xx_small": "mobilevit",
+    "nasnet_a_4x1056": "nasnet",
+    "pit_b": "pit",
+    "pit_s": "pit",
+    "pit_ti": "pit",
+    "pit_xs": "pit",
+    "pnasnet": "pnasnet",
+    "poolformer_m36": "poolformer",
+    "poolformer_m48": "poolformer",
+    "poolformer_s12": "poolformer",
+    "poolformer_s24": "poolformer",
+    "poolformer_s36": "poolformer",
+    "pvt_large": "pvt",
+    "pvt_medium": "pvt",
+    "pvt_small": "pvt",
+    "pvt_tiny": "pvt",
+    "pvt_v2_b0": "pvtv2",
+    "pvt_v2_b1": "pvtv2",
+    "pvt_v2_b2": "pvtv2",
+    "pvt_v2_b3": "pvtv2",
+    "pvt_v2_b4": "pvtv2",
+    "pvt_v2_b5": "pvtv2",
+    "regnet_x_12gf": "regnet",
+    "regnet_x_16gf": "regnet",
+    "regnet_x_1_6gf": "regnet",
+    "regnet_x_200mf": "regnet",
+    "regnet_x_32gf": "regnet",
+    "regnet_x_3_2gf": "regnet",
+    "regnet_x_400mf": "regnet",
+    "regnet_x_4_0gf": "regnet",
+    "regnet_x_600mf": "regnet",
+    "regnet_x_6_4gf": "regnet",
+    "regnet_x_800mf": "regnet",
+    "regnet_x_8_0gf": "regnet",
+    "regnet_y_12gf": "regnet",
+    "regnet_y_16gf": "regnet",
+    "regnet_y_1_6gf": "regnet",
+    "regnet_y_200mf": "regnet",
+    "regnet_y_32gf": "regnet",
+    "regnet_y_3_2gf": "regnet",
+    "regnet_y_400mf": "regnet",
+    "regnet_y_4_0gf": "regnet",
+    "regnet_y_600mf": "regnet",
+    "regnet_y_6_4gf": "regnet",
+    "regnet_y_800mf": "regnet",
+    "regnet_y_8_0gf": "regnet",
+    "repmlp_b224": "repmlp",
+    "repmlp_b256": "repmlp",
+    "repmlp_d256": "repmlp",
+    "repmlp_l256": "repmlp",
+    "repmlp_t224": "repmlp",
+    "repmlp_t256": "repmlp",
+    "repvgg_a0": "repvgg",
+    "repvgg_a1": "repvgg",
+    "repvgg_a2": "repvgg",
+    "repvgg_b0": "repvgg",
+    "repvgg_b1": "repvgg",
+    "repvgg_b1g2": "repvgg",
+    "repvgg_b1g4": "repvgg",
+    "repvgg_b2": "repvgg",
+    "repvgg_b2g4": "repvgg",
+    "repvgg_b3": "repvgg",
+    "res2net101": "res2net",
+    "res2net101_v1b": "res2net",
+    "res2net152": "res2net",
+    "res2net152_v1b": "res2net",
+    "res2net50": "res2net",
+    "res2net50_v1b": "res2net",
+    "resnest101": "resnest",
+    "resnest14": "resnest",
+    "resnest200": "resnest",
+    "resnest26": "resnest",
+    "resnest269": "resnest",
+    "resnest50": "resnest",
+    "resnet101": "resnet",
+    "resnet152": "resnet",
+    "resnet18": "resnet",
+    "resnet34": "resnet",
+    "resnet50": "resnet",
+    "resnetv2_101": "resnetv2",
+    "resnetv2_50": "resnetv2",
+    "resnext101_32x4d": "resnet",
+    "resnext101_64x4d": "resnet",
+    "resnext152_64x4d": "resnet",
+    "resnext50_32x4d": "resnet",
+    "rexnet_09": "rexnet",
+    "rexnet_10": "rexnet",
+    "rexnet_13": "rexnet",
+    "rexnet_15": "rexnet",
+    "rexnet_20": "rexnet",
+    "senet154": "senet",
+    "seresnet101": "senet",
+    "seresnet152": "senet",
+    "seresnet18": "senet",
+    "seresnet34": "senet",
+    "seresnet50": "senet",
+    "seresnext101_32x4d": "senet",
+    "seresnext26_32x4d": "senet",
+    "seresnext50_32x4d": "senet",
+    "shufflenet_v1_g3_05": "shufflenetv1",
+    "shufflenet_v1_g3_10": "shufflenetv1",
+    "shufflenet_v1_g3_15": "shufflenetv1",
+    "shufflenet_v1_g3_20": "shufflenetv1",
+    "shufflenet_v1_g8_05": "shufflenetv1",
+    "shufflenet_v1_g8_10": "shufflenetv1",
+    "shufflenet_v1_g8_15": "shufflenetv1",
+    "shufflenet_v1_g8_20": "shufflenetv1",
+    "shufflenet_v2_x0_5": "shufflenetv2",
+    "shufflenet_v2_x1_0": "shufflenetv2",
+    "shufflenet_v2_x1_5": "shufflenetv2",
+    "shufflenet_v2_x2_0": "shufflenetv2",
+    "skresnet18": "sknet",
+    "skresnet34": "sknet",
+    "skresnet50": "sknet",
+    "skresnext50_32x4d": "sknet",
+    "squeezenet1_0": "squeezenet",
+    "squeezenet1_1": "squeezenet",
+    "swin_tiny": "swintransformer",
+    "swinv2_base_window16": "swintransformerv2",
+    "swinv2_base_window8": "swintransformerv2",
+    "swinv2_small_window16": "swintransformerv2",
+    "swinv2_small_window8": "swintransformerv2",
+    "swinv2_tiny_window16": "swintransformerv2",
+    "swinv2_tiny_window8": "swintransformerv2",
+    "vgg11": "vgg",
+    "vgg13": "vgg",
+    "vgg16": "vgg",
+    "vgg19": "vgg",
+    "visformer_small": "visformer",
+    "visformer_small_v2": "visformer",
+    "visformer_tiny": "visformer",
+    "visformer_tiny_v2": "visformer",
+    "vit_b_16_224": "vit",
+    "vit_b_16_384": "vit",
+    "vit_b_32_224": "vit",
+    "vit_b_32_384": "vit",
+    "vit_l_16_224": "vit",
+    "vit_l_16_384": "vit",
+    "vit_l_32_224": "vit",
+    "volo_d1": "volo",
+    "volo_d2": "volo",
+    "volo_d3": "volo",
+    "volo_d4": "volo",
+    "volo_d5": "volo",
+    "xception": "xception",
+    "xcit_tiny_12_p16_224": "xcit",
+}
@@ -15,6 +15,7 @@ from mindspore import Tensor
 from mindspore.common import initializer as weight_init
 
 from .helpers import load_pretrained
+from .layers.attention import ScaledDotProductAttention
 from .layers.compatibility import Dropout, ResizeBilinear
 from .layers.drop_path import DropPath
 from .layers.identity import Identity
@@ -60,6 +61,7 @@ class Attention(nn.Cell):
         attn_drop: float = 0.0,
         proj_drop: float = 0.0,
         sr_ratio: int = 1,
+        attn_impl: str = "default",
     ):
         super(Attention, self).__init__()
         assert dim % num_heads == 0, f"dim {dim} should be divided by num_heads {num_heads}."
@@ -67,16 +69,12 @@ class Attention(nn.Cell):
         self.dim = dim
         self.num_heads = num_heads
         head_dim = dim // num_heads
-        self.scale = qk_scale or head_dim**-0.5
 
         self.q = nn.Dense(dim, dim, has_bias=qkv_bias)
         self.kv = nn.Dense(dim, dim * 2, has_bias=qkv_bias)
-        self.attn_drop = Dropout(p=attn_drop)
+        self.attention = ScaledDotProductAttention(qk_scale or head_dim**-0.5, attn_drop=attn_drop, attn_impl=attn_impl)
         self.proj = nn.Dense(dim, dim)
         self.proj_drop = Dropout(p=proj_drop)
-        self.qk_batmatmul = ops.BatchMatMul(transpose_b=True)
-        self.batmatmul = ops.BatchMatMul()
-        self.softmax = nn.Softmax(axis=-1)
         self.reshape = ops.reshape
         self.transpose = ops.transpose
 
@@ -102,10 +100,7 @@ class Attention(nn.Cell):
             kv = self.kv(x)
             kv = self.transpose(self.reshape(kv, (B, -1, 2, self.num_heads, C // self.num_heads)), (2, 0, 3, 1, 4))
         k, v = kv[0], kv[1]
-        attn = self.qk_batmatmul(q, k) * self.scale
-        attn = self.softmax(attn)
-        attn = self.attn_drop(attn)
-        x = self.batmatmul(attn, v)
+        x = self.attention(q, k, v)
         x = self.reshape(self.transpose(x, (0, 2, 1, 3)), (B, N, C))
         x = self.proj(x)
         x = self.proj_drop(x)
@@ -115,13 +110,13 @@ class Attention(nn.Cell):
 class Block(nn.Cell):
     """ Block with spatial-reduction attention (SRA) and feed forward"""
     def __init__(self, dim, num_heads, mlp_ratio=4., qkv_bias=False, qk_scale=None, drop=0., attn_drop=0.,
-                 drop_path=0., act_layer=nn.GELU, norm_layer=nn.LayerNorm, sr_ratio=1):
+                 drop_path=0., act_layer=nn.GELU, norm_layer=nn.LayerNorm, sr_ratio=1, attn_impl="default"):
         super(Block, self).__init__()
         self.norm1 = norm_layer([dim], epsilon=1e-5)
         self.attn = Attention(
             dim,
             num_heads=num_heads, qkv_bias=qkv_bias, qk_scale=qk_scale,
-            attn_drop=attn_drop, proj_drop=drop, sr_ratio=sr_ratio)
+            attn_drop=attn_drop, proj_drop=drop, sr_ratio=sr_ratio, attn_impl=attn_impl)
         # NOTE: drop path for stochastic depth, we shall see if this is better than dropout here
         self.drop_path = DropPath(drop_path) if drop_path > 0.0 else Identity()
         self.norm2 = norm_layer([dim])
@@ -190,12 +185,14 @@ class PyramidVisionTransformer(nn.Cell):
         depths (list) : number of Blocks.
         sr_ratios(list) : stride and kernel size of each attention.
         num_stages(int) : number of stage. Default: 4.
+        attn_impl(str) : implementation of the attention, "default" or "chunked", see `ScaledDotProductAttention`.
+            Default: "default".
     """
 
     def __init__(self, img_size=224, patch_size=4, in_chans=3, num_classes=1000, embed_dims=[64, 128, 320, 512],
                  num_heads=[1, 2, 5, 8], mlp_ratios=[8, 8, 4, 4], qkv_bias=True, qk_scale=None, drop_rate=0.0,
                  attn_drop_rate=0.0, drop_path_rate=0.0, norm_layer=nn.LayerNorm,
-                 depths=[2, 2, 2, 2], sr_ratios=[8, 4, 2, 1], num_stages=4):
+                 depths=[2, 2, 2, 2], sr_ratios=[8, 4, 2, 1], num_stages=4, attn_impl="default"):
         super(PyramidVisionTransformer, self).__init__()
         self.num_classes = num_classes
         self.depths = depths
@@ -209,7 +206,7 @@ class PyramidVisionTransformer(nn.Cell):
             block = nn.CellList(
                 [Block(dim=embed_dims[i], num_heads=num_heads[i], mlp_ratio=mlp_ratios[i], qkv_bias=qkv_bias,
                        qk_scale=qk_scale, drop=drop_rate, attn_drop=attn_drop_rate, drop_path=dpr[cur + j],
-                       norm_layer=norm_layer, sr_ratio=sr_ratios[i])
+                       norm_layer=norm_layer, sr_ratio=sr_ratios[i], attn_impl=attn_impl)
                  for j in range(depths[i])
                  ])
 
@@ -14,6 +14,7 @@ from mindspore.common import initializer as weight_init
 
 from .helpers import load_pretrained
 from .layers import DropPath, Identity
+from .layers.attention import ScaledDotProductAttention
 from .layers.compatibility import Dropout
 from .registry import register_model
 
@@ -96,23 +97,19 @@ class Attention(nn.Cell):
     """Linear Spatial Reduction Attention"""
 
     def __init__(self, dim, num_heads=8, qkv_bias=False, qk_scale=None, attn_drop=0., proj_drop=0., sr_ratio=1,
-                 linear=False):
+                 linear=False, attn_impl="default"):
         super().__init__()
         assert dim % num_heads == 0, f"dim {dim} should be divided by num_heads {num_heads}."
 
         self.dim = dim
         self.num_heads = num_heads
         head_dim = dim // num_heads
-        self.scale = qk_scale or head_dim**-0.5
 
         self.q = nn.Dense(dim, dim, has_bias=qkv_bias)
         self.kv = nn.Dense(dim, dim * 2, has_bias=qkv_bias)
-        self.attn_drop = Dropout(p=attn_drop)
+        self.attention = ScaledDotProductAttention(qk_scale or head_dim**-0.5, attn_drop=attn_drop, attn_impl=attn_impl)
         self.proj = nn.Dense(dim, dim)
         self.proj_drop = Dropout(p=proj_drop)
-        self.qk_batmatmul = ops.BatchMatMul(transpose_b=True)
-        self.batmatmul = ops.BatchMatMul()
-        self.softmax = nn.Softmax(axis=-1)
 
         self.linear = linear
         self.sr_ratio = sr_ratio
@@ -157,11 +154,7 @@ class Attention(nn.Cell):
                                (2, 0, 3, 1, 4))
         k, v = kv[0], kv[1]
 
-        attn = self.qk_batmatmul(q, k) * self.scale
-        attn = self.softmax(attn)
-        attn = self.attn_drop(attn)
-
-        x = self.batmatmul(attn, v)
+        x = self.attention(q, k, v)
         x = ops.reshape(ops.transpose(x, (0, 2, 1, 3)), (B, N, C))
         x = self.proj(x)
         x = self.proj_drop(x)
@@ -173,14 +166,15 @@ class Block(nn.Cell):
     """Block with Linear Spatial Reduction Attention and Convolutional Feed-Forward"""
 
     def __init__(self, dim, num_heads, mlp_ratio=4., qkv_bias=False, qk_scale=None, drop=0., attn_drop=0.,
-                 drop_path=0., act_layer=nn.GELU, norm_layer=nn.LayerNorm, sr_ratio=1, linear=False, block_id=0):
+                 drop_path=0., act_layer=nn.GELU, norm_layer=nn.LayerNorm, sr_ratio=1, linear=False, block_id=0,
+                 attn_impl="default"):
         super().__init__()
         self.norm1 = norm_layer([dim])
 
         self.attn = Attention(
             dim,
             num_heads=num_heads, qkv_bias=qkv_bias, qk_scale=qk_scale,
-            attn_drop=attn_drop, proj_drop=drop, sr_ratio=sr_ratio, linear=linear)
+            attn_drop=attn_drop, proj_drop=drop, sr_ratio=sr_ratio, linear=linear, attn_impl=attn_impl)
 
         # NOTE: drop path for stochastic depth, we shall see if this is better than dropout here
         self.drop_path = DropPath(drop_path) if drop_path > 0.0 else Identity()
@@ -246,12 +240,14 @@ class PyramidVisionTransformerV2(nn.Cell):
         sr_ratios(list) : stride and kernel size of each attention.
         num_stages(int) : number of stage. Default: 4.
         linear(bool) :  use linear SRA.
+        attn_impl(str) : implementation of the attention, "default" or "chunked", see `ScaledDotProductAttention`.
+            Default: "default".
     """
 
     def __init__(self, img_size=224, patch_size=16, in_chans=3, num_classes=1000, embed_dims=[64, 128, 256, 512],
                  num_heads=[1, 2, 4, 8], mlp_ratios=[4, 4, 4, 4], qkv_bias=False, qk_scale=None, drop_rate=0.,
                  attn_drop_rate=0., drop_path_rate=0., norm_layer=nn.LayerNorm,
-                 depths=[3, 4, 6, 3], sr_ratios=[8, 4, 2, 1], num_stages=4, linear=False):
+                 depths=[3, 4, 6, 3], sr_ratios=[8, 4, 2, 1], num_stages=4, linear=False, attn_impl="default"):
         super().__init__()
         self.num_classes = num_classes
         self.depths = depths
@@ -275,7 +271,7 @@ class PyramidVisionTransformerV2(nn.Cell):
                 dim=embed_dims[i], num_heads=num_heads[i], mlp_ratio=mlp_ratios[i], qkv_bias=qkv_bias,
                 qk_scale=qk_scale,
                 drop=drop_rate, attn_drop=attn_drop_rate, drop_path=dpr[cur + j], norm_layer=norm_layer,
-                sr_ratio=sr_ratios[i], linear=linear, block_id=j)
+                sr_ratio=sr_ratios[i], linear=linear, block_id=j, attn_impl=attn_impl)
                 for j in range(depths[i])])
 
             norm = norm_layer([embed_dims[i]])
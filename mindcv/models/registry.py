@@ -1,9 +1,17 @@
-"""model registry and list"""
+"""model registry and list
+
+The models of mindcv are listed in the static index `model_index`, so that their modules are imported on first
+use only, e.g. by `model_entrypoint`, instead of all of them by `import mindcv`. A model registered by
+`register_model` outside of the index, e.g. in a user module, is known once its module is imported.
+"""
 import fnmatch
+import importlib
 import sys
 from collections import defaultdict
 from copy import deepcopy
 
+from .model_index import EXPORTS, MODELS
+
 __all__ = [
     "list_models",
     "is_model",
@@ -22,6 +30,28 @@ _model_entrypoints = {}
 _model_has_pretrained = set()
 _model_pretrained_cfgs = dict()
 
+for _model_name, (_module_name, _has_pretrained) in MODELS.items():
+    _model_to_module[_model_name] = _module_name
+    _module_to_models[_module_name].add(_model_name)
+    if _has_pretrained:
+        _model_has_pretrained.add(_model_name)
+
+
+def import_model_module(module_name):
+    """Imports a model module of the index, which registers its models, and exports its names from
+    `mindcv.models`, as `from .module import *` would."""
+    module = importlib.import_module(f"{__package__}.{module_name}")
+    package = sys.modules[__package__]
+    for name in module.__all__:
+        if EXPORTS.get(name) == module_name:
+            setattr(package, name, getattr(module, name))
+    return module
+
+
+def _import_model(model_name):
+    if model_name not in _model_entrypoints and model_name in MODELS:
+        import_model_module(MODELS[model_name][0])
+
 
 def register_model(fn):
     # lookup containing module
@@ -54,7 +84,7 @@ def list_models(filter="", module="", pretrained=False, exclude_filters=""):
     if module:
         all_models = list(_module_to_models[module])
     else:
-        all_models = _model_entrypoints.keys()
+        all_models = _model_to_module.keys()
 
     if filter:
         models = []
@@ -86,13 +116,14 @@ def is_model(model_name):
     """
     Check if a model name exists
     """
-    return model_name in _model_entrypoints
+    return model_name in _model_entrypoints or model_name in MODELS
 
 
 def model_entrypoint(model_name):
     """
-    Fetch a model entrypoint for specified model name
+    Fetch a model entrypoint for specified model name, importing its module if needed
     """
+    _import_model(model_name)
     return _model_entrypoints[model_name]
 
 
@@ -120,6 +151,7 @@ def is_model_pretrained(model_name):
 
 
 def get_pretrained_cfg(model_name):
+    _import_model(model_name)
     if model_name in _model_pretrained_cfgs:
         return deepcopy(_model_pretrained_cfgs[model_name])
     return {}
@@ -127,6 +159,7 @@ def get_pretrained_cfg(model_name):
 
 def get_pretrained_cfg_value(model_name, cfg_key):
     """Get a specific model default_cfg value by key. None if it doesn't exist."""
+    _import_model(model_name)
     if model_name in _model_pretrained_cfgs:
         return _model_pretrained_cfgs[model_name].get(cfg_key, None)
     return None
@@ -134,6 +167,7 @@ def get_pretrained_cfg_value(model_name, cfg_key):
 
 def has_pretrained_cfg_key(model_name, cfg_key):
     """Query model default_cfgs for existence of a specific key."""
+    _import_model(model_name)
     if model_name in _model_pretrained_cfgs and cfg_key in _model_pretrained_cfgs[model_name]:
         return True
     return False
@@ -10,6 +10,7 @@ import numpy as np
 import mindspore.common.initializer as init
 from mindspore import Tensor, nn, ops
 
+from .deploy import reparameterize
 from .helpers import load_pretrained
 from .registry import register_model
 
@@ -67,17 +68,14 @@ def conv_bn_relu(in_channels, out_channels, kernel_size, stride, padding, group=
 
 
 def fuse_bn(conv_or_fc, bn):
-    std = (bn.running_var + bn.eps).sqrt()
-    t = bn.weight / std
-    t = t.reshape(-1, 1, 1, 1)
-
-    if len(t) == conv_or_fc.weight.size(0):
-        return conv_or_fc.weight * t, bn.bias - bn.running_mean * bn.weight / std
-    else:
-        repeat_times = conv_or_fc.weight.size(0) // len(t)
-        repeated = t.repeat_interleave(repeat_times, 0)
-        return conv_or_fc.weight * repeated, (bn.bias - bn.running_mean * bn.weight / std).repeat_interleave(
-            repeat_times, 0)
+    """The weight and the bias of `conv_or_fc` followed by `bn` in inference mode, as numpy arrays. The channels of
+    `bn` may be repeated over the output channels, e.g. `fc3` of `RepMLPBlock` followed by a BN over its sharesets."""
+    std = np.sqrt(bn.moving_variance.asnumpy() + bn.eps)
+    t = bn.gamma.asnumpy() / std
+    bias = bn.beta.asnumpy() - bn.moving_mean.asnumpy() * t
+    weight = conv_or_fc.weight.asnumpy()
+    repeat_times = weight.shape[0] // len(t)
+    return weight * np.repeat(t, repeat_times).reshape(-1, 1, 1, 1), np.repeat(bias, repeat_times)
 
 
 class GlobalPerceptron(nn.Cell):
@@ -196,42 +194,58 @@ class RepMLPBlock(nn.Cell):
         fc_weight, fc_bias = fuse_bn(self.fc3, self.fc3_bn)
         if self.reparam_conv_k is not None:
             largest_k = max(self.reparam_conv_k)
-            largest_branch = self.__getattr__("repconv{}".format(largest_k))
-            total_kernel, total_bias = fuse_bn(largest_branch.conv, largest_branch.bn)
+            total_kernel = np.zeros((self.S, 1, largest_k, largest_k), np.float32)
+            total_bias = np.zeros(self.S, np.float32)
             for k in self.reparam_conv_k:
-                if k != largest_k:
-                    k_branch = self.__getattr__("repconv{}".format(k))
-                    kernel, bias = fuse_bn(k_branch.conv, k_branch.bn)
-                    total_kernel += nn.Pad(kernel, [(largest_k - k) // 2] * 4)
-                    total_bias += bias
+                k_branch = self.__getattr__("repconv{}".format(k))
+                kernel, bias = fuse_bn(k_branch.conv, k_branch.bn)
+                pad = (largest_k - k) // 2
+                total_kernel[:, :, pad : pad + k, pad : pad + k] += kernel
+                total_bias += bias
             rep_weight, rep_bias = self._convert_conv_to_fc(total_kernel, total_bias)
-            final_fc3_weight = rep_weight.reshape_as(fc_weight) + fc_weight
+            final_fc3_weight = rep_weight + fc_weight
             final_fc3_bias = rep_bias + fc_bias
         else:
             final_fc3_weight = fc_weight
             final_fc3_bias = fc_bias
         return final_fc3_weight, final_fc3_bias
 
-    def local_inject(self):
-        self.deploy = True
+    def switch_to_deploy(self):
+        """Merges the Local Perceptron and the BN into `fc3` and removes them, see `reparameterize`."""
+        if self.deploy:
+            return
         #   Locality Injection
         fc3_weight, fc3_bias = self.get_equivalent_fc3()
         #   Remove Local Perceptron
         if self.reparam_conv_k is not None:
             for k in self.reparam_conv_k:
                 self.__delattr__("repconv{}".format(k))
-        self.__delattr__("fc3")
+        self.conv_branch_k = []
         self.__delattr__("fc3_bn")
-        self.fc3 = nn.Conv2d(self.S * self.h * self.w, self.S * self.h * self.w, 1, 1, 0, has_bias=True, group=self.S)
+        self.fc3 = nn.Conv2d(self.S * self.h * self.w, self.S * self.h * self.w, 1, 1, has_bias=True, group=self.S)
         self.fc3_bn = ops.Identity()
-        self.fc3.weight.data = fc3_weight
-        self.fc3.bias.data = fc3_bias
+        self.fc3.weight.set_data(Tensor(fc3_weight, self.fc3.weight.dtype))
+        self.fc3.bias.set_data(Tensor(fc3_bias, self.fc3.bias.dtype))
+        self.deploy = True
+
+    def local_inject(self):
+        self.switch_to_deploy()
 
     def _convert_conv_to_fc(self, conv_kernel, conv_bias):
-        I = ops.eye(self.h * self.w).repeat(1, self.S).reshape(self.h * self.w, self.S, self.h, self.w)  # noqa: E741
-        fc_k = ops.Conv2D(I, conv_kernel, pad=(conv_kernel.size(2) // 2, conv_kernel.size(3) // 2), group=self.S)
-        fc_k = fc_k.reshape(self.h * self.w, self.S * self.h * self.w).t()
-        fc_bias = conv_bias.repeat_interleave(self.h * self.w)
+        """The weight of `fc3` equivalent to the depthwise conv of the sharesets on a h x w partition, i.e.
+        fc[s, oy, ox, iy, ix] = kernel[s, 0, iy - oy + pad, ix - ox + pad], and its bias."""
+        k = conv_kernel.shape[2]
+        pad = k // 2
+        fc_k = np.zeros((self.S, self.h, self.w, self.h, self.w), np.float32)
+        for dy in range(k):
+            oy = np.arange(max(0, pad - dy), min(self.h, self.h + pad - dy))
+            for dx in range(k):
+                ox = np.arange(max(0, pad - dx), min(self.w, self.w + pad - dx))
+                fc_k[:, oy[:, None], ox[None, :], oy[:, None] + dy - pad, ox[None, :] + dx - pad] += conv_kernel[
+                    :, 0, dy, dx
+                ].reshape(-1, 1, 1)
+        fc_k = fc_k.reshape(self.S * self.h * self.w, self.h * self.w, 1, 1)
+        fc_bias = np.repeat(conv_bias, self.h * self.w)
         return fc_k, fc_bias
 
 
@@ -378,9 +392,7 @@ class RepMLPNet(nn.Cell):
 
 
 def locality_injection(self):
-    for m in self.modules():
-        if hasattr(m, "local_inject"):
-            m.local_inject()
+    reparameterize(self)
 
 
 @register_model
@@ -486,6 +498,6 @@ if __name__ == "__main__":
     model = repmlp_b256()
     origin_y = model(dummy_input)
 
-    model.locality_injection()
+    locality_injection(model)
     print(model)
     print(origin_y)
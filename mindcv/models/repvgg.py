@@ -8,8 +8,9 @@ import copy
 import numpy as np
 
 import mindspore.common.initializer as init
-from mindspore import Tensor, nn, ops, save_checkpoint
+from mindspore import Tensor, nn, ops
 
+from .deploy import reparameterize
 from .helpers import build_model_with_cfg
 from .layers import GlobalAvgPooling, Identity, SqueezeExcite
 from .registry import register_model
@@ -116,15 +117,15 @@ class RepVGGBlock(nn.Cell):
 
     def get_custom_l2(self):
         """This may improve the accuracy and facilitates quantization in some cases."""
-        k3 = self.rbr_dense.conv.weight
-        k1 = self.rbr_1x1.conv.weight
+        k3 = self.rbr_dense[0].weight
+        k1 = self.rbr_1x1[0].weight
 
-        t3 = self.rbr_dense.bn.weight / (
-            ops.sqrt((self.rbr_dense.bn.moving_variance + self.rbr_dense.bn.eps)))
+        t3 = self.rbr_dense[1].gamma / (
+            ops.sqrt((self.rbr_dense[1].moving_variance + self.rbr_dense[1].eps)))
         t3 = ops.reshape(t3, (-1, 1, 1, 1))
 
-        t1 = (self.rbr_1x1.bn.weight /
-              ((self.rbr_1x1.bn.moving_variance + self.rbr_1x1.bn.eps).sqrt()))
+        t1 = (self.rbr_1x1[1].gamma /
+              ((self.rbr_1x1[1].moving_variance + self.rbr_1x1[1].eps).sqrt()))
         t1 = ops.reshape(t1, (-1, 1, 1, 1))
 
         l2_loss_circle = ops.reduce_sum(k3 ** 2) - ops.reduce_sum(k3[:, :, 1:2, 1:2] ** 2)
@@ -151,12 +152,13 @@ class RepVGGBlock(nn.Cell):
         if branch is None:
             return 0, 0
         if isinstance(branch, nn.SequentialCell):
-            kernel = branch.conv.weight
-            moving_mean = branch.bn.moving_mean
-            moving_variance = branch.bn.moving_variance
-            gamma = branch.bn.gamma
-            beta = branch.bn.beta
-            eps = branch.bn.eps
+            conv, bn = branch[0], branch[1]
+            kernel = conv.weight
+            moving_mean = bn.moving_mean
+            moving_variance = bn.moving_variance
+            gamma = bn.gamma
+            beta = bn.beta
+            eps = bn.eps
         else:
             assert isinstance(branch, (nn.BatchNorm2d, nn.SyncBatchNorm))
             if not hasattr(self, "id_tensor"):
@@ -164,7 +166,7 @@ class RepVGGBlock(nn.Cell):
                 kernel_value = np.zeros((self.in_channels, input_dim, 3, 3), dtype=np.float32)
                 for i in range(self.in_channels):
                     kernel_value[i, i % input_dim, 1, 1] = 1
-                self.id_tensor = Tensor(kernel_value, dtype=branch.weight.dtype)
+                self.id_tensor = Tensor(kernel_value, dtype=branch.gamma.dtype)
             kernel = self.id_tensor
             moving_mean = branch.moving_mean
             moving_variance = branch.moving_variance
@@ -176,23 +178,19 @@ class RepVGGBlock(nn.Cell):
         return kernel * t, beta - moving_mean * gamma / std
 
     def switch_to_deploy(self):
-        """Model_convert"""
+        """Merges the branches into the single conv `rbr_reparam` and removes them, see `reparameterize`."""
         if self.rbr_reparam is not None:
             return
         kernel, bias = self.get_equivalent_kernel_bias()
-        self.rbr_reparam = nn.Conv2d(in_channels=self.rbr_dense.conv.in_channels,
-                                     out_channels=self.rbr_dense.conv.out_channels,
-                                     kernel_size=self.rbr_dense.conv.kernel_size, stride=self.rbr_dense.conv.stride,
-                                     padding=self.rbr_dense.conv.padding, dilation=self.rbr_dense.conv.dilation,
-                                     group=self.rbr_dense.conv.group, has_bias=True, pad_mode="pad")
-        self.rbr_reparam.weight.data = kernel
-        self.rbr_reparam.bias.data = bias
-        for para in self.parameters():
-            para.detach_()
+        conv = self.rbr_dense[0]
+        self.rbr_reparam = nn.Conv2d(in_channels=conv.in_channels, out_channels=conv.out_channels,
+                                     kernel_size=conv.kernel_size, stride=conv.stride, padding=conv.padding,
+                                     dilation=conv.dilation, group=conv.group, has_bias=True, pad_mode="pad")
+        self.rbr_reparam.weight.set_data(kernel)
+        self.rbr_reparam.bias.set_data(bias)
         self.__delattr__("rbr_dense")
         self.__delattr__("rbr_1x1")
-        if hasattr(self, "rbr_identity"):
-            self.__delattr__("rbr_identity")
+        self.__delattr__("rbr_identity")
         if hasattr(self, "id_tensor"):
             self.__delattr__("id_tensor")
         self.deploy = True
@@ -302,7 +300,7 @@ def repvgg_a0(pretrained: bool = False, num_classes: int = 1000, in_channels=3,
     """
     default_cfg = default_cfgs["repvgg_a0"]
     model_args = dict(num_blocks=[2, 4, 14, 1], num_classes=num_classes, in_channels=in_channels,
-                      width_multiplier=[0.75, 0.75, 0.75, 2.5], override_group_map=None, deploy=False, **kwargs)
+                      width_multiplier=[0.75, 0.75, 0.75, 2.5], override_group_map=None, **kwargs)
     return _create_repvgg(pretrained, **dict(default_cfg=default_cfg, **model_args))
 
 
@@ -313,7 +311,7 @@ def repvgg_a1(pretrained: bool = False, num_classes: int = 1000, in_channels=3,
      """
     default_cfg = default_cfgs["repvgg_a1"]
     model_args = dict(num_blocks=[2, 4, 14, 1], num_classes=num_classes, in_channels=in_channels,
-                      width_multiplier=[1.0, 1.0, 1.0, 2.5], override_group_map=None, deploy=False, **kwargs)
+                      width_multiplier=[1.0, 1.0, 1.0, 2.5], override_group_map=None, **kwargs)
     return _create_repvgg(pretrained, **dict(default_cfg=default_cfg, **model_args))
 
 
@@ -324,7 +322,7 @@ def repvgg_a2(pretrained: bool = False, num_classes: int = 1000, in_channels=3,
      """
     default_cfg = default_cfgs["repvgg_a2"]
     model_args = dict(num_blocks=[2, 4, 14, 1], num_classes=num_classes, in_channels=in_channels,
-                      width_multiplier=[1.5, 1.5, 1.5, 2.75], override_group_map=None, deploy=False, **kwargs)
+                      width_multiplier=[1.5, 1.5, 1.5, 2.75], override_group_map=None, **kwargs)
     return _create_repvgg(pretrained, **dict(default_cfg=default_cfg, **model_args))
 
 
@@ -335,7 +333,7 @@ def repvgg_b0(pretrained: bool = False, num_classes: int = 1000, in_channels=3,
      """
     default_cfg = default_cfgs['repvgg_b0']
     model_args = dict(num_blocks=[4, 6, 16, 1], num_classes=num_classes, in_channels=in_channels,
-                      width_multiplier=[1.0, 1.0, 1.0, 2.5], override_group_map=None, deploy=False, **kwargs)
+                      width_multiplier=[1.0, 1.0, 1.0, 2.5], override_group_map=None, **kwargs)
     return _create_repvgg(pretrained, **dict(default_cfg=default_cfg, **model_args))
 
 
@@ -346,7 +344,7 @@ def repvgg_b1(pretrained: bool = False, num_classes: int = 1000, in_channels=3,
      """
     default_cfg = default_cfgs['repvgg_b1']
     model_args = dict(num_blocks=[4, 6, 16, 1], num_classes=num_classes, in_channels=in_channels,
-                      width_multiplier=[2.0, 2.0, 2.0, 4.0], override_group_map=None, deploy=False, **kwargs)
+                      width_multiplier=[2.0, 2.0, 2.0, 4.0], override_group_map=None, **kwargs)
     return _create_repvgg(pretrained, **dict(default_cfg=default_cfg, **model_args))
 
 
@@ -357,7 +355,7 @@ def repvgg_b2(pretrained: bool = False, num_classes: int = 1000, in_channels=3,
      """
     default_cfg = default_cfgs['repvgg_b2']
     model_args = dict(num_blocks=[4, 6, 16, 1], num_classes=num_classes, in_channels=in_channels,
-                      width_multiplier=[2.5, 2.5, 2.5, 5.0], override_group_map=None, deploy=False, **kwargs)
+                      width_multiplier=[2.5, 2.5, 2.5, 5.0], override_group_map=None, **kwargs)
     return _create_repvgg(pretrained, **dict(default_cfg=default_cfg, **model_args))
 
 
@@ -368,7 +366,7 @@ def repvgg_b3(pretrained: bool = False, num_classes: int = 1000, in_channels=3,
      """
     default_cfg = default_cfgs['repvgg_b3']
     model_args = dict(num_blocks=[4, 6, 16, 1], num_classes=num_classes, in_channels=in_channels,
-                      width_multiplier=[3.0, 3.0, 3.0, 5.0], override_group_map=None, deploy=False, **kwargs)
+                      width_multiplier=[3.0, 3.0, 3.0, 5.0], override_group_map=None, **kwargs)
     return _create_repvgg(pretrained, **dict(default_cfg=default_cfg, **model_args))
 
 
@@ -384,7 +382,7 @@ def repvgg_b1g2(pretrained: bool = False, num_classes: int = 1000, in_channels=3
     """
     default_cfg = default_cfgs["repvgg_b1g2"]
     model_args = dict(num_blocks=[4, 6, 16, 1], num_classes=num_classes, in_channels=in_channels,
-                      width_multiplier=[2.0, 2.0, 2.0, 4.0], override_group_map=g2_map, deploy=False, **kwargs)
+                      width_multiplier=[2.0, 2.0, 2.0, 4.0], override_group_map=g2_map, **kwargs)
     return _create_repvgg(pretrained, **dict(default_cfg=default_cfg, **model_args))
 
 
@@ -395,7 +393,7 @@ def repvgg_b1g4(pretrained: bool = False, num_classes: int = 1000, in_channels=3
     """
     default_cfg = default_cfgs["repvgg_b1g4"]
     model_args = dict(num_blocks=[4, 6, 16, 1], num_classes=num_classes, in_channels=in_channels,
-                      width_multiplier=[2.0, 2.0, 2.0, 4.0], override_group_map=g4_map, deploy=False, **kwargs)
+                      width_multiplier=[2.0, 2.0, 2.0, 4.0], override_group_map=g4_map, **kwargs)
     return _create_repvgg(pretrained, **dict(default_cfg=default_cfg, **model_args))
 
 
@@ -406,7 +404,7 @@ def repvgg_b2g4(pretrained: bool = False, num_classes: int = 1000, in_channels=3
     """
     default_cfg = default_cfgs["repvgg_b2g4"]
     model_args = dict(num_blocks=[4, 6, 16, 1], num_classes=num_classes, in_channels=in_channels,
-                      width_multiplier=[2.5, 2.5, 2.5, 5.0], override_group_map=g4_map, deploy=False, **kwargs)
+                      width_multiplier=[2.5, 2.5, 2.5, 5.0], override_group_map=g4_map, **kwargs)
     return _create_repvgg(pretrained, **dict(default_cfg=default_cfg, **model_args))
 
 
@@ -414,9 +412,5 @@ def repvgg_model_convert(model: nn.Cell, save_path=None, do_copy=True):
     """repvgg_model_convert"""
     if do_copy:
         model = copy.deepcopy(model)
-    for module in model.modules():
-        if hasattr(module, "switch_to_deploy"):
-            module.switch_to_deploy()
-    if save_path is not None:
-        save_checkpoint(model.parameters_and_names(), save_path)
+    reparameterize(model, save_path=save_path)
     return model
@@ -10,6 +10,7 @@ from mindspore import nn, numpy, ops
 
 from .helpers import _ntuple, load_pretrained
 from .layers import DropPath, Identity
+from .layers.attention import ScaledDotProductAttention
 from .layers.compatibility import Dropout
 from .registry import register_model
 
@@ -197,7 +198,6 @@ class WindowAttention(nn.Cell):
         self.window_size = window_size  # Wh, Ww
         self.num_heads = num_heads
         head_dim = dim // num_heads
-        self.scale = Tensor(qk_scale or head_dim**-0.5, mstype.float32)
         self.relative_bias = RelativeBias(self.window_size, num_heads)
 
         # get pair-wise relative position index for each token inside the window
@@ -205,11 +205,9 @@ class WindowAttention(nn.Cell):
         self.k = nn.Dense(in_channels=dim, out_channels=dim, has_bias=qkv_bias)
         self.v = nn.Dense(in_channels=dim, out_channels=dim, has_bias=qkv_bias)
 
-        self.attn_drop = Dropout(p=attn_drop)
+        self.attention = ScaledDotProductAttention(qk_scale or head_dim**-0.5, attn_drop=attn_drop)
         self.proj = nn.Dense(in_channels=dim, out_channels=dim, has_bias=True)
         self.proj_drop = Dropout(p=proj_drop)
-        self.softmax = nn.Softmax(axis=-1)
-        self.batch_matmul = ops.BatchMatMul()
 
     def construct(self, x: Tensor, mask: Optional[Tensor] = None) -> Tensor:
         """
@@ -218,25 +216,20 @@ class WindowAttention(nn.Cell):
             mask: (0/-inf) mask with shape of (num_windows, Wh*Ww, Wh*Ww) or None
         """
         b_, n, c = x.shape
-        q = ops.reshape(self.q(x), (b_, n, self.num_heads, c // self.num_heads)) * self.scale
-        q = ops.transpose(q, (0, 2, 1, 3))
-        k = ops.reshape(self.k(x), (b_, n, self.num_heads, c // self.num_heads))
-        k = ops.transpose(k, (0, 2, 3, 1))
-        v = ops.reshape(self.v(x), (b_, n, self.num_heads, c // self.num_heads))
-        v = ops.transpose(v, (0, 2, 1, 3))
-
-        attn = self.batch_matmul(q, k)
-        attn = attn + self.relative_bias()
+        q = ops.transpose(ops.reshape(self.q(x), (b_, n, self.num_heads, c // self.num_heads)), (0, 2, 1, 3))
+        k = ops.transpose(ops.reshape(self.k(x), (b_, n, self.num_heads, c // self.num_heads)), (0, 2, 1, 3))
+        v = ops.transpose(ops.reshape(self.v(x), (b_, n, self.num_heads, c // self.num_heads)), (0, 2, 1, 3))
 
+        attn_bias = self.relative_bias()
         if mask is not None:
+            # the windows of an image are split from the batch, so that the mask of each window broadcasts
             nw = mask.shape[1]
-            attn = ops.reshape(attn, (b_ // nw, nw, self.num_heads, n, n,)) + mask
-            attn = ops.reshape(attn, (-1, self.num_heads, n, n,))
-            attn = self.softmax(attn)
-        else:
-            attn = self.softmax(attn)
-        attn = self.attn_drop(attn)
-        x = ops.reshape(ops.transpose(self.batch_matmul(attn, v), (0, 2, 1, 3)), (b_, n, c))
+            q = ops.reshape(q, (b_ // nw, nw, self.num_heads, n, -1))
+            k = ops.reshape(k, (b_ // nw, nw, self.num_heads, n, -1))
+            v = ops.reshape(v, (b_ // nw, nw, self.num_heads, n, -1))
+            attn_bias = attn_bias + mask
+        x = ops.reshape(self.attention(q, k, v, attn_bias), (b_, self.num_heads, n, -1))
+        x = ops.reshape(ops.transpose(x, (0, 2, 1, 3)), (b_, n, c))
         x = self.proj(x)
         x = self.proj_drop(x)
         return x
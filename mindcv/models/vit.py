@@ -4,11 +4,11 @@ from typing import Callable, Optional
 
 import numpy as np
 
-import mindspore as ms
-from mindspore import Parameter, Tensor, nn, ops
+from mindspore import Parameter, nn, ops
 from mindspore.common.initializer import TruncatedNormal, XavierUniform, initializer
 
 from .helpers import load_pretrained
+from .layers.attention import ScaledDotProductAttention
 from .layers.compatibility import Dropout
 from .layers.drop_path import DropPath
 from .layers.mlp import Mlp
@@ -57,7 +57,6 @@ default_cfgs = {
 }
 
 
-# TODO: Flash Attention
 class Attention(nn.Cell):
     """
     Attention layer implementation, Rearrange Input -> B x N x hidden size.
@@ -69,6 +68,8 @@ class Attention(nn.Cell):
         qk_norm (bool): Specifies whether to do normalization to q and k.
         attn_drop (float): The drop rate of attention, greater than 0 and less equal than 1. Default: 0.0.
         proj_drop (float): The drop rate of output, greater than 0 and less equal than 1. Default: 0.0.
+        attn_impl (str): The implementation of the attention, "default" or "chunked" to process the keys in chunks
+            with less memory, see `ScaledDotProductAttention`. Default: "default".
 
     Returns:
         Tensor, output tensor.
@@ -85,27 +86,24 @@ class Attention(nn.Cell):
         attn_drop: float = 0.0,
         proj_drop: float = 0.0,
         norm_layer: nn.Cell = nn.LayerNorm,
+        attn_impl: str = "default",
     ):
         super(Attention, self).__init__()
         assert dim % num_heads == 0, 'dim should be divisible by num_heads'
         self.num_heads = num_heads
         self.head_dim = dim // num_heads
-        self.scale = Tensor(self.head_dim ** -0.5)
 
         self.qkv = nn.Dense(dim, dim * 3, has_bias=qkv_bias)
         self.q_norm = norm_layer((self.head_dim,)) if qk_norm else nn.Identity()
         self.k_norm = norm_layer((self.head_dim,)) if qk_norm else nn.Identity()
 
-        self.attn_drop = Dropout(attn_drop)
+        self.attention = ScaledDotProductAttention(self.head_dim**-0.5, attn_drop=attn_drop, attn_impl=attn_impl)
         self.proj = nn.Dense(dim, dim)
         self.proj_drop = Dropout(proj_drop)
 
-        self.mul = ops.Mul()
         self.reshape = ops.Reshape()
         self.transpose = ops.Transpose()
         self.unstack = ops.Unstack(axis=0)
-        self.attn_matmul_v = ops.BatchMatMul()
-        self.q_matmul_k = ops.BatchMatMul(transpose_b=True)
 
     def construct(self, x):
         b, n, c = x.shape
@@ -115,14 +113,7 @@ class Attention(nn.Cell):
         q, k, v = self.unstack(qkv)
         q, k = self.q_norm(q), self.k_norm(k)
 
-        q = self.mul(q, self.scale**0.5)
-        k = self.mul(k, self.scale**0.5)
-        attn = self.q_matmul_k(q, k)
-
-        attn = ops.softmax(attn.astype(ms.float32), axis=-1).astype(attn.dtype)
-        attn = self.attn_drop(attn)
-
-        out = self.attn_matmul_v(attn, v)
+        out = self.attention(q, k, v)
         out = self.transpose(out, (0, 2, 1, 3))
         out = self.reshape(out, (b, n, c))
         out = self.proj(out)
@@ -174,6 +165,7 @@ class Block(nn.Cell):
             normalization layer (if not None), otherwise on top of the conv layer. Default: nn.GELU.
         norm_layer (nn.Cell): Norm layer that will be stacked on top of the convolution
             layer. Default: nn.LayerNorm.
+        attn_impl (str): The implementation of the attention, see `Attention`. Default: "default".
 
     Returns:
         Tensor, output tensor.
@@ -195,6 +187,7 @@ class Block(nn.Cell):
         act_layer: nn.Cell = nn.GELU,
         norm_layer: nn.Cell = nn.LayerNorm,
         mlp_layer: Callable = Mlp,
+        attn_impl: str = "default",
     ):
         super(Block, self).__init__()
         self.norm1 = norm_layer((dim,))
@@ -206,6 +199,7 @@ class Block(nn.Cell):
             attn_drop=attn_drop,
             proj_drop=proj_drop,
             norm_layer=norm_layer,
+            attn_impl=attn_impl,
         )
         self.ls1 = LayerScale(dim=dim, init_values=init_values) if init_values else nn.Identity()
         self.drop_path1 = DropPath(drop_path) if drop_path > 0. else nn.Identity()
@@ -228,7 +222,8 @@ class Block(nn.Cell):
 
 class VisionTransformer(nn.Cell):
     '''
-    ViT encoder, which returns the feature encoded by transformer encoder.
+    ViT encoder, which returns the feature encoded by transformer encoder. `attn_impl` selects the implementation
+    of the attention of every block, "default" or "chunked" (see `ScaledDotProductAttention`).
     '''
     def __init__(
         self,
@@ -262,6 +257,7 @@ class VisionTransformer(nn.Cell):
         class_token: bool = True,
         block_fn: Callable = Block,
         num_classes: int = 1000,
+        attn_impl: str = "default",
     ):
         super(VisionTransformer, self).__init__()
         assert global_pool in ('', 'avg', 'token')
@@ -311,7 +307,7 @@ class VisionTransformer(nn.Cell):
                 dim=embed_dim, num_heads=num_heads, qkv_bias=qkv_bias, qk_norm=qk_norm,
                 attn_drop=attn_drop_rate, proj_drop=proj_drop_rate,
                 mlp_ratio=mlp_ratio, drop_path=dpr[i], init_values=init_values,
-                act_layer=act_layer, norm_layer=norm_layer, mlp_layer=mlp_layer,
+                act_layer=act_layer, norm_layer=norm_layer, mlp_layer=mlp_layer, attn_impl=attn_impl,
             ) for i in range(depth)
         ])
 
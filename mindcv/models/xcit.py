@@ -13,6 +13,7 @@ from mindspore import dtype as mstype
 from mindspore import nn, numpy, ops
 
 from .helpers import _ntuple, load_pretrained
+from .layers.attention import ScaledDotProductAttention
 from .layers.compatibility import Dropout
 from .layers.drop_path import DropPath
 from .layers.mlp import Mlp
@@ -190,16 +191,12 @@ class ClassAttention(nn.Cell):
         super().__init__()
         self.num_heads = num_heads
         head_dim = dim // num_heads
-        self.scale = qk_scale or head_dim ** -0.5
 
         self.qkv = nn.Dense(
             in_channels=dim, out_channels=dim * 3, has_bias=qkv_bias)
-        self.attn_drop = Dropout(p=attn_drop)
+        self.attention = ScaledDotProductAttention(qk_scale or head_dim ** -0.5, attn_drop=attn_drop)
         self.proj = nn.Dense(in_channels=dim, out_channels=dim)
         self.proj_drop = Dropout(p=proj_drop)
-        self.softmax = nn.Softmax(axis=-1)
-
-        self.attn_matmul_v = ops.BatchMatMul()
 
     def construct(self, x: Tensor) -> Tensor:
         B, N, C = x.shape
@@ -209,12 +206,7 @@ class ClassAttention(nn.Cell):
         qkv = ops.transpose(qkv, (2, 0, 3, 1, 4))
         q, k, v = ops.unstack(qkv, axis=0)
         qc = q[:, :, 0:1]
-        attn_cls = (qc * k).sum(-1) * self.scale
-        attn_cls = self.softmax(attn_cls)
-        attn_cls = self.attn_drop(attn_cls)
-
-        attn_cls = ops.expand_dims(attn_cls, 2)
-        cls_tkn = self.attn_matmul_v(attn_cls, v)
+        cls_tkn = self.attention(qc, k, v)
         cls_tkn = ops.transpose(cls_tkn, (0, 2, 1, 3))
         cls_tkn = ops.reshape(cls_tkn, (B, 1, C))
         cls_tkn = self.proj(cls_tkn)
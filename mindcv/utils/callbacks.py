@@ -1,4 +1,5 @@
 """Callbacks for mindspore.Model"""
+import json
 import logging
 import os
 from time import time
@@ -15,15 +16,50 @@ from .reduce_manager import AllReduceSum
 __all__ = [
     "StateMonitor",
     "ValCallback",
+    "load_data_state",
 ]
 
 _logger = logging.getLogger(__name__)
 
 
+def get_data_state_path(ckpt_path):
+    """Path of the data state saved along with the checkpoint `ckpt_path`."""
+    return os.path.splitext(ckpt_path)[0] + ".json"
+
+
+def load_data_state(ckpt_path):
+    """
+    Load the data state saved by `StateMonitor` along with the checkpoint `ckpt_path`.
+
+    Returns:
+        A dict with the number of finished epochs `epoch`, the number of batches finished in the current epoch
+        `batch`, the global step `step`, the number of batches per epoch `num_batches` and, if a sampler was
+        given to `StateMonitor`, its `state_dict()` as `sampler`. None if the checkpoint has no data state.
+    """
+    data_state_path = get_data_state_path(ckpt_path)
+    if not os.path.isfile(data_state_path):
+        return None
+    with open(data_state_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
 class StateMonitor(Callback):
     """
     Train loss and validation accuracy monitor, after each epoch save the
     best checkpoint file with the highest validation accuracy.
+
+    Every checkpoint `{model_name}-{epoch}_{batch}.ckpt` is saved with a data state
+    `{model_name}-{epoch}_{batch}.json` holding the position in the data (see `load_data_state`),
+    so that training can be resumed at the exact batch. `last_epoch` and `last_batch` are the
+    position the training is resumed at, i.e. the finished epochs and the batches finished in the
+    next one. If `ckpt_save_step_interval` > 0, a checkpoint is also saved every
+    `ckpt_save_step_interval` steps within an epoch (not in dataset sink mode). These are not
+    ranked by `ckpt_save_policy`: only the latest one is kept, replaced by the next one.
+
+    A training of several `Model.train` calls with different numbers of batches per epoch, e.g. the phases
+    of progressive resizing, sets `last_epoch`, `last_batch` and `last_step` (the global steps finished so
+    far, `last_epoch * num_batches + last_batch` if None) before each call, and `num_epochs` to the epochs
+    of the whole training (the final epoch of the call if None).
     """
 
     def __init__(
@@ -32,6 +68,9 @@ class StateMonitor(Callback):
         model_name="",
         model_ema=False,
         last_epoch=0,
+        last_batch=0,
+        last_step=None,
+        num_epochs=None,
         dataset_sink_mode=True,
         dataset_val=None,
         metric_name=("accuracy",),
@@ -42,6 +81,8 @@ class StateMonitor(Callback):
         ckpt_save_interval=1,
         ckpt_save_policy=None,
         ckpt_keep_max=10,
+        ckpt_save_step_interval=0,
+        sampler=None,
         summary_dir="./",
         log_interval=100,
         rank_id=None,
@@ -53,6 +94,9 @@ class StateMonitor(Callback):
         self.model_name = model_name
         self.model_ema = model_ema
         self.last_epoch = last_epoch
+        self.last_batch = last_batch
+        self.last_step = last_step
+        self.num_epochs = num_epochs
         self.dataset_sink_mode = dataset_sink_mode
         # evaluation
         self.dataset_val = dataset_val
@@ -68,6 +112,12 @@ class StateMonitor(Callback):
         self.ckpt_save_policy = ckpt_save_policy
         self.ckpt_keep_max = ckpt_keep_max
         self.ckpt_manager = CheckpointManager(ckpt_save_policy=self.ckpt_save_policy)
+        self.ckpt_save_step_interval = ckpt_save_step_interval
+        self.step_ckpt_path = None  # the latest checkpoint saved within an epoch
+        # the pipeline iterates a copy of the sampler, the epoch of which advances once per epoch from the
+        # one of the sampler at train begin, skipped epochs of a resumed training included
+        self.sampler = sampler
+        self.sampler_epoch = 0
         self._need_flush_from_cache = True
         self.summary_dir = summary_dir
         self.log_interval = log_interval
@@ -124,6 +174,10 @@ class StateMonitor(Callback):
         res_array = res_array.asnumpy()
         return res_array
 
+    def on_train_begin(self, run_context):
+        if self.sampler is not None:
+            self.sampler_epoch = self.sampler.epoch
+
     def on_train_step_begin(self, run_context):
         self.step_ts = time()
 
@@ -132,13 +186,7 @@ class StateMonitor(Callback):
 
     def on_train_step_end(self, run_context):
         cb_params = run_context.original_args()
-        num_epochs = cb_params.epoch_num
-        num_batches = cb_params.batch_num
-        # num_steps = num_batches * num_epochs
-        # cur_x start from 1, end at num_xs, range: [1, num_xs]
-        cur_step = cb_params.cur_step_num + self.last_epoch * num_batches
-        cur_epoch = cb_params.cur_epoch_num + self.last_epoch
-        cur_batch = (cur_step - 1) % num_batches + 1
+        num_epochs, num_batches, cur_epoch, cur_batch, cur_step = self._get_position(cb_params)
 
         self.step_time_accum += time() - self.step_ts
         if cur_batch % self.log_interval == 0 or cur_batch == num_batches or cur_batch == 1:
@@ -153,17 +201,22 @@ class StateMonitor(Callback):
             )
             self.step_time_accum = 0
 
+        if (
+            self.rank_id in [0, None]
+            and self.ckpt_save_step_interval > 0
+            and not self.dataset_sink_mode
+            and cur_step % self.ckpt_save_step_interval == 0
+            and cur_batch < num_batches
+        ):
+            self._save_checkpoint(cb_params, cur_epoch, cur_batch, cur_step)
+
     def on_train_epoch_end(self, run_context):
         """
         After epoch, print train loss and val accuracy,
         save the best ckpt file with the highest validation accuracy.
         """
         cb_params = run_context.original_args()
-        num_epochs = cb_params.epoch_num
-        num_batches = cb_params.batch_num
-        cur_step = cb_params.cur_step_num + self.last_epoch * num_batches
-        cur_epoch = cb_params.cur_epoch_num + self.last_epoch
-        cur_batch = (cur_step - 1) % num_batches + 1
+        num_epochs, _, cur_epoch, cur_batch, cur_step = self._get_position(cb_params)
 
         train_time = time() - self.epoch_ts
         loss = self._get_loss_from_cbp(cb_params)
@@ -197,21 +250,7 @@ class StateMonitor(Callback):
                 best_ckpt_save_path = os.path.join(self.ckpt_save_dir, f"{self.model_name}_best.ckpt")
                 save_checkpoint(cb_params.train_network, best_ckpt_save_path, async_save=True)
             if (cur_epoch % self.ckpt_save_interval == 0) or (cur_epoch == num_epochs):
-                if self._need_flush_from_cache:
-                    self._flush_from_cache(cb_params)
-                # save optim for resume
-                optimizer = self._get_optimizer_from_cbp(cb_params)
-                optim_save_path = os.path.join(self.ckpt_save_dir, f"optim_{self.model_name}.ckpt")
-                save_checkpoint(optimizer, optim_save_path, async_save=True)
-                # keep checkpoint files number equal max number.
-                ckpt_save_path = os.path.join(self.ckpt_save_dir, f"{self.model_name}-{cur_epoch}_{cur_batch}.ckpt")
-                _logger.info(f"Saving model to {ckpt_save_path}")
-                self.ckpt_manager.save_ckpoint(
-                    cb_params.train_network,
-                    num_ckpt=self.ckpt_keep_max,
-                    metric=res[0],
-                    save_path=ckpt_save_path,
-                )
+                self._save_checkpoint(cb_params, cur_epoch, cur_batch, cur_step, metric=res[0])
 
         # logging
         total_time = time() - self.epoch_ts
@@ -244,6 +283,10 @@ class StateMonitor(Callback):
         self.summary_record.record(cur_step)
 
     def on_train_end(self, run_context):
+        cb_params = run_context.original_args()
+        num_epochs, _, cur_epoch, _, _ = self._get_position(cb_params)
+        if cur_epoch < num_epochs:  # a phase of the training
+            return
         _logger.info("Finish training!")
         if self.dataset_val is not None:
             _logger.info(
@@ -251,6 +294,61 @@ class StateMonitor(Callback):
             )
         _logger.info("=" * 80)
 
+    def _get_position(self, cb_params):
+        """The number of epochs, the batches per epoch, and the current epoch, batch and global step."""
+        num_epochs = self.num_epochs or cb_params.epoch_num + self.last_epoch
+        num_batches = cb_params.batch_num
+        # cur_x start from 1, end at num_xs, range: [1, num_xs]
+        cur_step_in_epochs = cb_params.cur_step_num + self.last_batch
+        cur_epoch = self.last_epoch + (cur_step_in_epochs - 1) // num_batches + 1
+        cur_batch = (cur_step_in_epochs - 1) % num_batches + 1
+        if self.last_step is None:
+            cur_step = cb_params.cur_step_num + self.last_epoch * num_batches + self.last_batch
+        else:
+            cur_step = cb_params.cur_step_num + self.last_step
+        return num_epochs, num_batches, cur_epoch, cur_batch, cur_step
+
+    def _save_checkpoint(self, cb_params, cur_epoch, cur_batch, cur_step, metric=None):
+        """Save the network, the optimizer for resume and the data state. Without `metric`, i.e. within an
+        epoch, the checkpoint replaces the previous one saved within an epoch, out of the checkpoint manager."""
+        if self._need_flush_from_cache:
+            self._flush_from_cache(cb_params)
+        # save optim for resume
+        optimizer = self._get_optimizer_from_cbp(cb_params)
+        optim_save_path = os.path.join(self.ckpt_save_dir, f"optim_{self.model_name}.ckpt")
+        save_checkpoint(optimizer, optim_save_path, async_save=True)
+        # keep checkpoint files number equal max number.
+        ckpt_save_path = os.path.join(self.ckpt_save_dir, f"{self.model_name}-{cur_epoch}_{cur_batch}.ckpt")
+        _logger.info(f"Saving model to {ckpt_save_path}")
+        if metric is None:
+            if self.step_ckpt_path is not None:
+                self.ckpt_manager.remove_ckpoint_file(self.step_ckpt_path)
+            save_checkpoint(cb_params.train_network, ckpt_save_path, async_save=True)
+            self.step_ckpt_path = ckpt_save_path
+        else:
+            kept = self.ckpt_manager.save_ckpoint(
+                cb_params.train_network,
+                num_ckpt=self.ckpt_keep_max,
+                metric=metric,
+                save_path=ckpt_save_path,
+            )
+            if self.ckpt_save_policy == "top_k" and ckpt_save_path not in [ckpt for ckpt, _ in kept]:
+                return
+        with open(get_data_state_path(ckpt_save_path), "w", encoding="utf-8") as f:
+            json.dump(self._get_data_state(cb_params, cur_epoch, cur_batch, cur_step), f)
+
+    def _get_data_state(self, cb_params, cur_epoch, cur_batch, cur_step):
+        num_batches = cb_params.batch_num
+        epoch, batch = (cur_epoch, 0) if cur_batch == num_batches else (cur_epoch - 1, cur_batch)
+        data_state = dict(epoch=epoch, batch=batch, step=int(cur_step), num_batches=num_batches)
+        if self.sampler is not None:
+            sampler_state = self.sampler.state_dict()
+            if self.sampler.shuffle:
+                sampler_state["epoch"] = self.sampler_epoch + epoch
+            sampler_state["cursor"] = batch * cb_params.train_dataset.get_batch_size()
+            data_state["sampler"] = sampler_state
+        return data_state
+
     def _get_network_from_cbp(self, cb_params):
         if self.dataset_sink_mode:
             network = cb_params.train_network.network
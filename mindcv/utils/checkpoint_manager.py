@@ -49,6 +49,10 @@ class CheckpointManager:
         try:
             os.chmod(file_name, stat.S_IWRITE)
             os.remove(file_name)
+            # the data state saved along with the checkpoint by StateMonitor
+            data_state_file = os.path.splitext(file_name)[0] + ".json"
+            if os.path.isfile(data_state_file):
+                os.remove(data_state_file)
         except OSError:
             _logger.warning("OSError, failed to remove the older ckpt file %s.", file_name)
         except ValueError:
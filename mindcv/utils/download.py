@@ -2,16 +2,21 @@
 import bz2
 import gzip
 import hashlib
+import json
 import logging
+import math
 import os
 import ssl
 import tarfile
+import threading
+import time
 import urllib
 import urllib.error
 import urllib.request
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from typing import Optional
+from typing import List, Optional
 
 from tqdm import tqdm
 
@@ -39,6 +44,13 @@ class DownLoad:
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
         "Chrome/92.0.4515.131 Safari/537.36"
     )
+    # number of threads and part size in bytes of the range requests of a download
+    num_threads: int = 8
+    part_size: int = 16 * 1024 * 1024
+    # timeout in seconds of a request
+    timeout: float = 60.0
+    # interval in seconds between the saves of the bytes done of a download in parts, for its resume
+    state_interval: float = 1.0
 
     @staticmethod
     def calculate_md5(file_path: str, chunk_size: int = 1024 * 1024) -> str:
@@ -53,6 +65,15 @@ class DownLoad:
         """Check md5 value."""
         return md5 == self.calculate_md5(file_path)
 
+    @staticmethod
+    def calculate_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """Calculate sha256 value."""
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as fp:
+            for chunk in iter(lambda: fp.read(chunk_size), b""):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
     @staticmethod
     def extract_tar(from_path: str, to_path: Optional[str] = None, compression: Optional[str] = None) -> None:
         """Extract tar format file."""
@@ -96,21 +117,141 @@ class DownLoad:
 
         return to_path
 
-    def download_file(self, url: str, file_path: str, chunk_size: int = 1024):
-        """Download a file."""
-        # Define request headers.
+    def _request(self, url: str, start: int = 0, end: Optional[int] = None):
+        """Opens `url`, from byte `start` to byte `end` included if the server supports range requests."""
         headers = {"User-Agent": self.USER_AGENT}
+        if start > 0 or end is not None:
+            headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+        return urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=self.timeout)
+
+    @staticmethod
+    def _load_state(state_path: str, url: str, size: int, num_parts: int):
+        """The bytes done of every part of a previous attempt at the same download, or None."""
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("url") != url or state.get("size") != size or len(state.get("done", [])) != num_parts:
+            return None
+        return state["done"]
+
+    @staticmethod
+    def _save_state(state_path: str, url: str, size: int, done: List[int]) -> None:
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(url=url, size=size, done=done), f)
+        os.replace(tmp_path, state_path)
+
+    def _download_stream(self, response, partial_path: str, pbar, chunk_size: int) -> None:
+        """Downloads a response without range support from the start."""
+        with open(partial_path, "wb") as f:
+            for chunk in iter(lambda: response.read(chunk_size), b""):
+                f.write(chunk)
+                pbar.update(len(chunk))
+
+    def _download_parts(self, url: str, partial_path: str, state_path: str, size: int, pbar, chunk_size: int):
+        """Downloads the parts of `part_size` bytes of the file in parallel into `partial_path`, recording the bytes
+        done of every part in `state_path`, so that an interrupted download resumes where it stopped."""
+        num_parts = max(int(math.ceil(size / self.part_size)), 1)
+        done = self._load_state(state_path, url, size, num_parts) if os.path.isfile(partial_path) else None
+        if done is None:
+            done = [0] * num_parts
+            with open(partial_path, "wb") as f:
+                f.truncate(size)
+        else:
+            _logger.info(f"Resuming the download of {url} at {sum(done)}/{size} bytes.")
+        pbar.update(sum(done))
+        lock = threading.Lock()
+        last_save = [time.monotonic()]
+
+        def download_part(i):
+            start, end = i * self.part_size, min((i + 1) * self.part_size, size)
+            if start + done[i] >= end:
+                return
+            with self._request(url, start + done[i], end - 1) as response, open(partial_path, "r+b") as f:
+                if response.status != 206:
+                    raise IOError(f"The server does not return the range {start + done[i]}-{end - 1} of {url}.")
+                f.seek(start + done[i])
+                for chunk in iter(lambda: response.read(min(chunk_size, end - start - done[i])), b""):
+                    f.write(chunk)
+                    # a part counts only the bytes flushed by its own thread, which the saved state may then record
+                    # for a resume after the process is killed
+                    f.flush()
+                    with lock:
+                        done[i] += len(chunk)
+                        pbar.update(len(chunk))
+                        if time.monotonic() - last_save[0] > self.state_interval:
+                            self._save_state(state_path, url, size, done)
+                            last_save[0] = time.monotonic()
+                    if start + done[i] >= end:
+                        break
+            if start + done[i] < end:
+                raise IOError(f"The download of the range {start}-{end - 1} of {url} is incomplete.")
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.num_threads, num_parts)) as executor:
+                for future in [executor.submit(download_part, i) for i in range(num_parts)]:
+                    future.result()
+        finally:
+            with lock:
+                self._save_state(state_path, url, size, done)
+
+    def download_file(
+        self,
+        url: str,
+        file_path: str,
+        chunk_size: int = 1024 * 1024,
+        md5: Optional[str] = None,
+        sha256: Optional[str] = None,
+        allow_unverified: bool = False,
+    ):
+        """Download a file.
+
+        The file is downloaded into `file_path + ".partial"` and renamed to `file_path` once it is complete and
+        verified, so that `file_path` never holds a partial file. If the server supports range requests, the file
+        is downloaded in parts of `part_size` bytes by `num_threads` threads, and an interrupted download resumes
+        from the bytes recorded in `file_path + ".partial.json"`. The download is verified by its size and by its
+        md5 and sha256, and removed if the verification fails. One of the hashes is required, unless
+        `allow_unverified` is True, for the callers which have no hash of the file, whose download is only verified
+        by its size.
+        """
+        if md5 is None and sha256 is None and not allow_unverified:
+            raise ValueError(
+                f"No md5 or sha256 of {url} is given to verify its download. Pass `allow_unverified=True` to download "
+                "it verified by its size only."
+            )
+        partial_path = file_path + ".partial"
+        state_path = partial_path + ".json"
 
         _logger.info(f"Downloading from {url} to {file_path} ...")
-        with open(file_path, "wb") as f:
-            request = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(request) as response:
-                with tqdm(total=response.length, unit="B") as pbar:
-                    for chunk in iter(lambda: response.read(chunk_size), b""):
-                        if not chunk:
-                            break
-                        pbar.update(chunk_size)
-                        f.write(chunk)
+        # probe the size and the range support with the first byte
+        with self._request(url, 0, 0) as response:
+            content_range = response.headers.get("Content-Range", "")
+            if response.status == 206 and "/" in content_range and not content_range.endswith("/*"):
+                size = int(content_range.rsplit("/", 1)[1])
+                with tqdm(total=size, unit="B", unit_scale=True) as pbar:
+                    self._download_parts(url, partial_path, state_path, size, pbar, chunk_size)
+            else:
+                size = response.length
+                with tqdm(total=size, unit="B", unit_scale=True) as pbar:
+                    self._download_stream(response, partial_path, pbar, chunk_size)
+
+        downloaded_size = os.path.getsize(partial_path)
+        if size is not None and downloaded_size != size:
+            os.remove(partial_path)
+            raise IOError(f"The size of the download of {url} is {downloaded_size}, expected {size}.")
+        for name, expected, calculate in (("md5", md5, self.calculate_md5), ("sha256", sha256, self.calculate_sha256)):
+            if expected is not None and calculate(partial_path) != expected:
+                os.remove(partial_path)
+                if os.path.isfile(state_path):
+                    os.remove(state_path)
+                raise RuntimeError(
+                    f"The {name} of the download of {url} does not match {expected}, the download is removed."
+                )
+        os.replace(partial_path, file_path)
+        if os.path.isfile(state_path):
+            os.remove(state_path)
 
     def download_url(
         self,
@@ -118,8 +259,10 @@ class DownLoad:
         path: Optional[str] = None,
         filename: Optional[str] = None,
         md5: Optional[str] = None,
+        allow_unverified: bool = False,
     ) -> None:
-        """Download a file from a url and place it in root."""
+        """Download a file from a url and place it in root, verified by its `md5` unless `allow_unverified`, see
+        `download_file`."""
         if path is None:
             path = get_default_download_root()
         path = os.path.expanduser(path)
@@ -130,23 +273,23 @@ class DownLoad:
 
         file_path = os.path.join(path, filename)
 
-        # Check if the file is exists.
+        # Check if the file is exists. A download is renamed to `file_path` only once complete and verified.
         if os.path.isfile(file_path):
             if not md5 or self.check_md5(file_path, md5):
                 return
 
         # Download the file.
         try:
-            self.download_file(url, file_path)
+            self.download_file(url, file_path, md5=md5, allow_unverified=allow_unverified)
         except (urllib.error.URLError, IOError) as e:
             if url.startswith("https"):
                 url = url.replace("https", "http")
                 try:
-                    self.download_file(url, file_path)
+                    self.download_file(url, file_path, md5=md5, allow_unverified=allow_unverified)
                 except (urllib.error.URLError, IOError):
                     # pylint: disable=protected-access
                     ssl._create_default_https_context = ssl._create_unverified_context
-                    self.download_file(url, file_path)
+                    self.download_file(url, file_path, md5=md5, allow_unverified=allow_unverified)
                     ssl._create_default_https_context = ssl.create_default_context
             else:
                 raise e
@@ -159,8 +302,9 @@ class DownLoad:
         filename: Optional[str] = None,
         md5: Optional[str] = None,
         remove_finished: bool = False,
+        allow_unverified: bool = False,
     ) -> None:
-        """Download and extract archive."""
+        """Download and extract archive, verified by its `md5` unless `allow_unverified`, see `download_file`."""
         if download_path is None:
             download_path = get_default_download_root()
         download_path = os.path.expanduser(download_path)
@@ -168,7 +312,7 @@ class DownLoad:
         if not filename:
             filename = os.path.basename(url)
 
-        self.download_url(url, download_path, filename, md5)
+        self.download_url(url, download_path, filename, md5, allow_unverified=allow_unverified)
 
         archive = os.path.join(download_path, filename)
         self.extract_archive(archive, extract_path)
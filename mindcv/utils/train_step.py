@@ -4,6 +4,7 @@ Supported algorithms are list as follows:
     * Exponential Moving Average (EMA)
     * Gradient Clipping
     * Gradient Accumulation
+    * Mixup/Cutmix on device
 """
 
 import mindspore as ms
@@ -92,6 +93,8 @@ class TrainStep(nn.TrainOneStepWithLossScaleCell):
         * Exponential Moving Average (EMA)
         * Gradient Clipping
         * Gradient Accumulation
+        * Mixup/Cutmix on device, which mixes the input batch and the integer labels with `mixup_fn`
+          before the forward pass
     """
 
     def __init__(
@@ -104,8 +107,10 @@ class TrainStep(nn.TrainOneStepWithLossScaleCell):
         clip_grad=False,
         clip_value=15.0,
         gradient_accumulation_steps=1,
+        mixup_fn=None,
     ):
         super(TrainStep, self).__init__(network, optimizer, scale_sense)
+        self.mixup_fn = mixup_fn
         self.ema = ema
         self.ema_decay = ema_decay
         self.updates = Parameter(Tensor(0.0, ms.float32))
@@ -128,6 +133,8 @@ class TrainStep(nn.TrainOneStepWithLossScaleCell):
         return success
 
     def construct(self, *inputs):
+        if self.mixup_fn is not None:
+            inputs = self.mixup_fn(*inputs)
         weights = self.weights
         loss = self.network(*inputs)
         scaling_sens = self.scale_sense
@@ -38,6 +38,7 @@ def require_customized_train_step(
     clip_grad: bool = False,
     gradient_accumulation_steps: int = 1,
     amp_cast_list: Optional[str] = None,
+    mixup_fn: Optional[nn.Cell] = None,
 ):
     if ema:
         return True
@@ -47,6 +48,8 @@ def require_customized_train_step(
         return True
     if amp_cast_list:
         return True
+    if mixup_fn is not None:
+        return True
     return False
 
 
@@ -88,6 +91,7 @@ def create_trainer(
     clip_grad: bool = False,
     clip_value: float = 15.0,
     gradient_accumulation_steps: int = 1,
+    mixup_fn: Optional[nn.Cell] = None,
 ):
     """Create Trainer.
 
@@ -106,6 +110,8 @@ def create_trainer(
         clip_grad: whether to gradient clip.
         clip_value: The value at which to clip gradients.
         gradient_accumulation_steps: Accumulate the gradients of n batches before update.
+        mixup_fn: The cell mixing the input batch and the integer labels inside the train step,
+            e.g. `mindcv.data.mixup.MixupCell`. Default: None.
 
     Returns:
         mindspore.Model
@@ -120,7 +126,7 @@ def create_trainer(
     if gradient_accumulation_steps < 1:
         raise ValueError("`gradient_accumulation_steps` must be >= 1!")
 
-    if not require_customized_train_step(ema, clip_grad, gradient_accumulation_steps, amp_cast_list):
+    if not require_customized_train_step(ema, clip_grad, gradient_accumulation_steps, amp_cast_list, mixup_fn):
         mindspore_kwargs = dict(
             network=network,
             loss_fn=loss,
@@ -158,6 +164,7 @@ def create_trainer(
             clip_grad=clip_grad,
             clip_value=clip_value,
             gradient_accumulation_steps=gradient_accumulation_steps,
+            mixup_fn=mixup_fn,
         )
         if loss_scale_type.lower() == "fixed":
             loss_scale_manager = FixedLossScaleManager(loss_scale=loss_scale, drop_overflow_update=drop_overflow_update)
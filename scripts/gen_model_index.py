@@ -0,0 +1,76 @@
+"""
+Generate mindcv/models/model_index.py, the static index of the models used by the lazy registry. It is run
+after adding, renaming or removing a model, and `tests/modules/test_models.py` checks that the index is up to date.
+
+Usage:
+    $ python scripts/gen_model_index.py [--check]
+"""
+
+import argparse
+import importlib
+import os
+import pkgutil
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import mindcv.models  # noqa: E402
+from mindcv.models import registry  # noqa: E402
+
+INDEX_PATH = os.path.join(os.path.dirname(mindcv.models.__file__), "model_index.py")
+
+HEADER = '''"""
+Static index of the models, generated by `python scripts/gen_model_index.py`, do not edit.
+"""
+'''
+
+
+def build_index():
+    """Imports every module of `mindcv.models` and returns the index of the registered models and their exports."""
+    for module_info in pkgutil.iter_modules(mindcv.models.__path__):
+        if not module_info.ispkg and not module_info.name.startswith("_"):
+            importlib.import_module(f"mindcv.models.{module_info.name}")
+
+    models, exports = {}, {}
+    for model_name, fn in registry._model_entrypoints.items():
+        module = sys.modules[fn.__module__]
+        if module.__package__ != "mindcv.models":
+            continue
+        cfg = getattr(module, "default_cfgs", {}).get(model_name, {})
+        models[model_name] = (module.__name__.rsplit(".", 1)[-1], bool(cfg.get("url")))
+    # the model modules are imported in alphabetical order, a name exported twice is the one of the last module
+    for module_name in sorted({module_name for module_name, _ in models.values()}):
+        for name in importlib.import_module(f"mindcv.models.{module_name}").__all__:
+            exports[name] = module_name
+    return models, exports
+
+
+def render_index(models, exports):
+    lines = [HEADER, "# model name: (module, whether pretrained weights are available)", "MODELS = {"]
+    lines += [f'    "{name}": ("{module}", {pretrained}),' for name, (module, pretrained) in sorted(models.items())]
+    lines += ["}", "", "# name exported by `mindcv.models`: module", "EXPORTS = {"]
+    lines += [f'    "{name}": "{module}",' for name, module in sorted(exports.items())]
+    lines += ["}", ""]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Exit with an error if the index is out of date")
+    args = parser.parse_args()
+
+    models, exports = build_index()
+    source = render_index(models, exports)
+    with open(INDEX_PATH, "r", encoding="utf-8") as f:
+        up_to_date = f.read() == source
+    if args.check:
+        print("The model index is up to date." if up_to_date else f"{INDEX_PATH} is out of date.")
+        sys.exit(0 if up_to_date else 1)
+    if not up_to_date:
+        with open(INDEX_PATH, "w", encoding="utf-8") as f:
+            f.write(source)
+    print(f"Wrote the index of {len(models)} models to {INDEX_PATH}.")
+
+
+if __name__ == "__main__":
+    main()
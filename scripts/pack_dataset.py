@@ -0,0 +1,37 @@
+"""
+Pack an image folder dataset into large shard files, which can be loaded by `create_dataset(name="packed", ...)`.
+
+Usage:
+    $ python scripts/pack_dataset.py --src /path/to/imagenet --dst /path/to/imagenet_packed --splits train val
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append(".")
+
+from mindcv.data import pack_image_folder  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack an image folder dataset into shard files")
+    parser.add_argument("--src", type=str, required=True, help="Root dir of the image folder dataset")
+    parser.add_argument("--dst", type=str, required=True, help="Root dir of the packed dataset")
+    parser.add_argument("--splits", type=str, nargs="+", default=["train", "val"], help="Splits to pack")
+    parser.add_argument("--shard_size", type=int, default=1024, help="Max shard size in MiB (default=1024)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for split in args.splits:
+        num_samples = pack_image_folder(
+            os.path.join(args.src, split),
+            os.path.join(args.dst, split),
+            shard_size=args.shard_size * 1024 * 1024,
+        )
+        print(f"{split}: {num_samples} samples packed.")
+
+
+if __name__ == "__main__":
+    main()
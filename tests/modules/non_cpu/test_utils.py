@@ -11,6 +11,7 @@ from mindspore import Tensor, nn
 from mindspore.common.initializer import Normal
 from mindspore.nn import WithLossCell
 
+from mindcv.data.mixup import MixupCell
 from mindcv.optim import create_optimizer
 from mindcv.utils import TrainStep
 
@@ -98,3 +99,25 @@ def test_gradient_accumulation(gradient_accumulation_steps):
         assert cur_loss == begin_loss
     cur_loss = train_network(input_data, label)
     assert cur_loss < begin_loss
+
+
+@pytest.mark.parametrize("mixup_alpha, cutmix_alpha", [(0.8, 0.0), (0.8, 1.0)])
+def test_mixup_on_device(mixup_alpha, cutmix_alpha):
+    network = SimpleCNN(in_channels=1, num_classes=10)
+    net_loss = nn.SoftmaxCrossEntropyWithLogits(sparse=False, reduction="mean")
+
+    net_opt = create_optimizer(network.trainable_params(), "adam", lr=0.001, weight_decay=1e-7)
+
+    bs = 8
+    input_data = Tensor(np.random.rand(bs, 1, 32, 32).astype(np.float32))
+    label = Tensor(np.arange(bs).astype(np.int32))
+
+    net_with_loss = WithLossCell(network, net_loss)
+    loss_scale_manager = Tensor(1, ms.float32)
+    mixup_fn = MixupCell(mixup_alpha=mixup_alpha, cutmix_alpha=cutmix_alpha, num_classes=10, seed=1)
+    train_network = TrainStep(net_with_loss, net_opt, scale_sense=loss_scale_manager, mixup_fn=mixup_fn)
+    train_network.set_train()
+
+    for _ in range(10):
+        cur_loss = train_network(input_data, label)
+    assert np.isfinite(cur_loss.asnumpy())
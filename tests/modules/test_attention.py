@@ -0,0 +1,154 @@
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+import pytest
+
+import mindspore as ms
+from mindspore import Tensor, nn, ops
+
+from mindcv.models import PyramidVisionTransformer, PyramidVisionTransformerV2, VisionTransformer
+from mindcv.models.layers import ScaledDotProductAttention
+from mindcv.models.swintransformer import WindowAttention
+
+
+def _reference_attention(q, k, v, scale, attn_bias=None):
+    attn = q @ np.swapaxes(k, -1, -2) * scale
+    if attn_bias is not None:
+        attn = attn + attn_bias
+    attn = np.exp(attn - attn.max(axis=-1, keepdims=True))
+    return attn / attn.sum(axis=-1, keepdims=True) @ v
+
+
+@pytest.mark.parametrize("mode", [0, 1])
+@pytest.mark.parametrize("attn_impl", ["default", "chunked"])
+@pytest.mark.parametrize("bias_shape", [None, (1, 3, 20, 50), (2, 1, 20, 50), (2, 3, 1, 50)])
+def test_scaled_dot_product_attention(mode, attn_impl, bias_shape):
+    ms.set_context(mode=mode)
+    rng = np.random.default_rng(0)
+    q = rng.standard_normal((2, 3, 20, 8)).astype(np.float32)
+    k = rng.standard_normal((2, 3, 50, 8)).astype(np.float32)
+    v = rng.standard_normal((2, 3, 50, 6)).astype(np.float32)
+    attn_bias = None if bias_shape is None else rng.standard_normal(bias_shape).astype(np.float32)
+
+    # the queries and the keys are not a multiple of the chunk sizes
+    attention = ScaledDotProductAttention(8**-0.5, attn_impl=attn_impl, chunk_size=16, query_chunk_size=8)
+    inputs = [Tensor(q), Tensor(k), Tensor(v)] + ([] if attn_bias is None else [Tensor(attn_bias)])
+    out = attention(*inputs).asnumpy()
+    np.testing.assert_allclose(out, _reference_attention(q, k, v, 8**-0.5, attn_bias), rtol=1e-4, atol=1e-5)
+
+
+def test_scaled_dot_product_attention_invalid_impl():
+    with pytest.raises(ValueError):
+        ScaledDotProductAttention(1.0, attn_impl="flash")
+
+
+class _ViTAttention(nn.Cell):
+    """The attention of ViT before ScaledDotProductAttention: the softmax is computed in float32."""
+
+    def __init__(self, scale):
+        super().__init__()
+        self.scale = scale**0.5
+        self.q_matmul_k = ops.BatchMatMul(transpose_b=True)
+        self.attn_matmul_v = ops.BatchMatMul()
+
+    def construct(self, q, k, v):
+        attn = self.q_matmul_k(q * self.scale, k * self.scale)
+        attn = ops.softmax(attn.astype(ms.float32), axis=-1).astype(attn.dtype)
+        return self.attn_matmul_v(attn, v)
+
+
+@pytest.mark.parametrize("mode", [0, 1])
+@pytest.mark.parametrize("attn_impl", ["default", "chunked"])
+def test_scaled_dot_product_attention_o2(mode, attn_impl, monkeypatch):
+    ms.set_context(mode=mode)
+    rng = np.random.default_rng(0)
+    q = rng.standard_normal((2, 3, 20, 8)).astype(np.float32)
+    k = rng.standard_normal((2, 3, 50, 8)).astype(np.float32)
+    v = rng.standard_normal((2, 3, 50, 6)).astype(np.float32)
+    inputs = [Tensor(q), Tensor(k), Tensor(v)]
+
+    softmax_dtypes = []
+    if mode == 1:
+        # the softmax kernel of the CPU is as accurate in float16 as in float32, so check the dtype it is given
+        softmax = ops.softmax
+
+        def recording_softmax(x, *args, **kwargs):
+            softmax_dtypes.append(x.dtype)
+            return softmax(x, *args, **kwargs)
+
+        monkeypatch.setattr(ops, "softmax", recording_softmax)
+
+    attention = ScaledDotProductAttention(8**-0.5, attn_impl=attn_impl, chunk_size=16, query_chunk_size=8)
+    out = ms.amp.auto_mixed_precision(attention, "O2")(*inputs).asnumpy()
+    if mode == 1:
+        assert softmax_dtypes and all(dtype == ms.float32 for dtype in softmax_dtypes)
+    expected = ms.amp.auto_mixed_precision(_ViTAttention(8**-0.5), "O2")(*inputs).asnumpy()
+    np.testing.assert_allclose(out, expected, rtol=5e-3, atol=5e-3)
+    np.testing.assert_allclose(out, _reference_attention(q, k, v, 8**-0.5), rtol=5e-3, atol=5e-3)
+
+
+@pytest.mark.parametrize("mode", [0, 1])
+def test_window_attention_mask(mode):
+    ms.set_context(mode=mode)
+    rng = np.random.default_rng(0)
+    window_attention = WindowAttention(16, window_size=(4, 4), num_heads=2)
+    window_attention.set_train(False)
+    x = rng.standard_normal((6, 16, 16)).astype(np.float32)
+    mask = np.where(rng.random((1, 3, 1, 16, 16)) < 0.3, -100.0, 0.0).astype(np.float32)
+
+    out = window_attention(Tensor(x), Tensor(mask)).asnumpy()
+
+    def heads(dense):
+        return dense(Tensor(x)).asnumpy().reshape(6, 16, 2, 8).transpose(0, 2, 1, 3)
+
+    q, k, v = heads(window_attention.q), heads(window_attention.k), heads(window_attention.v)
+    attn_bias = window_attention.relative_bias().asnumpy() + np.tile(mask[0], (2, 1, 1, 1))
+    expected = _reference_attention(q, k, v, 8**-0.5, attn_bias).transpose(0, 2, 1, 3).reshape(6, 16, 16)
+    expected = window_attention.proj(Tensor(expected)).asnumpy()
+    np.testing.assert_allclose(out, expected, rtol=1e-4, atol=1e-5)
+
+
+MODELS = {
+    "vit": lambda attn_impl: VisionTransformer(
+        image_size=64, patch_size=8, embed_dim=32, depth=2, num_heads=2, num_classes=10, attn_impl=attn_impl
+    ),
+    "pvt": lambda attn_impl: PyramidVisionTransformer(
+        img_size=64,
+        embed_dims=[16, 32, 32, 32],
+        num_heads=[1, 2, 2, 2],
+        mlp_ratios=[2, 2, 2, 2],
+        depths=[1, 1, 1, 1],
+        sr_ratios=[2, 1, 1, 1],
+        num_classes=10,
+        attn_impl=attn_impl,
+    ),
+    "pvt_v2": lambda attn_impl: PyramidVisionTransformerV2(
+        img_size=64,
+        embed_dims=[16, 32, 32, 32],
+        num_heads=[1, 2, 2, 2],
+        mlp_ratios=[2, 2, 2, 2],
+        depths=[1, 1, 1, 1],
+        sr_ratios=[2, 1, 1, 1],
+        num_classes=10,
+        attn_impl=attn_impl,
+    ),
+}
+
+
+@pytest.mark.parametrize("mode", [0, 1])
+@pytest.mark.parametrize("name", list(MODELS))
+def test_model_attn_impl(mode, name):
+    ms.set_context(mode=mode)
+    model = MODELS[name]("default")
+    chunked_model = MODELS[name]("chunked")
+    ms.load_param_into_net(chunked_model, model.parameters_dict())
+    for _, cell in chunked_model.cells_and_names():
+        if isinstance(cell, ScaledDotProductAttention):
+            cell.chunk_size = cell.query_chunk_size = 16  # several chunks on the small inputs
+    model.set_train(False)
+    chunked_model.set_train(False)
+
+    x = Tensor(np.random.default_rng(0).standard_normal((2, 3, 64, 64)).astype(np.float32))
+    np.testing.assert_allclose(chunked_model(x).asnumpy(), model(x).asnumpy(), rtol=1e-4, atol=1e-5)
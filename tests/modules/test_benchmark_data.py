@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+from PIL import Image
+
+from benchmark_data import benchmark_loader, create_benchmark_parser, main
+from config import parse_args
+
+
+def _make_jpeg_folder(root, num_classes=2, num_per_class=4):
+    rng = np.random.default_rng(0)
+    for c in range(num_classes):
+        class_dir = os.path.join(root, f"class{c}")
+        os.makedirs(class_dir, exist_ok=True)
+        for i in range(num_per_class):
+            image = rng.integers(0, 256, size=(40, 50, 3), dtype=np.uint8)
+            Image.fromarray(image).save(os.path.join(class_dir, f"{i:06d}.jpg"))
+
+
+def _bench_args(data_dir, *extra):
+    return [
+        "--data_dir",
+        data_dir,
+        "--image_resize",
+        "32",
+        "--batch_size",
+        "2",
+        "--bench_batches",
+        "3",
+        "--bench_warmup",
+        "1",
+        "--bench_op_samples",
+        "2",
+        *extra,
+    ]
+
+
+def test_benchmark_loader(tmp_path):
+    _make_jpeg_folder(os.path.join(tmp_path, "train"))
+    args = parse_args(_bench_args(str(tmp_path)), parsers=create_benchmark_parser())
+
+    result = benchmark_loader(args, num_parallel_workers=1, batch_size=2)
+    assert result["num_parallel_workers"] == 1 and result["batch_size"] == 2
+    assert result["images_per_second"] > 0
+    assert set(result["batch_latency_ms"]) == {"p50", "p90", "p99"}
+
+
+def test_benchmark_main_clamps_workers(tmp_path, monkeypatch):
+    _make_jpeg_folder(os.path.join(tmp_path, "train"))
+    output = os.path.join(tmp_path, "results.json")
+    # more workers than CPUs are clamped to the number of CPUs instead of skipped
+    workers = str((os.cpu_count() or 1) + 1)
+    argv = _bench_args(str(tmp_path), "--bench_workers", workers, "--bench_output", output)
+    monkeypatch.setattr(sys, "argv", ["benchmark_data.py"] + argv)
+
+    main()
+    with open(output, encoding="utf-8") as f:
+        results = json.load(f)
+    assert len(results["ops"]) > 0
+    assert [r["num_parallel_workers"] for r in results["loader"]] == [os.cpu_count() or 1]
@@ -1,13 +1,34 @@
+import functools
+import http.server
+import io
+import json
+import multiprocessing
 import os
 import sys
+import tarfile
+import threading
+import time
 
 sys.path.append(".")
 
+import numpy as np
 import pytest
+from PIL import Image
 
 import mindspore as ms
 
-from mindcv.data import create_dataset, get_dataset_download_root
+from mindcv.data import (
+    ShardCache,
+    create_cached_eval_dataset,
+    create_dataset,
+    create_transforms,
+    eval_cache,
+    get_dataset_download_root,
+    get_image_folder_manifest,
+    pack_image_folder,
+)
+from mindcv.data.distributed_sampler import RepeatAugSampler, WeightedDistributedSampler
+from mindcv.data.tar_dataset import TarShardDataset, write_tar_shard_index
 from mindcv.utils.download import DownLoad
 
 
@@ -43,7 +64,7 @@ def test_create_dataset_standalone_imagenet(mode, name, split, shuffle, num_samp
     root_dir = os.path.join(get_dataset_download_root(), "Canidae")
     data_dir = os.path.join(root_dir, "data", "Canidae")  # Canidae has prefix path "data/Canidae" in unzipped file.
     if not os.path.exists(data_dir):
-        DownLoad().download_and_extract_archive(dataset_url, root_dir)
+        DownLoad().download_and_extract_archive(dataset_url, root_dir, allow_unverified=True)
     dataset = create_dataset(
         name=name,
         root=data_dir,
@@ -97,3 +118,498 @@ def test_create_dataset_standalone_mc(mode, name, split, shuffle, num_samples, n
 
     assert type(dataset) == ms.dataset.engine.datasets_vision.Cifar10Dataset
     assert dataset is not None
+
+
+def _make_image_folder(root, num_classes=3, num_per_class=5):
+    for c in range(num_classes):
+        class_dir = os.path.join(root, f"class{c}")
+        os.makedirs(class_dir, exist_ok=True)
+        for i in range(num_per_class):
+            with open(os.path.join(class_dir, f"{i:06d}.jpg"), "wb") as f:
+                f.write(bytes([c, i]) * (i + 1))
+
+
+# test packed dataset
+@pytest.mark.parametrize("shuffle", [True, False])
+@pytest.mark.parametrize("num_shards", [None, 2])
+@pytest.mark.parametrize("num_aug_repeats", [0, 3])
+def test_create_dataset_packed(tmp_path, shuffle, num_shards, num_aug_repeats):
+    """
+    test create_dataset API(packed)
+    command: pytest -s test_dataset.py::test_create_dataset_packed
+    """
+    folder = os.path.join(tmp_path, "folder", "train")
+    _make_image_folder(folder)
+    packed_root = os.path.join(tmp_path, "packed")
+    num_packed = pack_image_folder(folder, os.path.join(packed_root, "train"), shard_size=16)
+    assert num_packed == 15
+
+    dataset = create_dataset(
+        name="packed",
+        root=packed_root,
+        split="train",
+        shuffle=shuffle,
+        num_shards=num_shards,
+        shard_id=0 if num_shards else None,
+        num_parallel_workers=1,
+        num_aug_repeats=num_aug_repeats,
+    )
+    assert dataset.num_classes() == 3
+
+    expected = {}
+    for c in range(3):
+        for i in range(5):
+            expected[bytes([c, i]) * (i + 1)] = c
+    rows = list(dataset.create_tuple_iterator(output_numpy=True))
+    assert len(rows) == dataset.get_dataset_size()
+    for image, label in rows:
+        assert expected[image.tobytes()] == label
+    if num_shards is None and num_aug_repeats == 0:
+        assert len(rows) == 15
+
+
+def _make_tar_shards(root, num_classes=3, num_per_class=5):
+    """Writes one shard per class, with the members of a sample next to each other."""
+    os.makedirs(root, exist_ok=True)
+    for c in range(num_classes):
+        with tarfile.open(os.path.join(root, f"train-{c:06d}.tar"), "w") as tar:
+            for i in range(num_per_class):
+                for extension, data in (("jpg", bytes([c, i]) * (i + 1)), ("cls", str(c).encode())):
+                    member = tarfile.TarInfo(f"class{c}/{i:06d}.{extension}")
+                    member.size = len(data)
+                    tar.addfile(member, io.BytesIO(data))
+
+
+# test tar dataset
+@pytest.mark.parametrize("shuffle", [True, False])
+@pytest.mark.parametrize("num_shards", [None, 2])
+def test_create_dataset_tar(tmp_path, shuffle, num_shards):
+    """
+    test create_dataset API(tar)
+    command: pytest -s test_dataset.py::test_create_dataset_tar
+    """
+    tar_root = os.path.join(tmp_path, "tar")
+    _make_tar_shards(os.path.join(tar_root, "train"))
+
+    expected = {}
+    for c in range(3):
+        for i in range(5):
+            expected[bytes([c, i]) * (i + 1)] = c
+    seen = []
+    for shard_id in range(num_shards or 1):
+        dataset = create_dataset(
+            name="tar",
+            root=tar_root,
+            split="train",
+            shuffle=shuffle,
+            num_shards=num_shards,
+            shard_id=shard_id if num_shards else None,
+        )
+        assert dataset.num_classes() == 3
+        rows = list(dataset.create_tuple_iterator(output_numpy=True))
+        # every rank yields the samples of its smallest split, i.e. the single shard of rank 1
+        assert len(rows) == dataset.get_dataset_size() == (5 if num_shards else 15)
+        for image, label in rows:
+            assert expected[image.tobytes()] == label
+        seen.extend(image.tobytes() for image, _ in rows)
+    assert len(set(seen)) == len(seen)
+
+
+def test_tar_shard_dataset_shuffle(tmp_path):
+    _make_tar_shards(tmp_path)
+    source = TarShardDataset(str(tmp_path), shuffle=True, shuffle_buffer=4, seed=1)
+    epoch0 = [image.tobytes() for image, _ in source]
+    epoch1 = [image.tobytes() for image, _ in source]
+    ordered = [image.tobytes() for image, _ in TarShardDataset(str(tmp_path), shuffle=False)]
+    assert sorted(epoch0) == sorted(epoch1) == sorted(ordered)
+    assert epoch0 != ordered and epoch0 != epoch1
+    source.set_epoch(0)
+    assert [image.tobytes() for image, _ in source] == epoch0
+
+
+def test_tar_shard_index(tmp_path):
+    _make_tar_shards(tmp_path)
+    index = write_tar_shard_index(str(tmp_path))
+    with open(os.path.join(tmp_path, "index.json"), "r", encoding="utf-8") as f:
+        assert json.load(f) == index
+    assert index["num_classes"] == 3
+    assert {name: entry["num_samples"] for name, entry in index["shards"].items()} == {
+        f"train-{c:06d}.tar": 5 for c in range(3)
+    }
+    assert index["shards"]["train-000000.tar"]["sha256"] == DownLoad.calculate_sha256(
+        os.path.join(tmp_path, "train-000000.tar")
+    )
+
+    # sizing the dataset reads the index only, and a rank only reads its own shards
+    cache = ShardCache(os.path.join(tmp_path, "cache"))
+    source = TarShardDataset(str(tmp_path), shuffle=False, num_shards=2, shard_id=1, cache=cache)
+    assert len(source) == 5 and source.num_classes == 3
+    assert cache.entries() == []
+    assert len(list(source)) == 5
+    assert len(cache.entries()) == 1
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def shard_server(tmp_path):
+    """Serves the tar shards written under `tmp_path/shards`, yields their url prefix."""
+    root = os.path.join(tmp_path, "shards")
+    _make_tar_shards(root)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=root))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield root, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_tar_shard_dataset_remote(tmp_path, shard_server):
+    root, url = shard_server
+    pattern = f"{url}/train-{{000000..000002}}.tar"
+
+    # remote shards are not downloaded to be counted
+    cache = ShardCache(os.path.join(tmp_path, "cache"))
+    with pytest.raises(ValueError, match="index"):
+        len(TarShardDataset(pattern, cache=cache))
+    assert cache.entries() == []
+
+    write_tar_shard_index(root)
+    source = TarShardDataset(pattern, shuffle=False, num_shards=2, shard_id=0, cache=cache)
+    assert len(source) == 5 and source.num_classes == 3
+    assert [os.path.basename(path).split("-", 1)[1] for path, _, _ in cache.entries()] == ["index.json"]
+    labels = [int(label) for _, label in source]
+    assert labels == [0] * 5
+    # the index and the first shard of rank 0 only, which holds the 5 samples of the smallest split
+    assert len(cache.entries()) == 2
+
+    # a shard which does not match the sha256 of the index is not cached
+    with open(os.path.join(root, "train-000001.tar"), "ab") as f:
+        f.write(b"\0" * 512)
+    source = TarShardDataset(pattern, shuffle=False, num_shards=2, shard_id=1, cache=cache)
+    with pytest.raises(RuntimeError, match="sha256"):
+        list(source)
+    assert len(cache.entries()) == 2
+
+    # nor is a remote shard without a sha256 in the index downloaded
+    with open(os.path.join(root, "index.json"), "r", encoding="utf-8") as f:
+        index = json.load(f)
+    del index["shards"]["train-000002.tar"]["sha256"]
+    with open(os.path.join(root, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    cache = ShardCache(os.path.join(tmp_path, "cache_unverified"))
+    with pytest.raises(ValueError, match="sha256"):
+        len(TarShardDataset(pattern, cache=cache))
+    assert [os.path.basename(path).split("-", 1)[1] for path, _, _ in cache.entries()] == ["index.json"]
+
+
+def _cache_shards(cache_root, sources):
+    cache = ShardCache(cache_root)
+    return [cache.get(source) for source in sources]
+
+
+# test shard cache
+def test_shard_cache(tmp_path):
+    sources = []
+    for i in range(4):
+        sources.append(os.path.join(tmp_path, f"shard{i}.tar"))
+        with open(sources[-1], "wb") as f:
+            f.write(bytes([i]) * 100)
+    cache_root = os.path.join(tmp_path, "cache")
+
+    # the processes of a host share one copy of each file
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        paths = pool.starmap(_cache_shards, [(cache_root, sources)] * 4)
+    assert all(p == paths[0] for p in paths)
+    cache = ShardCache(cache_root, max_bytes=250)
+    assert len(cache.entries()) == 4 and cache.size() == 400
+    assert not any(name.endswith(".tmp") for name in os.listdir(cache_root))
+    for source, path in zip(sources, paths[0]):
+        with open(path, "rb") as f1, open(source, "rb") as f2:
+            assert f1.read() == f2.read()
+
+    # least recently used first: shard0 is touched, then shard3 is fetched again
+    os.remove(cache.cache_path(sources[3]))
+    for i, source in enumerate(sources[:3]):
+        os.utime(cache.cache_path(source), (i, i))
+    cache.get(sources[0])
+    cache.get(sources[3])
+    assert cache.size() <= 250
+    cached = {os.path.basename(path) for path, _, _ in cache.entries()}
+    assert cached == {os.path.basename(cache.cache_path(sources[i])) for i in (0, 3)}
+
+
+@pytest.mark.parametrize("shard_cache_size", [None, 1])
+def test_create_dataset_tar_cache(tmp_path, monkeypatch, shard_cache_size):
+    monkeypatch.setattr("mindcv.data.shard_cache.get_dataset_download_root", lambda: str(tmp_path))
+    tar_root = os.path.join(tmp_path, "tar")
+    _make_tar_shards(os.path.join(tar_root, "train"))
+    source = TarShardDataset(os.path.join(tar_root, "train"), cache=ShardCache(os.path.join(tmp_path, "cache"), 1))
+    rows = list(source)
+    assert len(rows) == len(source) == 15
+    # a cache smaller than a shard keeps the last shard only
+    assert len(source.cache.entries()) == 1
+
+    dataset = create_dataset(name="tar", root=tar_root, split="train", shard_cache_size=shard_cache_size)
+    assert len(list(dataset.create_tuple_iterator(output_numpy=True))) == 15
+    assert os.path.isdir(os.path.join(tmp_path, "shards")) == (shard_cache_size is not None)
+
+
+def _make_jpeg_folder(root, num_classes=2, num_per_class=3):
+    rng = np.random.default_rng(0)
+    for c in range(num_classes):
+        class_dir = os.path.join(root, f"class{c}")
+        os.makedirs(class_dir, exist_ok=True)
+        for i in range(num_per_class):
+            image = rng.integers(0, 256, size=(40 + 7 * i, 50 + 5 * c, 3), dtype=np.uint8)
+            Image.fromarray(image).save(os.path.join(class_dir, f"{i:06d}.jpg"))
+
+
+def _eval_cache_files(cache_dir):
+    return sorted(f for f in os.listdir(cache_dir) if f.endswith(".npy"))
+
+
+# test eval cache
+@pytest.mark.parametrize("image_resize", [32, (24, 32)])
+def test_create_cached_eval_dataset(tmp_path, image_resize):
+    """
+    test create_cached_eval_dataset API
+    command: pytest -s test_dataset.py::test_create_cached_eval_dataset
+    """
+    root = os.path.join(tmp_path, "data")
+    _make_jpeg_folder(os.path.join(root, "val"))
+    cache_dir = os.path.join(tmp_path, "cache")
+
+    dataset = create_dataset(name="", root=root, split="val", shuffle=False, num_parallel_workers=1)
+    trans = create_transforms("", image_resize=image_resize, is_training=False, crop_pct=0.8)
+    dataset = dataset.map(operations=trans[:-2], input_columns="image", num_parallel_workers=1)
+    expected = [(image, int(label)) for image, label in dataset.create_tuple_iterator(output_numpy=True)]
+
+    kwargs = dict(root=root, cache_dir=cache_dir, image_resize=image_resize, crop_pct=0.8, num_parallel_workers=1)
+    cached = create_cached_eval_dataset(**kwargs)
+    assert cached.num_classes() == 2
+    cache_files = _eval_cache_files(cache_dir)
+    assert len(cache_files) == 1
+    mtime = os.stat(os.path.join(cache_dir, cache_files[0])).st_mtime_ns
+
+    # the second creation reuses the cache
+    cached = create_cached_eval_dataset(**kwargs)
+    assert _eval_cache_files(cache_dir) == cache_files
+    assert os.stat(os.path.join(cache_dir, cache_files[0])).st_mtime_ns == mtime
+    outputs = [(image, int(label)) for image, label in cached.create_tuple_iterator(output_numpy=True)]
+    assert len(outputs) == len(expected) == 6
+    for (image, label), (expected_image, expected_label) in zip(outputs, expected):
+        assert image.dtype == np.uint8
+        assert label == expected_label
+        np.testing.assert_array_equal(image, expected_image)
+
+    # the cached images only go through Normalize and HWC2CHW
+    trans = create_transforms("", image_resize=image_resize, is_training=False, cached=True)
+    assert len(trans) == 2
+    cached = cached.map(operations=trans, input_columns="image", num_parallel_workers=1)
+    image, _ = next(cached.create_tuple_iterator(output_numpy=True))
+    assert image.shape[0] == 3 and image.dtype == np.float32
+
+    # a different crop_pct gets its own cache
+    create_cached_eval_dataset(**dict(kwargs, crop_pct=0.9))
+    assert len(_eval_cache_files(cache_dir)) == 2
+
+
+def test_create_cached_eval_dataset_concurrent(tmp_path, monkeypatch):
+    """
+    test create_cached_eval_dataset API(the ranks of a host build the cache once)
+    command: pytest -s test_dataset.py::test_create_cached_eval_dataset_concurrent
+    """
+    root = os.path.join(tmp_path, "data")
+    _make_jpeg_folder(os.path.join(root, "val"))
+    cache_dir = os.path.join(tmp_path, "cache")
+    build_cache = eval_cache._build_cache
+    num_builds = []
+
+    def slow_build_cache(*args, **kwargs):
+        num_builds.append(1)
+        time.sleep(0.5)
+        build_cache(*args, **kwargs)
+
+    monkeypatch.setattr(eval_cache, "_build_cache", slow_build_cache)
+    kwargs = dict(root=root, cache_dir=cache_dir, image_resize=32, num_parallel_workers=1)
+    # the lock is per open file, so that threads stand for the ranks
+    datasets = [None] * 3
+
+    def create(rank):
+        datasets[rank] = create_cached_eval_dataset(**kwargs, num_shards=3, shard_id=rank)
+
+    threads = [threading.Thread(target=create, args=(rank,)) for rank in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(num_builds) == 1
+    assert len(_eval_cache_files(cache_dir)) == 1
+    assert sum(dataset.get_dataset_size() for dataset in datasets) == 6
+
+
+def test_repeat_aug_sampler_state():
+    """
+    test RepeatAugSampler state_dict/load_state_dict
+    command: pytest -s test_dataset.py::test_repeat_aug_sampler_state
+    """
+    sampler = RepeatAugSampler(20, num_shards=2, rank_id=1, num_repeats=3, selected_round=0, seed=7)
+    epochs = [list(sampler) for _ in range(2)]
+    assert epochs[0] != epochs[1]
+    assert sampler.state_dict() == {"seed": 7, "epoch": 2, "cursor": 0}
+
+    resumed = RepeatAugSampler(20, num_shards=2, rank_id=1, num_repeats=3, selected_round=0)
+    resumed.load_state_dict({"seed": 7, "epoch": 1, "cursor": 4})
+    assert list(resumed) == epochs[1][4:]
+    assert resumed.state_dict() == {"seed": 7, "epoch": 2, "cursor": 0}
+    with pytest.raises(ValueError):
+        resumed.load_state_dict({"seed": 7, "epoch": 1, "cursor": len(resumed) + 1})
+
+
+def _repeat_aug_reference(sampler, epoch):
+    """Indices of the rank built from the repeated indices of all ranks, as in DeiT."""
+    if sampler.shuffle:
+        indices = np.random.RandomState(seed=sampler.seed + epoch).permutation(sampler.dataset_size).tolist()
+    else:
+        indices = list(range(sampler.dataset_size))
+    indices = [ele for ele in indices for _ in range(sampler.num_repeats)]
+    indices += indices[: sampler.total_size - len(indices)]
+    return indices[sampler.rank_id : sampler.total_size : sampler.num_shards][: sampler.num_selected_samples]
+
+
+@pytest.mark.parametrize("dataset_size", [20, 1001])
+@pytest.mark.parametrize("num_shards", [1, 7, 64])
+@pytest.mark.parametrize("num_repeats", [1, 3])
+@pytest.mark.parametrize("selected_round", [0, 256])
+@pytest.mark.parametrize("shuffle", [True, False])
+def test_repeat_aug_sampler(dataset_size, num_shards, num_repeats, selected_round, shuffle):
+    """
+    test RepeatAugSampler against the indices built from the repeated indices of all ranks
+    command: pytest -s test_dataset.py::test_repeat_aug_sampler
+    """
+    if num_shards > dataset_size * num_repeats:
+        pytest.skip("the padding of the reference is shorter than the padding needed")
+    for rank_id in {0, num_shards // 2, num_shards - 1}:
+        sampler = RepeatAugSampler(dataset_size, num_shards, rank_id, shuffle, num_repeats, selected_round)
+        sampler.chunk_size = 16
+        for epoch in range(2):
+            indices = list(sampler)
+            assert len(indices) == len(sampler)
+            assert indices == _repeat_aug_reference(sampler, epoch)
+
+
+@pytest.mark.parametrize("num_aug_repeats", [0, 3])
+def test_dataset_resume_init_step(tmp_path, num_aug_repeats):
+    """
+    test resuming a dataset at a step within an epoch, as train.py does with the data state of a checkpoint
+    command: pytest -s test_dataset.py::test_dataset_resume_init_step
+    """
+    _make_image_folder(os.path.join(tmp_path, "train"))
+    seed = ms.dataset.config.get_seed()
+    ms.dataset.config.set_seed(0)
+
+    def labels(init_step=0, num_epochs=3):
+        dataset = create_dataset(
+            root=str(tmp_path), split="train", shuffle=True, num_parallel_workers=1, num_aug_repeats=num_aug_repeats
+        )
+        dataset.set_init_step(init_step)
+        iterator = dataset.create_tuple_iterator(output_numpy=True, num_epochs=num_epochs)
+        return [[int(label) for _, label in iterator] for _ in range(num_epochs - init_step // 15)]
+
+    try:
+        expected = labels()
+        resumed = labels(init_step=15 + 6)
+    finally:
+        ms.dataset.config.set_seed(seed)
+    assert resumed[0] == expected[1][6:]
+    assert resumed[1] == expected[2]
+
+
+@pytest.mark.parametrize("num_aug_repeats", [0, 3])
+def test_create_dataset_manifest(tmp_path, num_aug_repeats):
+    """
+    test create_dataset API(manifest_dir)
+    command: pytest -s test_dataset.py::test_create_dataset_manifest
+    """
+    _make_image_folder(os.path.join(tmp_path, "data", "train"))
+    manifest_dir = os.path.join(tmp_path, "manifest")
+
+    def rows(**kwargs):
+        dataset = create_dataset(
+            root=os.path.join(tmp_path, "data"),
+            split="train",
+            shuffle=False,
+            num_parallel_workers=1,
+            num_aug_repeats=num_aug_repeats,
+            **kwargs,
+        )
+        assert dataset.num_classes() == 3
+        return [(image.tobytes(), int(label)) for image, label in dataset.create_tuple_iterator(output_numpy=True)]
+
+    assert rows(manifest_dir=manifest_dir) == rows()
+
+    manifest = get_image_folder_manifest(os.path.join(tmp_path, "data", "train"), manifest_dir)
+    assert manifest["num_samples"] == 15
+    mtime = os.path.getmtime(manifest["paths_file"])
+    assert get_image_folder_manifest(os.path.join(tmp_path, "data", "train"), manifest_dir) == manifest
+    assert os.path.getmtime(manifest["paths_file"]) == mtime
+
+    # a new file changes the mtime of its class directory, the manifest is rebuilt
+    with open(os.path.join(tmp_path, "data", "train", "class1", "000005.jpg"), "wb") as f:
+        f.write(b"new")
+    assert get_image_folder_manifest(os.path.join(tmp_path, "data", "train"), manifest_dir)["num_samples"] == 16
+    assert rows(manifest_dir=manifest_dir) == rows()
+
+
+@pytest.mark.parametrize("weighting", ["sqrt", "inverse"])
+@pytest.mark.parametrize("num_repeats", [1, 3])
+def test_weighted_distributed_sampler(weighting, num_repeats):
+    """
+    test WeightedDistributedSampler
+    command: pytest -s test_dataset.py::test_weighted_distributed_sampler
+    """
+    # long-tailed labels, class 3 is empty
+    labels = np.repeat([0, 1, 2, 4], [900, 90, 9, 1])
+    num_shards = 3
+    samplers = [
+        WeightedDistributedSampler(labels, num_shards, rank_id, weighting=weighting, num_repeats=num_repeats)
+        for rank_id in range(num_shards)
+    ]
+    indices = [np.array([list(sampler) for _ in range(20)]) for sampler in samplers]
+    for rank_indices in indices:
+        assert rank_indices.shape == (20, len(samplers[0]))
+    if num_repeats == 3:  # every draw is repeated on all ranks
+        np.testing.assert_array_equal(indices[0], indices[1])
+        np.testing.assert_array_equal(indices[0], indices[2])
+
+    counts = np.array([900, 90, 9, 0, 1])
+    expected = np.sqrt(counts) if weighting == "sqrt" else (counts > 0).astype(np.float64)
+    expected /= expected.sum()
+    frequencies = np.bincount(labels[np.concatenate(indices).ravel()], minlength=5) / np.concatenate(indices).size
+    np.testing.assert_allclose(frequencies, expected, atol=0.02)
+    assert frequencies[3] == 0
+
+
+@pytest.mark.parametrize("num_aug_repeats", [0, 3])
+def test_create_dataset_class_weighting(tmp_path, num_aug_repeats):
+    """
+    test create_dataset API(class_weighting)
+    command: pytest -s test_dataset.py::test_create_dataset_class_weighting
+    """
+    _make_image_folder(os.path.join(tmp_path, "train"))
+    dataset = create_dataset(
+        root=str(tmp_path),
+        split="train",
+        num_parallel_workers=1,
+        num_aug_repeats=num_aug_repeats,
+        class_weighting="inverse",
+    )
+    assert isinstance(dataset.sampler.sampler, WeightedDistributedSampler)
+    rows = list(dataset.create_tuple_iterator(output_numpy=True))
+    assert len(rows) == dataset.get_dataset_size() == 15
+    for image, label in rows:
+        assert image.tobytes()[0] == label
@@ -0,0 +1,124 @@
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+import pytest
+
+import mindspore as ms
+from mindspore import Tensor, nn
+
+from mindcv.models import RepMLPNet, create_model, fuse_for_inference, reparameterize
+from mindcv.models.deploy import _invalidate_graphs, _replace
+
+
+@pytest.mark.parametrize("mode", [0, 1])
+@pytest.mark.parametrize("name", ["resnet18", "mobilenet_v2_035_128", "regnet_x_200mf"])
+def test_fuse_for_inference(mode, name):
+    ms.set_context(mode=mode)
+    model = create_model(name, num_classes=10)
+    num_bn = sum(isinstance(cell, nn.BatchNorm2d) for _, cell in model.cells_and_names())
+
+    report = fuse_for_inference(model, input_shape=(2, 3, 64, 64), num_runs=1)
+    assert report["num_fused"] == num_bn
+    assert report["num_ops_after"] == report["num_ops_before"] - num_bn
+    assert report["latency_before_ms"] > 0 and report["latency_after_ms"] > 0
+    assert not any(isinstance(cell, nn.BatchNorm2d) for _, cell in model.cells_and_names())
+    assert not any("moving_mean" in name for name in model.parameters_dict())
+
+
+class ConvBNShortcut(nn.Cell):
+    """The output of the conv is also added outside of the cells, the BN can not be folded."""
+
+    def __init__(self):
+        super().__init__()
+        self.conv = nn.Conv2d(3, 3, 3)
+        self.bn = nn.BatchNorm2d(3, moving_mean_init="normal", moving_var_init="ones")
+
+    def construct(self, x):
+        y = self.conv(x)
+        return self.bn(y) + y
+
+
+@pytest.mark.parametrize("mode", [0, 1])
+def test_fuse_for_inference_mismatch(mode):
+    ms.set_context(mode=mode)
+    model = ConvBNShortcut()
+    x = Tensor(np.random.rand(1, 3, 8, 8).astype(np.float32))
+    model.set_train(False)
+    expected = model(x).asnumpy()
+
+    with pytest.raises(RuntimeError):
+        fuse_for_inference(model, input_shape=(1, 3, 8, 8), num_runs=0)
+    # the fusion is undone
+    assert isinstance(model.bn, nn.BatchNorm2d) and not model.conv.has_bias
+    np.testing.assert_allclose(model(x).asnumpy(), expected, rtol=1e-6)
+
+
+def _randomize_bn(model):
+    """Non trivial BN statistics, so that a wrong fusion shows."""
+    for name, param in model.parameters_and_names():
+        if "moving_variance" in name or "gamma" in name:
+            param.set_data(Tensor(np.random.uniform(0.5, 1.5, param.shape).astype(np.float32)))
+        elif "moving_mean" in name or "beta" in name:
+            param.set_data(Tensor(np.random.uniform(-0.1, 0.1, param.shape).astype(np.float32)))
+
+
+@pytest.mark.parametrize("mode", [0, 1])
+def test_reparameterize(mode, tmp_path):
+    ms.set_context(mode=mode)
+    model = create_model("repvgg_a0", num_classes=10)
+    _randomize_bn(model)
+    model.set_train(False)
+    x = Tensor(np.random.rand(2, 3, 32, 32).astype(np.float32))
+    expected = model(x).asnumpy()
+    atol = 1e-4 * np.abs(expected).max()
+    train_ckpt, deploy_ckpt = str(tmp_path / "train.ckpt"), str(tmp_path / "deploy.ckpt")
+    ms.save_checkpoint(model, train_ckpt)
+    num_params = len(model.parameters_dict())
+
+    reparameterize(model, save_path=deploy_ckpt)
+    assert len(model.parameters_dict()) < num_params
+    assert not any("rbr_dense" in name or "rbr_1x1" in name for name in model.parameters_dict())
+    np.testing.assert_allclose(model(x).asnumpy(), expected, atol=atol)
+    assert sorted(ms.load_checkpoint(deploy_ckpt)) == sorted(model.parameters_dict())
+
+    # both the training checkpoint and the deploy one are loaded into the deploy model
+    for checkpoint_path in (train_ckpt, deploy_ckpt):
+        deployed = create_model("repvgg_a0", num_classes=10, deploy=True, checkpoint_path=checkpoint_path)
+        deployed.set_train(False)
+        np.testing.assert_allclose(deployed(x).asnumpy(), expected, atol=atol)
+
+
+@pytest.mark.parametrize("mode", [0, 1])
+def test_reparameterize_repmlp(mode):
+    ms.set_context(mode=mode)
+    model = RepMLPNet(
+        num_class=10,
+        channels=(16, 32),
+        num_blocks=(1, 1),
+        hs=(8, 4),
+        ws=(8, 4),
+        sharesets_nums=(2, 4),
+        reparam_conv_k=(1, 3),
+    )
+    _randomize_bn(model)
+    model.set_train(False)
+    x = Tensor(np.random.rand(2, 3, 32, 32).astype(np.float32))
+    expected = model(x).asnumpy()
+
+    reparameterize(model)
+    assert not any("repconv" in name or "fc3_bn" in name for name in model.parameters_dict())
+    np.testing.assert_allclose(model(x).asnumpy(), expected, atol=1e-4 * np.abs(expected).max())
+
+
+def test_invalidate_graphs():
+    """The conversions rely on MindSpore caching the graphs by `Cell.create_time`, this fails if it stops doing so."""
+    ms.set_context(mode=ms.GRAPH_MODE)
+    model = nn.SequentialCell([nn.Dense(4, 4), nn.ReLU()])
+    x = Tensor(-np.ones((2, 4), dtype=np.float32))
+    model(x)  # compile
+
+    _replace(model, model[1], nn.Tanh())
+    _invalidate_graphs(model)
+    np.testing.assert_allclose(model(x).asnumpy(), np.tanh(model[0](x).asnumpy()), rtol=1e-6)
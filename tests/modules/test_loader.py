@@ -1,14 +1,24 @@
+import json
 import os
 import sys
 
 sys.path.append(".")
 
+import numpy as np
 import pytest
+from PIL import Image
 
 import mindspore as ms
 from mindspore.dataset.transforms import OneHot
 
-from mindcv.data import create_dataset, create_loader, get_dataset_download_root
+from mindcv.data import (
+    create_dataset,
+    create_loader,
+    create_transforms,
+    get_dataset_download_root,
+    get_resize_phases,
+    read_autotune_config,
+)
 from mindcv.utils.download import DownLoad
 
 num_classes = 2
@@ -62,7 +72,7 @@ def test_dataset_loader_standalone(
     root_dir = os.path.join(get_dataset_download_root(), "Canidae")
     data_dir = os.path.join(root_dir, "data", "Canidae")  # Canidae has prefix path "data/Canidae" in unzipped file.
     if not os.path.exists(data_dir):
-        DownLoad().download_and_extract_archive(dataset_url, root_dir)
+        DownLoad().download_and_extract_archive(dataset_url, root_dir, allow_unverified=True)
 
     dataset = create_dataset(
         name=name,
@@ -90,3 +100,169 @@ def test_dataset_loader_standalone(
     out_shapes = loader_train.output_shapes()[0]
     assert out_batch_size == batch_size
     assert out_shapes == [batch_size, 3, 224, 224]
+
+
+@pytest.mark.parametrize("auto_augment", [None, "randaug-m9-n2", "augmix-m3-w2"])
+@pytest.mark.parametrize("batch_size", [2, 4])
+@pytest.mark.parametrize("normalize_on_device", [False, True])
+def test_loader_augment_splits(tmp_path, auto_augment, batch_size, normalize_on_device):
+    """
+    test create_loader API(separate=True)
+    command: pytest -s test_loader.py::test_loader_augment_splits
+    """
+    rng = np.random.default_rng(0)
+    for c in range(2):
+        class_dir = os.path.join(tmp_path, "train", f"class{c}")
+        os.makedirs(class_dir)
+        for i in range(4):
+            image = rng.integers(0, 256, size=(48, 40, 3), dtype=np.uint8)
+            Image.fromarray(image).save(os.path.join(class_dir, f"{i}.jpg"))
+
+    dataset = create_dataset(root=str(tmp_path), split="train", shuffle=False, num_parallel_workers=1)
+    transform = create_transforms(
+        "",
+        image_resize=32,
+        is_training=True,
+        auto_augment=auto_augment,
+        separate=True,
+        normalize_on_device=normalize_on_device,
+    )
+    loader = create_loader(
+        dataset=dataset,
+        batch_size=batch_size,
+        drop_remainder=True,
+        is_training=True,
+        transform=transform,
+        num_parallel_workers=1,
+        separate=True,
+    )
+    assert loader.get_col_names() == ["image", "label"]
+    num_batches = 0
+    for image, label in loader.create_tuple_iterator(output_numpy=True):
+        num_batches += 1
+        if normalize_on_device:
+            assert image.shape == (3 * batch_size, 32, 32, 3) and image.dtype == np.uint8
+        else:
+            assert image.shape == (3 * batch_size, 3, 32, 32) and image.dtype == np.float32
+        np.testing.assert_array_equal(label, np.tile(label[:batch_size], 3))
+    assert num_batches == 8 // batch_size
+
+
+def test_loader_stage_workers(tmp_path):
+    """
+    test create_loader API(num_parallel_workers per stage)
+    command: pytest -s test_loader.py::test_loader_stage_workers
+    """
+    rng = np.random.default_rng(0)
+    class_dir = os.path.join(tmp_path, "train", "class0")
+    os.makedirs(class_dir)
+    for i in range(4):
+        image = rng.integers(0, 256, size=(48, 40, 3), dtype=np.uint8)
+        Image.fromarray(image).save(os.path.join(class_dir, f"{i}.jpg"))
+
+    dataset = create_dataset(root=str(tmp_path), split="train", shuffle=False, num_parallel_workers=1)
+    transform = create_transforms("", image_resize=32, is_training=False)
+    loader = create_loader(
+        dataset=dataset,
+        batch_size=2,
+        transform=transform,
+        num_parallel_workers={"label": 1, "image": 1},
+    )
+    assert loader.num_parallel_workers is None
+    assert loader.children[0].num_parallel_workers == 1
+    assert loader.children[0].children[0].num_parallel_workers == 1
+    assert sum(1 for _ in loader.create_tuple_iterator(output_numpy=True)) == 2
+    # the batch stage resolves its workers like the other stages
+    for num_parallel_workers in [1, {"batch": 1}]:
+        loader = create_loader(
+            dataset=dataset, batch_size=2, transform=transform, num_parallel_workers=num_parallel_workers
+        )
+        assert loader.num_parallel_workers == 1
+
+    with pytest.raises(ValueError):
+        create_loader(dataset=dataset, batch_size=2, transform=transform, num_parallel_workers={"decode": 1})
+
+
+@pytest.mark.parametrize("max_rowsize", [None, 4, [4, 1]])
+@pytest.mark.parametrize("separate", [False, True])
+def test_loader_python_multiprocessing(tmp_path, max_rowsize, separate):
+    """
+    test create_loader API(Python transforms in worker processes, normalized on device)
+    command: pytest -s test_loader.py::test_loader_python_multiprocessing
+    """
+    rng = np.random.default_rng(0)
+    class_dir = os.path.join(tmp_path, "train", "class0")
+    os.makedirs(class_dir)
+    for i in range(4):
+        image = rng.integers(0, 256, size=(48, 40, 3), dtype=np.uint8)
+        Image.fromarray(image).save(os.path.join(class_dir, f"{i}.jpg"))
+
+    dataset = create_dataset(root=str(tmp_path), split="train", shuffle=False, num_parallel_workers=1)
+    transform = create_transforms(
+        "", image_resize=32, is_training=True, auto_augment="randaug-m9", separate=separate, normalize_on_device=True
+    )
+    loader = create_loader(
+        dataset=dataset,
+        batch_size=2,
+        is_training=True,
+        transform=transform,
+        num_parallel_workers=1,
+        python_multiprocessing=True,
+        separate=separate,
+        max_rowsize=max_rowsize,
+    )
+    images = [image for image, _ in loader.create_tuple_iterator(output_numpy=True, num_epochs=1)]
+    assert len(images) == 2
+    assert images[0].shape == ((6 if separate else 2), 32, 32, 3) and images[0].dtype == np.uint8
+
+
+def test_read_autotune_config(tmp_path):
+    """
+    test read_autotune_config API
+    command: pytest -s test_loader.py::test_read_autotune_config
+    """
+
+    def node(op_type, workers, children=(), **kwargs):
+        return dict(
+            op_type=op_type, num_parallel_workers=workers, connector_queue_size=16, children=list(children), **kwargs
+        )
+
+    tree = node(
+        "Batch",
+        2,
+        [
+            node(
+                "Map",
+                6,
+                [node("Map", 1, [node("ImageFolderDataset", 4)], input_columns=["label"])],
+                input_columns=["image"],
+            )
+        ],
+    )
+    tree["connector_queue_size"] = 32
+    filepath = os.path.join(tmp_path, "autotune_0.json")
+    with open(filepath, "w") as f:
+        json.dump(dict(remark="", summary=[], tree=tree), f)
+
+    config = read_autotune_config(filepath)
+    assert config == dict(num_parallel_workers=4, loader_workers={"label": 1, "image": 6, "batch": 2}, prefetch_size=32)
+
+
+@pytest.mark.parametrize("scale_batch_size", [True, False])
+def test_get_resize_phases(scale_batch_size):
+    """
+    test get_resize_phases API
+    command: pytest -s test_loader.py::test_get_resize_phases
+    """
+    assert get_resize_phases(10, 224, 128) == [dict(start_epoch=0, end_epoch=10, image_resize=224, batch_size=128)]
+
+    phases = get_resize_phases(10, 224, 128, [[6, 224], [2, 112], [4, 112]], scale_batch_size)
+    assert [(p["start_epoch"], p["end_epoch"], p["image_resize"]) for p in phases] == [
+        (0, 2, 224),
+        (2, 6, 112),
+        (6, 10, 224),
+    ]
+    assert [p["batch_size"] for p in phases] == ([128, 512, 128] if scale_batch_size else [128, 128, 128])
+
+    with pytest.raises(ValueError):
+        get_resize_phases(10, 224, 128, [[10, 112]])
@@ -0,0 +1,152 @@
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+import pytest
+
+import mindspore as ms
+from mindspore import Tensor
+
+from mindcv.data.mixup import Mixup, MixupCell, cutmix_bbox_and_lam, mixup_target
+
+
+def _ref_one_hot(x, num_classes, on_value, off_value):
+    x = np.eye(num_classes)[x.reshape(-1)]
+    return np.clip(x, a_min=off_value, a_max=on_value)
+
+
+def _ref_mix(mixup_fn, x, target):
+    """Per-sample loop reference, drawing the random params in the same order as `Mixup`."""
+    batch_size = len(x)
+    num_params = batch_size // 2 if mixup_fn.mode == "pair" else batch_size
+    lam_batch, use_cutmix = mixup_fn._params_per_elem(num_params)
+    cut = np.flatnonzero((lam_batch != 1.0) & use_cutmix)
+    if cut.size > 0:
+        cut_bbox, cut_lam = cutmix_bbox_and_lam(
+            x.shape, lam_batch[cut], ratio_minmax=mixup_fn.cutmix_minmax, correct_lam=True, count=cut.size
+        )
+    x_orig = x.copy()
+    for i in range(num_params):
+        j = batch_size - i - 1
+        pairs = [(i, j), (j, i)] if mixup_fn.mode == "pair" else [(i, j)]
+        if lam_batch[i] == 1.0:
+            continue
+        if use_cutmix[i]:
+            k = int(np.flatnonzero(cut == i)[0])
+            yl, yh, xl, xh = (int(b[k]) for b in cut_bbox)
+            for a, b in pairs:
+                x[a][:, yl:yh, xl:xh] = x_orig[b][:, yl:yh, xl:xh]
+            lam_batch[i] = cut_lam[k]
+        else:
+            for a, b in pairs:
+                x[a] = x[a] * lam_batch[i] + x_orig[b] * (1 - lam_batch[i])
+    if mixup_fn.mode == "pair":
+        lam_batch = np.concatenate((lam_batch, lam_batch[::-1]))
+    smoothing = mixup_fn.label_smoothing
+    off_value = smoothing / mixup_fn.num_classes
+    on_value = 1.0 - smoothing + off_value
+    y1 = _ref_one_hot(target, mixup_fn.num_classes, on_value, off_value)
+    y2 = _ref_one_hot(target[::-1], mixup_fn.num_classes, on_value, off_value)
+    lam = lam_batch.reshape(-1, 1)
+    return x, y1 * lam + y2 * (1.0 - lam)
+
+
+@pytest.mark.parametrize("mode", ["elem", "pair"])
+@pytest.mark.parametrize("mixup_alpha, cutmix_alpha", [(1.0, 0.0), (0.0, 1.0), (0.8, 1.0)])
+@pytest.mark.parametrize("label_smoothing", [0.0, 0.1])
+def test_mixup_elem_pair(mode, mixup_alpha, cutmix_alpha, label_smoothing):
+    """
+    test vectorized Mixup against a per-sample loop
+    command: pytest -s test_mixup.py::test_mixup_elem_pair
+    """
+    num_classes = 10
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((8, 3, 16, 12)).astype(np.float32)
+    target = rng.integers(0, num_classes, size=8).astype(np.int32)
+    mixup_fn = Mixup(
+        mixup_alpha=mixup_alpha,
+        cutmix_alpha=cutmix_alpha,
+        prob=0.8,
+        mode=mode,
+        label_smoothing=label_smoothing,
+        num_classes=num_classes,
+    )
+
+    np.random.seed(1)
+    x_ref, target_ref = _ref_mix(mixup_fn, x.copy(), target)
+    np.random.seed(1)
+    x_out, target_out = mixup_fn(x.copy(), target)
+
+    assert x_out.dtype == np.float32 and target_out.dtype == np.float32
+    assert target_out.shape == (8, num_classes)
+    np.testing.assert_allclose(x_out, x_ref, rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(target_out, target_ref, rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(target_out.sum(axis=1), 1.0, rtol=1e-6)
+
+
+@pytest.mark.parametrize("lam", [1.0, 0.3, np.array([0.2, 0.5, 1.0, 0.7])])
+def test_mixup_target(lam):
+    """
+    test mixup_target against the dense one-hot formula
+    command: pytest -s test_mixup.py::test_mixup_target
+    """
+    target = np.array([0, 3, 3, 1])
+    out = mixup_target(target, 5, lam, smoothing=0.1)
+    y1 = _ref_one_hot(target, 5, 0.92, 0.02)
+    y2 = _ref_one_hot(target[::-1], 5, 0.92, 0.02)
+    lam = np.reshape(lam, (-1, 1))
+    np.testing.assert_allclose(out, y1 * lam + y2 * (1.0 - lam), rtol=1e-6)
+
+
+@pytest.mark.parametrize("mode", [0, 1])
+@pytest.mark.parametrize("mixup_alpha, cutmix_alpha", [(1.0, 0.0), (0.0, 1.0), (0.8, 1.0)])
+def test_mixup_cell(mode, mixup_alpha, cutmix_alpha):
+    """
+    test MixupCell
+    command: pytest -s test_mixup.py::test_mixup_cell
+    """
+    ms.set_context(mode=mode)
+    num_classes = 5
+    x = np.random.rand(4, 3, 8, 8).astype(np.float32)
+    label = np.array([0, 1, 2, 3], dtype=np.int32)
+    x_flipped = x[::-1]
+    mixup_fn = MixupCell(
+        mixup_alpha=mixup_alpha, cutmix_alpha=cutmix_alpha, label_smoothing=0.0, num_classes=num_classes
+    )
+
+    for _ in range(3):
+        x_out, target = mixup_fn(Tensor(x), Tensor(label))
+        x_out, target = x_out.asnumpy(), target.asnumpy()
+        lam = target[0, label[0]]
+        np.testing.assert_allclose(target.sum(axis=1), 1.0, rtol=1e-5)
+        np.testing.assert_allclose(target[np.arange(4), label[::-1]], 1.0 - lam, rtol=1e-5)
+
+        blended = x * lam + x_flipped * (1.0 - lam)
+        if not np.allclose(x_out, blended, atol=1e-5):
+            # cutmix: the pixels in the bbox are taken from the flipped batch, lam is the ratio of the kept area
+            assert cutmix_alpha > 0.0
+            in_bbox = (x_out == x_flipped).all(axis=(0, 1))
+            np.testing.assert_array_equal(x_out, np.where(in_bbox, x_flipped, x))
+            np.testing.assert_allclose(1.0 - in_bbox.mean(), lam, rtol=1e-5)
+
+
+@pytest.mark.parametrize("mixup_alpha, cutmix_alpha", [(1.0, 0.0), (0.0, 1.0)])
+def test_mixup_cell_channels_last(mixup_alpha, cutmix_alpha):
+    """
+    test MixupCell on NHWC uint8 batches
+    command: pytest -s test_mixup.py::test_mixup_cell_channels_last
+    """
+    ms.set_context(mode=1)
+    x = np.random.randint(0, 256, (4, 8, 6, 3), dtype=np.uint8)
+    label = Tensor(np.array([0, 1, 2, 3], dtype=np.int32))
+    kwargs = dict(mixup_alpha=mixup_alpha, cutmix_alpha=cutmix_alpha, label_smoothing=0.0, num_classes=5, seed=1)
+    mixup_nhwc = MixupCell(channels_last=True, **kwargs)
+    mixup_nchw = MixupCell(**kwargs)
+
+    for _ in range(3):
+        x_nhwc, target_nhwc = mixup_nhwc(Tensor(x), label)
+        x_nchw, target_nchw = mixup_nchw(Tensor(x.transpose(0, 3, 1, 2).astype(np.float32)), label)
+        assert x_nhwc.dtype == ms.float32
+        np.testing.assert_allclose(x_nhwc.asnumpy().transpose(0, 3, 1, 2), x_nchw.asnumpy(), rtol=1e-5)
+        np.testing.assert_allclose(target_nhwc.asnumpy(), target_nchw.asnumpy(), rtol=1e-6)
@@ -1,3 +1,4 @@
+import subprocess
 import sys
 
 sys.path.append(".")
@@ -8,12 +9,15 @@ sys.path.append(".")
 # import mindspore as ms
 # from mindspore import Tensor
 
+import pytest
+
 from mindcv import list_models, list_modules
 from mindcv.models import (  # create_model,; get_pretrained_cfg_value,
     is_model_in_modules,
     is_model_pretrained,
     model_entrypoint,
 )
+from mindcv.models.model_index import MODELS
 
 # TODO: the global avg pooling op used in EfficientNet is not supported for CPU.
 # TODO: memory resource is limited on free github action runner, ask the PM for self-hosted runners!
@@ -151,6 +155,47 @@ def test_is_model_pretrained():
     assert num_pretrained > 0, "No pretrained models"
 
 
+def _run_python(code):
+    return subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+
+
+def test_lazy_import():
+    # a cold `import mindcv` imports neither mindspore nor any subpackage, and is faster than importing mindspore
+    output = _run_python(
+        "import sys, time\n"
+        "start = time.perf_counter(); import mindcv; end = time.perf_counter()\n"
+        "print(sorted(m for m in sys.modules if m.startswith(('mindcv.', 'mindspore'))))\n"
+        "import mindspore; print(end - start < time.perf_counter() - end)\n"
+    )
+    assert output.split("\n")[:2] == ["['mindcv.version']", "True"]
+
+    # creating a model imports its module only
+    output = _run_python(
+        "import sys; from mindcv.models import create_model, list_models\n"
+        "assert len(list_models()) > 100 and list_models('resnet18') == ['resnet18']\n"
+        "create_model('resnet18', num_classes=10)\n"
+        "print(sorted(m for m in sys.modules if m.startswith('mindcv.models.') and m.count('.') == 2))\n"
+    )
+    model_modules = {module_name for module_name, _ in MODELS.values()}
+    assert [m for m in eval(output.strip()) if m.rsplit(".", 1)[-1] in model_modules] == ["mindcv.models.resnet"]
+
+
+def test_lazy_exports():
+    import mindcv.models
+
+    assert mindcv.create_model is mindcv.models.create_model
+    assert mindcv.models.ResNet is mindcv.models.resnet.ResNet
+    assert callable(mindcv.models.googlenet)  # the function, not the module of the same name
+    assert set(mindcv.__all__) >= set(mindcv.models.__all__)
+    with pytest.raises(AttributeError):
+        mindcv.models.not_a_model
+
+
+def test_model_index_up_to_date():
+    result = subprocess.run([sys.executable, "scripts/gen_model_index.py", "--check"], capture_output=True, text=True)
+    assert result.returncode == 0, "Please run `python scripts/gen_model_index.py` to update the model index."
+
+
 if __name__ == "__main__":
     #    test_model_forward("pnasnet")
     """
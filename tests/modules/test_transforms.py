@@ -1,14 +1,37 @@
 import collections
+import io
 import os
+import random
 import sys
 
 sys.path.append(".")
 
+import numpy as np
 import pytest
+from PIL import Image
 
 import mindspore as ms
-
-from mindcv.data import create_dataset, create_loader, create_transforms, get_dataset_download_root
+from mindspore.dataset import vision
+
+from mindcv.data import (
+    IMAGENET_DEFAULT_MEAN,
+    IMAGENET_DEFAULT_STD,
+    create_dataset,
+    create_loader,
+    create_transforms,
+    get_dataset_download_root,
+)
+from mindcv.data.auto_augment import (
+    AugmentOp,
+    _contrast_lut,
+    augment_and_mix_transform,
+    contrast,
+    invert,
+    posterize,
+    solarize,
+)
+from mindcv.data.reduced_decode import ReducedDecode, ReducedRandomCropDecodeResize
+from mindcv.models.layers import Identity, InputNormalize
 from mindcv.utils.download import DownLoad
 
 
@@ -40,7 +63,7 @@ def test_transforms_standalone_imagenet(mode, name, image_resize, is_training, a
     root_dir = os.path.join(get_dataset_download_root(), "Canidae")
     data_dir = os.path.join(root_dir, "data", "Canidae")  # Canidae has prefix path "data/Canidae" in unzipped file.
     if not os.path.exists(data_dir):
-        DownLoad().download_and_extract_archive(dataset_url, root_dir)
+        DownLoad().download_and_extract_archive(dataset_url, root_dir, allow_unverified=True)
 
     dataset = create_dataset(
         name=name,
@@ -191,7 +214,7 @@ def test_repeated_aug():
     root_dir = os.path.join(get_dataset_download_root(), "Canidae")
     data_dir = os.path.join(root_dir, "data", "Canidae")  # Canidae has prefix path "data/Canidae" in unzipped file.
     if not os.path.exists(data_dir):
-        DownLoad().download_and_extract_archive(dataset_url, root_dir)
+        DownLoad().download_and_extract_archive(dataset_url, root_dir, allow_unverified=True)
     num_classes = 2
     num_aug_repeats = 3
 
@@ -231,5 +254,141 @@ def test_repeated_aug():
                 print("Epoch: ", epoch, "Batch: ", batch, "Rank: ", rank_id, "Label: ", label[:4])
 
 
+@pytest.mark.parametrize("shape", [(37, 53, 3), (224, 224, 3)])
+def test_auto_augment_numpy_ops(shape):
+    rng = np.random.RandomState(0)
+    img = rng.randint(0, 256, shape, dtype=np.uint8)
+
+    np.testing.assert_array_equal(invert(img), vision.Invert()(img))
+    for bits_to_keep in range(9):
+        bits = max(8 - bits_to_keep, 1)
+        np.testing.assert_array_equal(posterize(img, bits_to_keep), vision.RandomPosterize(bits=(bits, bits))(img))
+    for thresh in [0, 1, 64, 128, 200, 255]:
+        np.testing.assert_array_equal(solarize(img, thresh), vision.RandomSolarize(threshold=(thresh, thresh))(img))
+
+
+@pytest.mark.parametrize("shape", [(37, 53, 3), (224, 224, 3)])
+def test_auto_augment_contrast_lut(shape):
+    rng = np.random.RandomState(0)
+    for i in range(40):
+        img = rng.randint(0, 256, shape, dtype=np.uint8)
+        if i % 2:
+            # narrow ranges move the gray mean and hit exact halves in the blend
+            img = img // rng.randint(2, 8) + np.uint8(rng.randint(0, 200))
+        factor = rng.uniform(0.0, 2.0) if i % 4 < 2 else 0.1 + 0.09 * rng.randint(0, 21)
+        expected = vision.RandomColorAdjust(contrast=(factor, factor))(img)
+        np.testing.assert_array_equal(_contrast_lut(img, factor), expected)
+        np.testing.assert_array_equal(contrast(img, factor), expected)
+
+
+@pytest.mark.parametrize("magnitude_std", [0, 0.5])
+def test_augment_op_level_args(magnitude_std):
+    hparams = {"magnitude_std": magnitude_std}
+    op = AugmentOp("Contrast", prob=1.0, magnitude=9, hparams=hparams)
+    if magnitude_std == 0:
+        assert op.level_args == pytest.approx((1.72,))
+    else:
+        assert op.level_args is None
+    # the sign of the increasing level is drawn on every call
+    assert AugmentOp("ContrastIncreasing", prob=1.0, magnitude=9, hparams=hparams).level_args is None
+
+
+def _augmix_reference(augmix, img):
+    """The float64 AugMix blend with a uint8 cast of the mixed chains."""
+    mixing_weights = np.float32(np.random.dirichlet([augmix.alpha] * augmix.width))
+    m = np.float32(np.random.beta(augmix.alpha, augmix.alpha))
+    mixed = np.zeros(img.shape, dtype=np.float32)
+    for mw in mixing_weights:
+        depth = augmix.depth if augmix.depth > 0 else np.random.randint(1, 4)
+        img_aug = img
+        for op in np.random.choice(augmix.ops, depth, replace=True):
+            img_aug = op(img_aug)
+        mixed += mw * img_aug.astype(np.float32)
+    mixed = np.clip(mixed, 0, 255.0).astype(np.uint8)
+    return img * (1 - m) + mixed * m
+
+
+@pytest.mark.parametrize("config", ["augmix", "augmix-m5-w4-d2"])
+@pytest.mark.parametrize("uint8", [False, True])
+def test_augmix(config, uint8):
+    rng = np.random.RandomState(0)
+    augmix = augment_and_mix_transform(config, {"img_mean": (124, 116, 104)}, uint8=uint8)
+    for seed in range(4):
+        img = rng.randint(0, 256, (64, 48, 3), dtype=np.uint8)
+        random.seed(seed)
+        np.random.seed(seed)
+        expected = _augmix_reference(augmix, img)
+        random.seed(seed)
+        np.random.seed(seed)
+        out = augmix(img)
+        if uint8:
+            # rounded to the nearest integer
+            assert out.dtype == np.uint8
+            np.testing.assert_allclose(out, expected, atol=0.5 + 1e-3)
+        else:
+            assert out.dtype == np.float32
+            np.testing.assert_allclose(out, expected, atol=1e-3)
+
+
+def _encode(img, fmt):
+    buf = io.BytesIO()
+    Image.fromarray(img).save(buf, fmt)
+    return np.frombuffer(buf.getvalue(), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+def test_reduced_decode(fmt):
+    rng = np.random.RandomState(0)
+    img = (np.linspace(0, 200, 960)[None, :, None] + rng.randint(0, 32, (720, 960, 3))).astype(np.uint8)
+    data = _encode(img, fmt)
+    reduced = fmt == "JPEG"
+
+    # the shorter side is reduced from 720 to 180, the largest reduction keeping it at least 150
+    out = ReducedDecode(150)(data)
+    assert out.shape == ((180, 240, 3) if reduced else img.shape)
+    assert ReducedDecode((720, 100))(data).shape == img.shape
+
+    # the whole image is resized, from a 1/4 reduction, close to the full decode
+    op = ReducedRandomCropDecodeResize((160, 200), scale=(1.0, 1.0), ratio=(4 / 3, 4 / 3))
+    out = op(data)
+    assert out.shape == (160, 200, 3) and out.dtype == np.uint8
+    expected = np.asarray(Image.fromarray(vision.Decode()(data)).resize((200, 160), Image.BILINEAR))
+    assert np.abs(out.astype(np.float32) - expected).mean() < 4
+
+    random.seed(0)
+    for _ in range(8):
+        assert ReducedRandomCropDecodeResize(64)(data).shape == (64, 64, 3)
+
+    transform = create_transforms("imagenet", image_resize=64, is_training=True, reduced_decode=True)
+    assert isinstance(transform[0], ReducedRandomCropDecodeResize)
+    transform = create_transforms("imagenet", image_resize=64, is_training=False, reduced_decode=True)
+    assert isinstance(transform[0], ReducedDecode)
+
+
+@pytest.mark.parametrize("is_training", [True, False])
+def test_transforms_normalize_on_device(is_training):
+    rng = np.random.RandomState(0)
+    data = _encode(rng.randint(0, 256, (48, 64, 3), dtype=np.uint8), "PNG")
+    kwargs = dict(image_resize=32, is_training=is_training)
+    if is_training:
+        # a deterministic crop of the whole image
+        kwargs.update(scale=(1.0, 1.0), ratio=(4 / 3, 4 / 3), hflip=0.0)
+
+    uint8_transform = create_transforms("imagenet", normalize_on_device=True, **kwargs)
+    img = data
+    for op in uint8_transform:
+        img = op(img)
+    assert img.shape == (32, 32, 3) and img.dtype == np.uint8
+
+    expected = data
+    for op in create_transforms("imagenet", **kwargs):
+        expected = op(expected)
+    out = InputNormalize(Identity(), mean=IMAGENET_DEFAULT_MEAN, std=IMAGENET_DEFAULT_STD)(ms.Tensor(img[None]))
+    np.testing.assert_allclose(out.asnumpy()[0], expected, rtol=1e-5, atol=1e-5)
+
+    with pytest.raises(ValueError):
+        create_transforms("cifar10", normalize_on_device=True)
+
+
 if __name__ == "__main__":
     test_repeated_aug()
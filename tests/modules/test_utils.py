@@ -1,6 +1,12 @@
 """Test utils"""
+import hashlib
+import http.server
 import os
+import re
 import sys
+import threading
+import time
+from types import SimpleNamespace
 
 sys.path.append(".")
 
@@ -14,7 +20,8 @@ from mindspore.nn import TrainOneStepCell, WithLossCell
 
 from mindcv.loss import create_loss
 from mindcv.optim import create_optimizer
-from mindcv.utils import CheckpointManager
+from mindcv.utils import CheckpointManager, StateMonitor, load_data_state
+from mindcv.utils.download import DownLoad
 
 ms.set_seed(1)
 np.random.seed(1)
@@ -87,3 +94,173 @@ def test_checkpoint_manager(mode, ckpt_save_policy):
         ckpoint_filelist = manager.save_ckpoint(network, num_ckpt=2, metric=acc, save_path=save_path)
 
     assert len(ckpoint_filelist) == 2, "num of checkpoints is NOT correct"
+
+
+@pytest.mark.parametrize("ckpt_save_policy", ["top_k", "latest_k"])
+def test_state_monitor_step_checkpoints(tmp_path, ckpt_save_policy):
+    network = SimpleCNN(in_channels=1, num_classes=10)
+    optimizer = create_optimizer(network.trainable_params(), "adam", lr=0.001)
+    monitor = StateMonitor(
+        None,
+        model_name="net",
+        dataset_sink_mode=False,
+        ckpt_save_dir=str(tmp_path),
+        ckpt_save_policy=ckpt_save_policy,
+        ckpt_keep_max=2,
+        ckpt_save_step_interval=2,
+    )
+    cb_params = SimpleNamespace(train_network=network, optimizer=optimizer, batch_num=5)
+    for epoch in range(1, 4):
+        for batch in (2, 4):
+            cb_params.cur_step_num = (epoch - 1) * 5 + batch
+            monitor._save_checkpoint(cb_params, epoch, batch, cb_params.cur_step_num)
+        cb_params.cur_step_num = epoch * 5
+        monitor._save_checkpoint(cb_params, epoch, 5, cb_params.cur_step_num, metric=0.5)
+    while ms.async_ckpt_thread_status():
+        time.sleep(0.01)
+
+    # the checkpoints within an epoch neither tie with nor evict the ranked ones, only the latest one is kept
+    ckpts = sorted(f for f in os.listdir(tmp_path) if f.startswith("net-"))
+    if ckpt_save_policy == "top_k":
+        expected = ["net-1_5", "net-2_5", "net-3_4"]
+    else:
+        expected = ["net-2_5", "net-3_4", "net-3_5"]
+    assert ckpts == sorted(f"{name}.{ext}" for name in expected for ext in ("ckpt", "json"))
+    assert load_data_state(os.path.join(tmp_path, "net-3_4.ckpt")) == dict(epoch=2, batch=4, step=14, num_batches=5)
+
+
+class _RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serves `server.data`, with range requests if `server.ranges`, truncating the responses starting at
+    `server.fail_at`, in pieces of 256 bytes sent every `server.delay` seconds if set."""
+
+    def do_GET(self):
+        data, size = self.server.data, len(self.server.data)
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if self.server.ranges and match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else size - 1
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            start, end = 0, size - 1
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.server.requests.append((start, end))
+        if start == self.server.fail_at:
+            self.wfile.write(data[start : start + (end - start + 1) // 2])
+            return
+        if not self.server.delay:
+            self.wfile.write(data[start : end + 1])
+            return
+        for piece_start in range(start, end + 1, 256):
+            self.wfile.write(data[piece_start : min(piece_start + 256, end + 1)])
+            self.wfile.flush()
+            time.sleep(self.server.delay)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    server.data = np.random.default_rng(0).integers(0, 256, 10000, dtype=np.uint8).tobytes()
+    server.ranges, server.fail_at, server.delay, server.requests = True, None, None, []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_download_file(tmp_path, http_server, ranges):
+    http_server.ranges = ranges
+    url = f"http://127.0.0.1:{http_server.server_address[1]}/file.bin"
+    md5 = hashlib.md5(http_server.data).hexdigest()
+    downloader = DownLoad()
+    downloader.part_size, downloader.num_threads = 1024, 4
+    file_path = os.path.join(tmp_path, "file.bin")
+
+    downloader.download_file(url, file_path, chunk_size=256, md5=md5)
+    with open(file_path, "rb") as f:
+        assert f.read() == http_server.data
+    assert os.listdir(tmp_path) == ["file.bin"]
+    # the probe and the 10 parts, or a single stream
+    assert len(http_server.requests) == (11 if ranges else 1)
+
+    # a checksum mismatch never reaches the final path
+    os.remove(file_path)
+    with pytest.raises(RuntimeError):
+        downloader.download_file(url, file_path, md5="0" * 32)
+    assert os.listdir(tmp_path) == []
+    with pytest.raises(RuntimeError):
+        downloader.download_file(url, file_path, sha256="0" * 64)
+    assert os.listdir(tmp_path) == []
+    downloader.download_file(url, file_path, sha256=hashlib.sha256(http_server.data).hexdigest())
+    assert os.listdir(tmp_path) == ["file.bin"]
+
+
+def test_download_file_state(tmp_path, http_server, monkeypatch):
+    url = f"http://127.0.0.1:{http_server.server_address[1]}/file.bin"
+    downloader = DownLoad()
+    # the parts are downloaded side by side, and their bytes are saved by the other threads as often as not
+    http_server.delay = 0.01
+    downloader.part_size, downloader.num_threads, downloader.state_interval = 2048, 5, 0.015
+    file_path = os.path.join(tmp_path, "file.bin")
+    save_state = DownLoad._save_state
+    num_saves = [0]
+
+    def checked_save_state(state_path, url, size, done):
+        # the bytes recorded as done are on disk, a resume after the process is killed does not skip a hole
+        with open(file_path + ".partial", "rb") as f:
+            data = f.read()
+        for i, part_done in enumerate(done):
+            start = i * downloader.part_size
+            assert data[start : start + part_done] == http_server.data[start : start + part_done]
+        num_saves[0] += 1
+        save_state(state_path, url, size, done)
+
+    monkeypatch.setattr(DownLoad, "_save_state", staticmethod(checked_save_state))
+    downloader.download_file(url, file_path, chunk_size=256, md5=hashlib.md5(http_server.data).hexdigest())
+    assert num_saves[0] > 1
+
+
+def test_download_file_without_hash(tmp_path, http_server):
+    url = f"http://127.0.0.1:{http_server.server_address[1]}/file.bin"
+    file_path = os.path.join(tmp_path, "file.bin")
+    # a hash is required, nothing is downloaded without one
+    with pytest.raises(ValueError, match="allow_unverified"):
+        DownLoad().download_file(url, file_path)
+    assert os.listdir(tmp_path) == [] and http_server.requests == []
+    with pytest.raises(ValueError, match="allow_unverified"):
+        DownLoad().download_url(url, str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+    # unless the caller opts out, then the size only is verified
+    DownLoad().download_file(url, file_path, allow_unverified=True)
+    with open(file_path, "rb") as f:
+        assert f.read() == http_server.data
+
+
+def test_download_file_resume(tmp_path, http_server):
+    url = f"http://127.0.0.1:{http_server.server_address[1]}/file.bin"
+    downloader = DownLoad()
+    downloader.part_size, downloader.num_threads = 1024, 1
+    file_path = os.path.join(tmp_path, "file.bin")
+
+    # interrupted in the middle of the 6th part
+    http_server.fail_at = 5 * 1024
+    with pytest.raises(IOError):
+        downloader.download_file(url, file_path, chunk_size=256, md5=hashlib.md5(http_server.data).hexdigest())
+    assert not os.path.exists(file_path)
+    assert os.path.isfile(file_path + ".partial") and os.path.isfile(file_path + ".partial.json")
+
+    http_server.fail_at, http_server.requests = None, []
+    downloader.download_file(url, file_path, chunk_size=256, md5=hashlib.md5(http_server.data).hexdigest())
+    with open(file_path, "rb") as f:
+        assert f.read() == http_server.data
+    assert os.listdir(tmp_path) == ["file.bin"]
+    # the other parts are completed by the first attempt, the probe and the rest of the 6th part remain
+    assert http_server.requests == [(0, 0), (5 * 1024 + 512, 6 * 1024 - 1)]
@@ -27,7 +27,7 @@ def test_train_ema(ema, val_while_train, model="resnet18"):
     root_dir = os.path.join(get_dataset_download_root(), "Canidae")
     data_dir = os.path.join(root_dir, "data", "Canidae")  # Canidae has prefix path "data/Canidae" in unzipped file.
     if not os.path.exists(data_dir):
-        DownLoad().download_and_extract_archive(dataset_url, root_dir)
+        DownLoad().download_and_extract_archive(dataset_url, root_dir, allow_unverified=True)
 
     # ---------------- test running train.py using the toy data ---------
     dataset = "imagenet"
@@ -1,4 +1,5 @@
 """ Model training pipeline """
+import copy
 import logging
 import os
 
@@ -6,9 +7,12 @@ import mindspore as ms
 from mindspore import Tensor
 from mindspore.communication import get_group_size, get_rank, init
 
-from mindcv.data import create_dataset, create_loader, create_transforms
+from mindcv.data import create_cached_eval_dataset, create_dataset, create_loader, create_transforms, get_resize_phases
+from mindcv.data.autotune import enable_autotune, read_autotune_config
+from mindcv.data.mixup import MixupCell
 from mindcv.loss import create_loss
 from mindcv.models import create_model
+from mindcv.models.layers import InputNormalize
 from mindcv.optim import create_optimizer
 from mindcv.scheduler import create_scheduler
 from mindcv.utils import (
@@ -16,6 +20,7 @@ from mindcv.utils import (
     StateMonitor,
     create_trainer,
     get_metrics,
+    load_data_state,
     require_customized_train_step,
     set_logger,
     set_seed,
@@ -26,6 +31,16 @@ from config import parse_args, save_args  # isort: skip
 logger = logging.getLogger("mindcv.train")
 
 
+def resample_lr(lr_scheduler, steps_per_epoch, num_batches_per_epoch):
+    """Resamples a per-step lr of `steps_per_epoch` steps per epoch to the number of batches of each epoch,
+    so that the lr of an epoch follows the same curve whatever its batch size."""
+    lr = []
+    for epoch, num_batches in enumerate(num_batches_per_epoch):
+        start = epoch * steps_per_epoch
+        lr.extend(lr_scheduler[start + i * steps_per_epoch // num_batches] for i in range(num_batches))
+    return lr
+
+
 def main():
     args = parse_args()
     ms.set_context(mode=args.mode)
@@ -52,7 +67,13 @@ def main():
         "and setup logger by `set_logger(..., color=True)`"
     )
 
+    if args.prefetch_size is not None:
+        ms.dataset.config.set_prefetch_size(args.prefetch_size)
+    if args.autotune:
+        enable_autotune(args.autotune_file, args.autotune_interval)
+
     # create dataset
+    shard_cache_size = None if args.shard_cache_size is None else int(args.shard_cache_size * 1024**3)
     dataset_train = create_dataset(
         name=args.dataset,
         root=args.data_dir,
@@ -64,6 +85,9 @@ def main():
         num_parallel_workers=args.num_parallel_workers,
         download=args.dataset_download,
         num_aug_repeats=args.aug_repeats,
+        manifest_dir=args.manifest_dir,
+        class_weighting=args.class_weighting,
+        shard_cache_size=shard_cache_size,
     )
     if args.num_classes is None:
         num_classes = dataset_train.num_classes()
@@ -76,56 +100,107 @@ def main():
         assert args.aug_splits == 3, "Currently, only support 3 splits of augmentation"
         assert args.auto_augment is not None, "aug_splits should be set with one auto_augment"
         num_aug_splits = args.aug_splits
-    transform_list = create_transforms(
-        dataset_name=args.dataset,
-        is_training=True,
-        image_resize=args.image_resize,
-        scale=args.scale,
-        ratio=args.ratio,
-        hflip=args.hflip,
-        vflip=args.vflip,
-        color_jitter=args.color_jitter,
-        interpolation=args.interpolation,
-        auto_augment=args.auto_augment,
-        mean=args.mean,
-        std=args.std,
-        re_prob=args.re_prob,
-        re_scale=args.re_scale,
-        re_ratio=args.re_ratio,
-        re_value=args.re_value,
-        re_max_attempts=args.re_max_attempts,
-        separate=num_aug_splits > 0,
+    # progressive resizing, the training is split into phases of a constant image size
+    phases = get_resize_phases(
+        args.epoch_size,
+        args.image_resize,
+        args.batch_size,
+        resize_schedule=args.resize_schedule,
+        scale_batch_size=args.resize_scale_batch,
     )
 
-    # load dataset
-    loader_train = create_loader(
-        dataset=dataset_train,
-        batch_size=args.batch_size,
-        drop_remainder=args.drop_remainder,
-        is_training=True,
-        mixup=args.mixup,
-        cutmix=args.cutmix,
-        cutmix_prob=args.cutmix_prob,
-        num_classes=num_classes,
-        transform=transform_list,
-        num_parallel_workers=args.num_parallel_workers,
-        separate=num_aug_splits > 0,
-    )
-    num_batches = loader_train.get_dataset_size()
+    # mix on device inside the train step, or on the host after batching, uint8 batches are mixed on device
+    mixup_on_device = (args.mixup_on_device or args.normalize_on_device) and args.mixup + args.cutmix > 0.0
+    if mixup_on_device:
+        # set label_smoothing 0 here since label smoothing is computed in loss module
+        mixup_fn = MixupCell(
+            mixup_alpha=args.mixup,
+            cutmix_alpha=args.cutmix,
+            prob=args.cutmix_prob,
+            label_smoothing=0.0,
+            num_classes=num_classes,
+            seed=args.seed + (rank_id or 0),
+            channels_last=args.normalize_on_device,
+        )
+    else:
+        mixup_fn = None
+
+    # load dataset, a loader per phase, each on a copy of the dataset (made before it has a consumer) since
+    # a pipeline is a tree
+    datasets_train = [dataset_train] + [copy.deepcopy(dataset_train) for _ in phases[1:]]
+    loaders_train = []
+    for phase, dataset in zip(phases, datasets_train):
+        transform_list = create_transforms(
+            dataset_name=args.dataset,
+            is_training=True,
+            image_resize=phase["image_resize"],
+            scale=args.scale,
+            ratio=args.ratio,
+            hflip=args.hflip,
+            vflip=args.vflip,
+            color_jitter=args.color_jitter,
+            interpolation=args.interpolation,
+            reduced_decode=args.reduced_decode,
+            normalize_on_device=args.normalize_on_device,
+            auto_augment=args.auto_augment,
+            mean=args.mean,
+            std=args.std,
+            re_prob=args.re_prob,
+            re_scale=args.re_scale,
+            re_ratio=args.re_ratio,
+            re_value=args.re_value,
+            re_max_attempts=args.re_max_attempts,
+            separate=num_aug_splits > 0,
+        )
+        loader_train = create_loader(
+            dataset=dataset,
+            batch_size=phase["batch_size"],
+            drop_remainder=args.drop_remainder,
+            is_training=True,
+            mixup=0.0 if mixup_on_device else args.mixup,
+            cutmix=0.0 if mixup_on_device else args.cutmix,
+            cutmix_prob=args.cutmix_prob,
+            num_classes=num_classes,
+            transform=transform_list,
+            num_parallel_workers=args.loader_workers or args.num_parallel_workers,
+            python_multiprocessing=args.python_multiprocessing,
+            separate=num_aug_splits > 0,
+            max_rowsize=args.max_rowsize,
+        )
+        phase["num_batches"] = loader_train.get_dataset_size()
+        loaders_train.append(loader_train)
+    num_batches = max(phase["num_batches"] for phase in phases)
     train_count = dataset_train.get_dataset_size()
     if args.distribute:
         train_count = all_reduce(Tensor(train_count, ms.int32))
 
     if args.val_while_train:
-        dataset_eval = create_dataset(
-            name=args.dataset,
-            root=args.data_dir,
-            split=args.val_split,
-            num_shards=device_num,
-            shard_id=rank_id,
-            num_parallel_workers=args.num_parallel_workers,
-            download=args.dataset_download,
-        )
+        if args.val_cache_dir and args.dataset.lower() not in ("", "imagenet"):
+            raise ValueError(f"val_cache_dir is only supported by image folder datasets, not by '{args.dataset}'.")
+        if args.val_cache_dir:
+            dataset_eval = create_cached_eval_dataset(
+                root=args.data_dir,
+                cache_dir=args.val_cache_dir,
+                split=args.val_split,
+                image_resize=args.image_resize,
+                crop_pct=args.crop_pct,
+                interpolation=args.interpolation,
+                num_shards=device_num,
+                shard_id=rank_id,
+                num_parallel_workers=args.num_parallel_workers,
+            )
+        else:
+            dataset_eval = create_dataset(
+                name=args.dataset,
+                root=args.data_dir,
+                split=args.val_split,
+                num_shards=device_num,
+                shard_id=rank_id,
+                num_parallel_workers=args.num_parallel_workers,
+                download=args.dataset_download,
+                manifest_dir=args.manifest_dir,
+                shard_cache_size=shard_cache_size,
+            )
 
         transform_list_eval = create_transforms(
             dataset_name=args.dataset,
@@ -133,8 +208,11 @@ def main():
             image_resize=args.image_resize,
             crop_pct=args.crop_pct,
             interpolation=args.interpolation,
+            reduced_decode=args.reduced_decode,
+            normalize_on_device=args.normalize_on_device,
             mean=args.mean,
             std=args.std,
+            cached=bool(args.val_cache_dir),
         )
 
         loader_eval = create_loader(
@@ -163,6 +241,8 @@ def main():
         checkpoint_path=args.ckpt_path,
         ema=args.ema,
     )
+    if args.normalize_on_device:
+        network = InputNormalize(network, mean=args.mean, std=args.std)
     num_params = sum([param.size for param in network.get_parameters()])
 
     # create loss
@@ -189,6 +269,13 @@ def main():
         cycle_decay=args.cycle_decay,
         lr_epoch_stair=args.lr_epoch_stair,
     )
+    if any(phase["num_batches"] != num_batches for phase in phases):
+        # the batch size is scaled in some phases
+        lr_scheduler = resample_lr(
+            lr_scheduler,
+            num_batches,
+            [phase["num_batches"] for phase in phases for _ in range(phase["start_epoch"], phase["end_epoch"])],
+        )
 
     # resume training if ckpt_path is given
     if args.ckpt_path != "" and args.resume_opt:
@@ -206,6 +293,7 @@ def main():
             args.clip_grad,
             args.gradient_accumulation_steps,
             args.amp_cast_list,
+            mixup_fn,
         )
     ):
         optimizer_loss_scale = args.loss_scale
@@ -244,6 +332,7 @@ def main():
         clip_grad=args.clip_grad,
         clip_value=args.clip_value,
         gradient_accumulation_steps=args.gradient_accumulation_steps,
+        mixup_fn=mixup_fn,
     )
 
     # callback
@@ -251,10 +340,37 @@ def main():
     # record val acc and do model selection if val dataset is available
     begin_step = 0
     begin_epoch = 0
+    begin_batch = 0
+    initial_epoch = 0
+    data_state = None
     if args.ckpt_path != "":
         begin_step = optimizer.global_step.asnumpy()[0]
         begin_epoch = args.ckpt_path.split("/")[-1].split("-")[1].split("_")[0]
         begin_epoch = int(begin_epoch)
+        if args.resume_opt:
+            data_state = load_data_state(args.ckpt_path)
+    if data_state is not None:
+        # resume the data at the exact batch and train the remaining epochs only, the number of batches
+        # of the data state is the one of the phase of the epoch of the checkpoint
+        ckpt_epoch = max(data_state["epoch"] - (data_state["batch"] == 0), 0)
+        ckpt_num_batches = next(p["num_batches"] for p in phases if p["start_epoch"] <= ckpt_epoch < p["end_epoch"])
+        if data_state["num_batches"] != ckpt_num_batches:
+            logger.warning(
+                f"The number of batches per epoch changed from {data_state['num_batches']} to {ckpt_num_batches}, "
+                f"the data is not resumed at the batch of {args.ckpt_path}."
+            )
+        elif args.dataset_sink_mode:
+            begin_epoch = data_state["epoch"]
+            initial_epoch = begin_epoch
+            if data_state["batch"] > 0:
+                logger.warning(
+                    "Resuming at a batch within an epoch is not supported in dataset sink mode, "
+                    f"epoch {begin_epoch + 1} is trained from the start."
+                )
+        else:
+            begin_epoch = data_state["epoch"]
+            begin_batch = data_state["batch"]
+            initial_epoch = begin_epoch
 
     summary_dir = f"./{args.ckpt_save_dir}/summary"
     assert (
@@ -265,6 +381,8 @@ def main():
         model_name=args.model,
         model_ema=args.ema,
         last_epoch=begin_epoch,
+        last_batch=begin_batch,
+        num_epochs=args.epoch_size + begin_epoch - initial_epoch,
         dataset_sink_mode=args.dataset_sink_mode,
         dataset_val=loader_eval,
         metric_name=list(metrics.keys()),
@@ -273,6 +391,9 @@ def main():
         ckpt_save_interval=args.ckpt_save_interval,
         ckpt_save_policy=args.ckpt_save_policy,
         ckpt_keep_max=args.keep_checkpoint_max,
+        ckpt_save_step_interval=args.ckpt_save_step_interval,
+        # the position of the sampler for repeated augmentation or class weighting is saved with the data state
+        sampler=dataset_train.sampler.sampler if args.aug_repeats > 0 or args.class_weighting else None,
         summary_dir=summary_dir,
         log_interval=args.log_interval,
         rank_id=rank_id,
@@ -289,11 +410,15 @@ def main():
             f"Number of training samples: {train_count}",
             f"Number of validation samples: {eval_count}",
             f"Number of classes: {num_classes}",
-            f"Number of batches: {num_batches}",
-            f"Batch size: {args.batch_size}",
+            f"Number of batches: {[phase['num_batches'] for phase in phases]}",
+            f"Batch size: {[phase['batch_size'] for phase in phases]}",
+            f"Image size: {[phase['image_resize'] for phase in phases]}",
+            f"Resize phases (start epoch): {[phase['start_epoch'] for phase in phases]}",
             f"Auto augment: {args.auto_augment}",
             f"MixUp: {args.mixup}",
             f"CutMix: {args.cutmix}",
+            f"MixUp/CutMix on device: {mixup_on_device}",
+            f"Normalize on device: {args.normalize_on_device}",
             f"Model: {args.model}",
             f"Model parameters: {num_params}",
             f"Number of epochs: {args.epoch_size}",
@@ -310,11 +435,59 @@ def main():
     save_args(args, os.path.join(args.ckpt_save_dir, f"{args.model}.yaml"), rank_id)
 
     if args.ckpt_path != "":
-        logger.info(f"Resume training from {args.ckpt_path}, last step: {begin_step}, last epoch: {begin_epoch}")
+        logger.info(
+            f"Resume training from {args.ckpt_path}, last step: {begin_step}, last epoch: {begin_epoch}, "
+            f"last batch: {begin_batch}"
+        )
     else:
         logger.info("Start training")
 
-    trainer.train(args.epoch_size, loader_train, callbacks=callbacks, dataset_sink_mode=args.dataset_sink_mode)
+    # a `Model.train` per phase, the network is compiled again for the image size of the phase in graph mode,
+    # and `StateMonitor` counts the epochs and the global step over the phases
+    epoch_offset = begin_epoch - initial_epoch
+    last_step = epoch_offset * phases[0]["num_batches"]
+    for phase, loader_train in zip(phases, loaders_train):
+        if phase["end_epoch"] <= initial_epoch:
+            last_step += (phase["end_epoch"] - phase["start_epoch"]) * phase["num_batches"]
+            continue
+        phase_epoch = max(phase["start_epoch"], initial_epoch)
+        phase_batch = begin_batch if phase_epoch == initial_epoch else 0
+        last_step += (phase_epoch - phase["start_epoch"]) * phase["num_batches"] + phase_batch
+        state_cb.last_epoch = epoch_offset + phase_epoch
+        state_cb.last_batch = phase_batch
+        state_cb.last_step = last_step
+        if len(phases) > 1:
+            logger.info(
+                f"Train epochs {phase_epoch + 1}-{phase['end_epoch']} at image size {phase['image_resize']} "
+                f"with batch size {phase['batch_size']}"
+            )
+        if args.dataset_sink_mode:
+            trainer.train(
+                phase["end_epoch"] - phase_epoch,
+                loader_train,
+                callbacks=callbacks,
+                dataset_sink_mode=True,
+            )
+        else:
+            # the pipeline skips to the global step of the phase, so that the shuffle order is the same as in an
+            # uninterrupted training, and the skipped epochs count in the epochs of `Model.train`
+            if phase_epoch > 0 or phase_batch > 0:
+                loader_train.set_init_step(phase_epoch * phase["num_batches"] + phase_batch)
+            trainer.train(
+                phase["end_epoch"],
+                loader_train,
+                callbacks=callbacks,
+                dataset_sink_mode=False,
+                initial_epoch=phase_epoch,
+            )
+        last_step += (phase["end_epoch"] - phase_epoch) * phase["num_batches"] - phase_batch
+
+    if args.autotune:
+        autotune_path = f"{args.autotune_file}_{rank_id or 0}.json"
+        if os.path.isfile(autotune_path):
+            read_autotune_config(autotune_path)
+        else:
+            logger.warning(f"The Dataset AutoTune did not save a tuned pipeline to {autotune_path}.")
 
 
 if __name__ == "__main__":
@@ -2,9 +2,10 @@ import mindspore as ms
 import mindspore.nn as nn
 from mindspore import Model
 
-from mindcv.data import create_dataset, create_loader, create_transforms
+from mindcv.data import create_cached_eval_dataset, create_dataset, create_loader, create_transforms
 from mindcv.loss import create_loss
 from mindcv.models import create_model
+from mindcv.models.layers import InputNormalize
 from mindcv.utils import ValCallback
 
 from config import parse_args  # isort: skip
@@ -32,14 +33,30 @@ def validate(args):
         ms.set_context(jit_config={"jit_level": "O2"})
 
     # create dataset
-    dataset_eval = create_dataset(
-        name=args.dataset,
-        root=args.data_dir,
-        split=args.val_split,
-        num_parallel_workers=args.num_parallel_workers,
-        download=args.dataset_download,
-        shuffle=args.eval_shuffle,
-    )
+    if args.val_cache_dir and args.dataset.lower() not in ("", "imagenet"):
+        raise ValueError(f"val_cache_dir is only supported by image folder datasets, not by '{args.dataset}'.")
+    if args.val_cache_dir:
+        dataset_eval = create_cached_eval_dataset(
+            root=args.data_dir,
+            cache_dir=args.val_cache_dir,
+            split=args.val_split,
+            image_resize=args.image_resize,
+            crop_pct=args.crop_pct,
+            interpolation=args.interpolation,
+            shuffle=args.eval_shuffle,
+            num_parallel_workers=args.num_parallel_workers,
+        )
+    else:
+        dataset_eval = create_dataset(
+            name=args.dataset,
+            root=args.data_dir,
+            split=args.val_split,
+            num_parallel_workers=args.num_parallel_workers,
+            download=args.dataset_download,
+            shuffle=args.eval_shuffle,
+            manifest_dir=args.manifest_dir,
+            shard_cache_size=None if args.shard_cache_size is None else int(args.shard_cache_size * 1024**3),
+        )
 
     # create transform
     transform_list = create_transforms(
@@ -48,8 +65,11 @@ def validate(args):
         image_resize=args.image_resize,
         crop_pct=args.crop_pct,
         interpolation=args.interpolation,
+        reduced_decode=args.reduced_decode,
+        normalize_on_device=args.normalize_on_device,
         mean=args.mean,
         std=args.std,
+        cached=bool(args.val_cache_dir),
     )
 
     # read num clases
@@ -77,7 +97,11 @@ def validate(args):
         pretrained=args.pretrained,
         checkpoint_path=args.ckpt_path,
         ema=args.ema,
+        deploy=args.deploy,
+        attn_impl=args.attn_impl,
     )
+    if args.normalize_on_device:
+        network = InputNormalize(network, mean=args.mean, std=args.std)
     network.set_train(False)
     ms.amp.auto_mixed_precision(network, amp_level=args.val_amp_level)
 